@@ -1,71 +1,102 @@
+"""
+Бэктест настроения новостей: число позитивных/негативных/нейтральных заголовков по тикерам.
 
-import sqlite3
-import collections
-import pandas as pd
-import os
+Подсчёт целиком в SQLite (GROUP BY ticker с условными суммами по покрывающему
+индексу (ticker, dt, label)), в Python приходит по строке на тикер — память
+не зависит от размера news.
+
+    python backtest_sentiment.py                       # вся история
+    python backtest_sentiment.py --hours 168           # последняя неделя
+    python backtest_sentiment.py --start 2025-01-01 --end 2025-02-01 --tickers SBER GAZP
+"""
+import argparse
 import datetime as dt
+import os
+from typing import Iterator, Optional, Sequence, Tuple
+
 import requests
 
-DB = os.getenv("NEWS_DB", "db/news_cache.db")
-conn = sqlite3.connect(DB)
-rows = conn.execute("SELECT ticker,label FROM news").fetchall()
+from db import storage
 
-stats = collections.defaultdict(lambda: {"pos":0,"neg":0,"neu":0})
-for ticker,label in rows:
-    if label > 0:   stats[ticker]["pos"] += 1
-    elif label < 0: stats[ticker]["neg"] += 1
-    else:           stats[ticker]["neu"] += 1
+COLUMNS = ("ticker", "N", "pos", "neg", "neu", "PnL")
 
-for t,d in stats.items():
-    d["N"]   = d["pos"]+d["neg"]+d["neu"]
-    d["PnL"] = d["pos"]-d["neg"]
+_QUERY = """SELECT ticker, COUNT(*) AS n,
+                   SUM(label > 0) AS pos, SUM(label < 0) AS neg, SUM(label = 0) AS neu,
+                   SUM(label > 0) - SUM(label < 0) AS pnl
+            FROM news {where}
+            GROUP BY ticker
+            ORDER BY pnl DESC, ticker"""
 
-df = pd.DataFrame.from_dict(stats, orient="index")
-df = df[["N","pos","neg","neu","PnL"]].sort_values("PnL", ascending=False)
-pd.set_option("display.max_rows",None)
-print("\n=== Sentiment Back-test ===")
-print(df)
 
-# === ОТПРАВКА В GOOGLE SHEETS ===
-WEBHOOK_URL = os.getenv("SHEETS_WEBHOOK_URL")
-TOKEN = os.getenv("SHEETS_TOKEN")
+def sentiment_counts(tickers: Optional[Sequence[str]] = None, start=None, end=None) -> Iterator[Tuple]:
+    """
+    Строки (ticker, N, pos, neg, neu, PnL) по убыванию PnL, по одной из курсора.
+
+    tickers — только эти тикеры; start, end — окно [start, end) по news.dt (UTC).
+    """
+    conditions, params = [], []
+    if tickers:
+        conditions.append(f"ticker IN ({','.join('?' * len(tickers))})")
+        params += list(tickers)
+    if start is not None:
+        conditions.append("dt >= ?")
+        params.append(storage.normalize_dt(start))
+    if end is not None:
+        conditions.append("dt < ?")
+        params.append(storage.normalize_dt(end))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    yield from storage._conn().execute(_QUERY.format(where=where), params)
+
+
+def send_to_sheets(rows, timestamp: str) -> None:
+    """Отправляет строки бэктеста в Google Sheets (tag=backtest)"""
+    webhook_url = os.getenv("SHEETS_WEBHOOK_URL")
+    token = os.getenv("SHEETS_TOKEN")
+    if not (webhook_url and token):
+        print("⚠️ Google Sheets не настроен (нет WEBHOOK_URL или TOKEN)")
+        return
 
-if WEBHOOK_URL and TOKEN:
     print("\n🔄 Отправляем результаты бэктеста в Google Sheets...")
-    
-    # Формируем данные для отправки
-    backtest_rows = []
-    timestamp = dt.datetime.utcnow().isoformat(timespec="seconds")
-    
-    for ticker, data in stats.items():
-        row = [
-            ticker,
-            data["N"],      # общее количество
-            data["pos"],    # позитивные
-            data["neg"],    # негативные  
-            data["neu"],    # нейтральные
-            data["PnL"],    # P&L
-            timestamp
-        ]
-        backtest_rows.append(row)
-    
     payload = {
-        "token": TOKEN,
+        "token": token,
         "tag": "backtest",
-        "rows": backtest_rows
+        "rows": [[*row, timestamp] for row in rows],
     }
-    
     try:
-        response = requests.post(WEBHOOK_URL, json=payload, timeout=15)
+        response = requests.post(webhook_url, json=payload, timeout=15)
         print(f"📊 Статус: {response.status_code}")
         print(f"📝 Ответ: {response.text}")
-        
+
         if response.status_code == 200:
             print("✅ Данные бэктеста успешно отправлены в Google Sheets!")
         else:
             print(f"❌ Ошибка отправки: {response.status_code}")
-            
+
     except Exception as e:
         print(f"❌ Ошибка при отправке в Google Sheets: {e}")
-else:
-    print("⚠️ Google Sheets не настроен (нет WEBHOOK_URL или TOKEN)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentiment back-test по таблице news")
+    parser.add_argument("--tickers", nargs="+", help="только эти тикеры")
+    parser.add_argument("--hours", type=float, help="последние N часов")
+    parser.add_argument("--start", help="начало окна (UTC, ISO)")
+    parser.add_argument("--end", help="конец окна, не включая (UTC, ISO)")
+    parser.add_argument("--no-sheets", action="store_true", help="не отправлять в Google Sheets")
+    args = parser.parse_args(argv)
+
+    start = storage.since(args.hours) if args.hours else args.start
+    print("\n=== Sentiment Back-test ===")
+    print(f"{'':<8}" + "".join(f"{c:>8}" for c in COLUMNS[1:]))
+
+    rows = []          # по строке на тикер — для Google Sheets
+    for row in sentiment_counts(args.tickers, start, args.end):
+        print(f"{row[0] or '-':<8}" + "".join(f"{v:>8}" for v in row[1:]))
+        rows.append(row)
+
+    if not args.no_sheets:
+        send_to_sheets(rows, dt.datetime.utcnow().isoformat(timespec="seconds"))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import telebot
 from datetime import datetime
 from tinkoff.invest import Client
 from signals.sma_breakout import generate_signal
+from signals.ideas import composite_score, idea_side
 from utils.sheets_logger import log_trade
 
 # Переменные окружения
@@ -113,15 +114,18 @@ def send_telegram_message(message):
 
 def get_sentiment_score(ticker: str, hours: int = 24, force_refresh: bool = False) -> int:
     """Анализирует настроение новостей по тикеру через LLM с кэшированием"""
-    from nlp.sentiment_llm import get_sentiment_score_from_cache, smart_classify
+    from nlp.sentiment_llm import get_sentiment_score_from_cache, sentiment_score, smart_classify
     # from nlp.sentiment import latest_news_ru # remove
     from news_feed import fetch_news
     from nlp.news_rss_async import async_fetch_all
+    from nlp.dedup import cluster as cluster_headlines
+    from health.metrics import record
+    from db.storage import batch as news_batch
     import asyncio
 
     # Сначала проверяем кэш (если не принудительное обновление)
     cached_score = get_sentiment_score_from_cache(ticker, hours, force_refresh)
-    if cached_score != 0 and not force_refresh:  # Если в кэше есть данные
+    if cached_score is not None:  # Если в кэше есть данные (в т.ч. нейтральный 0)
         print(f"📊 Используем кэшированные данные для {ticker}: {cached_score}")
         return cached_score
 
@@ -161,25 +165,34 @@ def get_sentiment_score(ticker: str, hours: int = 24, force_refresh: bool = Fals
         print(f"❌ Новости для {ticker} не найдены")
         return 0
 
-    # Анализируем каждую новость через LLM с кэшированием
-    print(f"🤖 Анализируем {len(all_texts)} новостей через LLM...")
+    # Схлопываем перепечатки одной новости из разных источников
+    clusters = cluster_headlines(all_texts)
+    record("dedup", {
+        "ticker": ticker,
+        "texts": len(all_texts),
+        "clusters": len(clusters),
+        "max_size": max(c["size"] for c in clusters) if clusters else 0,
+    })
 
-    total_score = 0
-    processed = 0
+    # Анализируем по одной новости из кластера через LLM с кэшированием
+    print(f"🤖 Анализируем {len(clusters)} уникальных новостей (из {len(all_texts)}) через LLM...")
 
-    for text in all_texts:
-        try:
-            sentiment = smart_classify(text, ticker)
-            if sentiment == "positive":
-                total_score += 1
-            elif sentiment == "negative":
-                total_score -= 1
-            processed += 1
-        except Exception as e:
-            print(f"⚠️ Ошибка анализа: {e}")
-            continue
+    labels = []
+
+    # Логирование размеченных новостей в db.storage — одним commit на всю пачку
+    with news_batch():
+        for c in clusters:
+            text = c["text"]
+            try:
+                labels.append(smart_classify(text, ticker))
+            except Exception as e:
+                print(f"⚠️ Ошибка анализа: {e}")
+                continue
+
+    # Та же затухающая сумма, что и из кэша: только что размеченные новости весят полностью
+    total_score = sentiment_score(labels)
 
-    print(f"📊 Настроение {ticker}: {total_score} (из {processed} обработанных новостей)")
+    print(f"📊 Настроение {ticker}: {total_score} (из {len(labels)} обработанных новостей)")
     return total_score
 
 def log_signal_trade(ticker: str, figi: str, signal: str, price: float, qty: int = 1):
@@ -235,6 +248,39 @@ def run_daily_analysis():
     except Exception as e:
         print(f"❌ Критическая ошибка: {e}")
 
+def _warmup_steps():
+    """Шаги прогрева: кэши и подключения, которые иначе «остывшими» встретит первый /ideas"""
+    from signals.sma_breakout import get_candles
+
+    def candles():
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(FIGI_MAP)) as pool:
+            frames = list(pool.map(lambda figi: get_candles(figi, 'hour', 200), FIGI_MAP.values()))
+        return f"{sum(len(df) > 0 for df in frames)}/{len(frames)} тикеров"
+
+    def feeds():
+        from nlp.sentiment import fetch_ru_news
+        return f"{len(fetch_ru_news(hours=24))} заголовков"
+
+    def connections():
+        from nlp.sentiment_llm import get_redis, _connect
+        from db.storage import get_recent_news
+        _connect().close()
+        get_recent_news(hours=1)
+        return "redis" if not isinstance(get_redis(), dict) else "in-memory"
+
+    steps = {"candles": candles, "feeds": feeds, "connections": connections}
+
+    from nlp import sentiment_worker
+    if sentiment_worker.enabled():
+        steps["models"] = lambda: f"{sentiment_worker.get_pool().start().workers} воркеров"
+    elif os.getenv("WARMUP_MODELS", "0") == "1":
+        def models():
+            from nlp.sentiment import _load_ensemble_models
+            _load_ensemble_models()
+        steps["models"] = models
+    return steps
+
 def run_Telegram_bot():
     """Запускает Telegram бота для обработки команд"""
     if not TELEGRAM_TOKEN or TELEGRAM_TOKEN == "PLACEHOLDER":
@@ -267,6 +313,10 @@ def run_Telegram_bot():
             print(f"   • Redis: ❌ ({e})")
             print("   💡 Бот будет работать без кэширования")
 
+        # Фоновый прогрев кэшей (BOT_WARMUP=0 — выключить)
+        from health import warmup
+        warmup.start(_warmup_steps())
+
         print("🤖 Telegram бот запущен...")
     except Exception as e:
         if "409" in str(e):
@@ -442,6 +492,8 @@ def run_Telegram_bot():
 По умолчанию: /ideas 5 15 0 24 (все тикеры, новости за 24ч)
 
 /pnl - показать общий P/L
+/health - состояние источников новостей (circuit breaker)
+/ready - готовность бота после старта (прогрев кэшей)
 /debug - показать лог отладки
 /config - показать конфигурацию Google Sheets
 /test_sheets - проверить подключение к Google Sheets
@@ -528,11 +580,10 @@ def run_Telegram_bot():
 
                 try:
                     signal = generate_signal(fg, fast=fast, slow=slow, atr_ratio=atr)
-                    tech = 1 if signal == "BUY" else -1 if signal == "SELL" else 0
                     sent = get_sentiment_score(tk, hours=hours)
-                    score = tech + sent
-                    if abs(score) >= 2:
-                        side = "LONG" if score > 0 else "SHORT"
+                    score = composite_score(signal, sent)
+                    side = idea_side(score)
+                    if side:
                         reply += f"• {tk:<6} {side} (score {score})\n"
                 except Exception as e:
                     reply += f"• {tk:<6} ⚠️ Ошибка: {e}\n"
@@ -556,35 +607,17 @@ def run_Telegram_bot():
                 return
 
             try:
-                import sqlite3
-                import os
+                from db.storage import get_recent_news
 
-                db_path = os.getenv("NEWS_DB", "db/news_cache.db")
-
-                # Проверяем существование базы данных
-                if not os.path.exists(db_path):
-                    bot.reply_to(msg, f"❌ База данных новостей не найдена: {db_path}")
-                    return
-
-                db = sqlite3.connect(db_path)
-                query = """
-                  SELECT dt, headline, label
-                  FROM   news
-                  WHERE  ticker = ? AND dt >= datetime('now', ? || ' hours')
-                  ORDER  BY dt DESC
-                  LIMIT  5
-                """
-                rows = db.execute(query, (ticker, -hours)).fetchall()
-                db.close()
+                # dt > bound-параметр — диапазон по индексу (ticker, dt);
+                # дубликаты заголовков отсекаются уникальным (ticker, hash) при записи
+                rows = [(dt_str, hline, lbl) for dt_str, _, hline, lbl, _, _
+                        in get_recent_news(ticker, hours, limit=5)]
 
                 if not rows:
                     bot.reply_to(msg, f"Новостей по {ticker} за {hours} ч нет.")
                     return
 
-                # ── DEDUP: убираем повторяющиеся заголовки ───────────────────
-                seen = set()
-                rows = [r for r in rows if not (r[1] in seen or seen.add(r[1]))][:5]
-
                 def emoji(lbl):
                     return {1:"👍", -1:"👎", 0:"⚪"}.get(lbl, "❓")
 
@@ -594,11 +627,40 @@ def run_Telegram_bot():
 
                 bot.reply_to(msg, "\n".join(lines), parse_mode="Markdown")
 
-            except sqlite3.Error as e:
-                bot.reply_to(msg, f"❌ Ошибка базы данных: {e}")
             except Exception as e:
                 bot.reply_to(msg, f"❌ Ошибка получения новостей: {e}")
 
+        elif text.startswith("/health"):
+            from health.breaker import health_scores
+
+            scores = health_scores()
+            if not scores:
+                bot.reply_to(msg, "Источники новостей ещё не опрашивались.")
+                return
+
+            icons = {"closed": "🟢", "half-open": "🟡", "open": "🔴"}
+            lines = ["🩺 Здоровье источников новостей:"]
+            for name, info in scores.items():
+                lines.append(f"{icons.get(info['state'], '❓')} {name}: "
+                             f"{info['score']:.2f} ({info['state']})")
+            bot.reply_to(msg, "\n".join(lines))
+
+        elif text.startswith("/ready"):
+            from health import warmup
+
+            warm = warmup.current()
+            if warm is None:
+                bot.reply_to(msg, "Прогрев выключен (BOT_WARMUP=0).")
+                return
+
+            icons = {"pending": "⏳", "running": "🔄", "ok": "🟢", "fail": "🔴"}
+            lines = ["✅ Бот прогрет:" if warm.ready() else "⏳ Идёт прогрев:"]
+            for name, info in warm.report().items():
+                took = f" {info['seconds']:.1f} с" if info["seconds"] is not None else ""
+                detail = f" — {info['detail']}" if info["detail"] else ""
+                lines.append(f"{icons.get(info['state'], '❓')} {name}{took}{detail}")
+            bot.reply_to(msg, "\n".join(lines))
+
         elif text.startswith("/debug"):
             try:
                 # Читаем последние 10 строк из лог-файла
@@ -0,0 +1,225 @@
+"""
+Колоночный экспорт истории в Parquet для исследований и бэктестов.
+
+Таблицы news, sentiment_cache и candles выгружаются в партиционированный
+датасет (hive-разметка, zstd):
+
+    EXPORT_DIR/<table>/date=YYYY-MM-DD/ticker=<TICKER>/part-<первый id>-0.parquet
+
+Выгрузка инкрементальная: в EXPORT_DIR/_state.json хранится последний
+выгруженный id каждой таблицы, следующий запуск дописывает только новые
+строки. Экспорт только дописывает: если строка news позже уточнилась
+upsert'ом (метка, confidence), в Parquet останется первая версия.
+
+load() читает датасет через memory-map, только нужные колонки и только
+партиции, подходящие под фильтр по тикерам и датам.
+
+Запуск:
+    python -m db.export                    # все таблицы
+    python -m db.export --tables candles   # только свечи
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from db import writer as db_writer
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "db/parquet")
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "100000"))      # строк на одно чтение из SQLite
+
+# Таблица → колонка времени (по ней партиция date) и выгружаемые колонки
+TABLES = {
+    "news": {
+        "time_column": "dt",
+        "columns": ["id", "dt", "ticker", "headline", "label", "source", "confidence", "hash", "sentiment_hash"],
+    },
+    "sentiment_cache": {
+        "time_column": "timestamp",
+        "columns": ["id", "timestamp", "ticker", "text_hash", "text", "sentiment", "confidence", "source"],
+    },
+    "candles": {
+        "time_column": "time",
+        "columns": ["id", "time", "figi", "ticker", "interval", "open", "high", "low", "close", "volume"],
+    },
+}
+
+_STATE_FILE = "_state.json"
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([("date", pa.string()), ("ticker", pa.string())]), flavor="hive")
+
+
+def _load_state(export_dir: str) -> Dict[str, int]:
+    path = os.path.join(export_dir, _STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _save_state(export_dir: str, state: Dict[str, int]) -> None:
+    """Атомарно: сначала во временный файл, затем rename"""
+    path = os.path.join(export_dir, _STATE_FILE)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(state, fh, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def export_table(table: str, path: Optional[str] = None, export_dir: str = EXPORT_DIR,
+                 chunk: int = EXPORT_CHUNK) -> Dict:
+    """
+    Дописывает в Parquet строки table с id больше сохранённого.
+
+    Returns:
+        {'table', 'rows', 'files', 'last_id'}
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path is None:
+        from db import storage
+        storage._writer()           # схема по миграциям (в т.ч. таблица candles)
+        path = storage._PATH
+
+    spec = TABLES[table]
+    column = spec["time_column"]
+    state = _load_state(export_dir)
+    stats = {"table": table, "rows": 0, "files": 0, "last_id": state.get(table, 0)}
+    if not os.path.exists(path):
+        return stats
+
+    conn = db_writer.reader(path)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is None:
+        return stats
+
+    root = os.path.join(export_dir, table)
+    query = f"SELECT {', '.join(spec['columns'])} FROM {table} WHERE id > ? ORDER BY id LIMIT ?"
+    while True:
+        df = pd.read_sql_query(query, conn, params=(stats["last_id"], chunk))
+        if df.empty:
+            break
+
+        # строки без времени попадают в партицию date=__HIVE_DEFAULT_PARTITION__ (читается как null)
+        df["date"] = df[column].str.slice(0, 10)
+        first_id = int(df["id"].iloc[0])
+        written: List[str] = []
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False), root,
+            partitioning=_partitioning(),
+            # имя по первому id пачки: повтор после сбоя перезаписывает те же файлы, а не дублирует
+            basename_template=f"part-{first_id:012d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            compression="zstd",
+            file_visitor=lambda f: written.append(f.path),
+        )
+
+        stats["rows"] += len(df)
+        stats["files"] += len(written)
+        stats["last_id"] = int(df["id"].iloc[-1])
+        os.makedirs(export_dir, exist_ok=True)
+        _save_state(export_dir, {**_load_state(export_dir), table: stats["last_id"]})
+        if len(df) < chunk:
+            break
+    return stats
+
+
+def run_export(tables: Optional[Iterable[str]] = None, **kwargs) -> List[Dict]:
+    """Экспортирует таблицы (по умолчанию все из TABLES); итог пишет в health.log"""
+    from health.metrics import record
+
+    results = []
+    for table in tables or TABLES:
+        stats = export_table(table, **kwargs)
+        results.append(stats)
+        record("export", stats)
+        print(f"📤 {table}: выгружено {stats['rows']} строк в {stats['files']} файлов (последний id {stats['last_id']})")
+    return results
+
+
+def _dataset(table: str, export_dir: str):
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    root = os.path.join(export_dir, table)
+    if not os.path.isdir(root):
+        return None
+    return ds.dataset(root, format="parquet", partitioning=_partitioning(),
+                      filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def _arrow_table(table: str, columns: Optional[Sequence[str]], tickers: Optional[Sequence[str]],
+                 start, end, export_dir: str):
+    import pyarrow.dataset as ds
+    from db.storage import normalize_dt
+
+    dataset = _dataset(table, export_dir)
+    if dataset is None:
+        return None
+
+    column = TABLES[table]["time_column"]
+    separator = " " if table == "sentiment_cache" else "T"    # формат времени колонки (как в SQLite)
+    condition = None
+
+    def both(expr):
+        return expr if condition is None else condition & expr
+
+    if tickers:
+        condition = both(ds.field("ticker").isin(list(tickers)))
+    # сначала по партиции date (отсекает файлы), затем точно по колонке времени
+    if start is not None:
+        bound = normalize_dt(start).replace("T", separator)
+        condition = both((ds.field("date") >= bound[:10]) & (ds.field(column) >= bound))
+    if end is not None:
+        bound = normalize_dt(end).replace("T", separator)
+        condition = both((ds.field("date") <= bound[:10]) & (ds.field(column) < bound))
+
+    return dataset.to_table(columns=list(columns) if columns else None, filter=condition)
+
+
+def load(table: str, columns: Optional[Sequence[str]] = None, tickers: Optional[Sequence[str]] = None,
+         start: Union[str, datetime, None] = None, end: Union[str, datetime, None] = None,
+         export_dir: str = EXPORT_DIR):
+    """
+    Читает выгрузку таблицы в DataFrame (по возрастанию времени).
+
+    columns — только эти колонки (остальные с диска не читаются);
+    tickers, start, end — фильтр по тикерам и интервалу [start, end) времени (UTC).
+    """
+    import pandas as pd
+
+    result = _arrow_table(table, columns, tickers, start, end, export_dir)
+    if result is None:
+        return pd.DataFrame(columns=list(columns) if columns else TABLES[table]["columns"])
+    df = result.to_pandas()
+    order = [c for c in (TABLES[table]["time_column"], "id") if c in df]
+    return df.sort_values(order, kind="stable").reset_index(drop=True) if order else df
+
+
+def load_arrays(table: str, columns: Sequence[str], **kwargs) -> Dict[str, "np.ndarray"]:
+    """Как load(), но колонки — массивами NumPy в порядке файлов датасета (числовые — без копирования, где возможно)"""
+    import numpy as np
+
+    result = _arrow_table(table, columns, kwargs.get("tickers"), kwargs.get("start"), kwargs.get("end"),
+                          kwargs.get("export_dir", EXPORT_DIR))
+    if result is None:
+        return {c: np.array([]) for c in columns}
+    return {c: result.column(c).to_numpy() for c in columns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Инкрементальный экспорт news_cache.db в Parquet")
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLES), default=None)
+    parser.add_argument("--dir", default=EXPORT_DIR)
+    parser.add_argument("--chunk", type=int, default=EXPORT_CHUNK)
+    args = parser.parse_args()
+    run_export(args.tables, export_dir=args.dir, chunk=args.chunk)
+
+
+if __name__ == "__main__":
+    main()
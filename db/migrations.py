@@ -0,0 +1,177 @@
+"""
+Версионные миграции единой базы новостей (NEWS_DB, по умолчанию db/news_cache.db).
+
+Версия схемы хранится в PRAGMA user_version. migrate() применяет по порядку
+все миграции с номером больше текущего, каждую в своей транзакции, и
+выполняется в потоке-писателе базы (см. db.storage._writer).
+
+Чтобы изменить схему — допишите функцию в конец MIGRATIONS; уже
+выпущенные миграции не меняются.
+"""
+import os
+import sqlite3
+from typing import Callable, List
+
+# sentiment_cache раньше жил в отдельном файле в рабочем каталоге
+LEGACY_SENTIMENT_DB = os.getenv("LEGACY_SENTIMENT_DB", "news_cache.db")
+
+
+def _news_baseline(conn: sqlite3.Connection) -> None:
+    """1: таблица news с hash, нормализованным dt и индексами (догоняет базы, созданные до миграций)"""
+    from db.storage import _DT_GLOB
+
+    conn.execute("""CREATE TABLE IF NOT EXISTS news (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dt TEXT,
+        ticker TEXT,
+        headline TEXT,
+        label INTEGER,
+        source TEXT,
+        confidence REAL DEFAULT 0.5,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        hash TEXT
+    )""")
+
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(news)")}
+    if "hash" not in columns:
+        _add_hash_column(conn)
+
+    # Приводим старые записи (пробел вместо 'T', доли секунд, часовой пояс) к формату DT_FORMAT
+    conn.execute(f"""UPDATE news SET dt = strftime('%Y-%m-%dT%H:%M:%S', dt)
+                    WHERE dt NOT GLOB '{_DT_GLOB}' AND strftime('%Y-%m-%dT%H:%M:%S', dt) IS NOT NULL""")
+
+    # Индексы: (ticker, dt) — выборка по тикеру за период, (dt) — за период по всем тикерам
+    conn.execute("DROP INDEX IF EXISTS idx_dt_ticker")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_ticker_dt ON news(ticker, dt)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_dt ON news(dt)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_ticker_hash ON news(ticker, hash)")
+
+
+def _add_hash_column(conn: sqlite3.Connection) -> None:
+    """Старая таблица без hash: добавляем колонку, заполняем и убираем дубликаты"""
+    conn.execute("ALTER TABLE news ADD COLUMN hash TEXT")
+    _fill_hash(conn)
+
+
+def _fill_hash(conn: sqlite3.Connection) -> None:
+    """Пересчитывает news.hash по headline_hash и убирает получившиеся дубликаты"""
+    from db.storage import headline_hash
+
+    rows = conn.execute("SELECT id, headline FROM news").fetchall()
+    conn.executemany("UPDATE news SET hash = ? WHERE id = ?",
+                     [(headline_hash(headline), row_id) for row_id, headline in rows])
+    # из каждой группы (ticker, hash) оставляем самую уверенную (при равенстве — последнюю) запись
+    removed = conn.execute("""DELETE FROM news WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY ticker, hash
+                                          ORDER BY confidence DESC, id DESC) AS rn
+            FROM news)
+        WHERE rn > 1)""").rowcount
+    if removed:
+        print(f"🧹 news: удалено {removed} дубликатов заголовков")
+
+
+def _sentiment_cache(conn: sqlite3.Connection) -> None:
+    """2: sentiment_cache переезжает в ту же базу; строки из старого файла переносятся"""
+    conn.execute("""CREATE TABLE IF NOT EXISTS sentiment_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text_hash TEXT UNIQUE NOT NULL,
+        text TEXT NOT NULL,
+        sentiment TEXT NOT NULL,
+        confidence REAL DEFAULT 0.5,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        ticker TEXT,
+        source TEXT DEFAULT 'llm'
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp_ticker ON sentiment_cache(timestamp, ticker)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_ticker_ts ON sentiment_cache(ticker, timestamp)")
+
+    main_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    legacy = os.path.abspath(LEGACY_SENTIMENT_DB)
+    if not os.path.exists(legacy) or (main_path and os.path.abspath(main_path) == legacy):
+        return
+    try:
+        src = sqlite3.connect(f"file:{legacy}?mode=ro", uri=True)
+        rows = src.execute("""SELECT text_hash, text, sentiment, confidence, timestamp, ticker, source
+                              FROM sentiment_cache""").fetchall()
+        src.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Не удалось прочитать {legacy}: {e}")
+        return
+    conn.executemany("""INSERT OR IGNORE INTO sentiment_cache
+                        (text_hash, text, sentiment, confidence, timestamp, ticker, source)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+    print(f"📦 sentiment_cache: перенесено {len(rows)} строк из {legacy}")
+
+
+def _news_sentiment_fk(conn: sqlite3.Connection) -> None:
+    """3: news.sentiment_hash → sentiment_cache.text_hash (метка новости и её LLM-разметка)"""
+    conn.execute("""ALTER TABLE news ADD COLUMN sentiment_hash TEXT
+                    REFERENCES sentiment_cache(text_hash) ON DELETE SET NULL""")
+    conn.execute("""UPDATE news SET sentiment_hash = hash
+                    WHERE hash IN (SELECT text_hash FROM sentiment_cache)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_sentiment_hash ON news(sentiment_hash)")
+
+
+def _candles(conn: sqlite3.Connection) -> None:
+    """4: история закрытых свечей из signals.sma_breakout.get_candles (время — UTC, как news.dt)"""
+    conn.execute("""CREATE TABLE IF NOT EXISTS candles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        figi TEXT NOT NULL,
+        ticker TEXT,
+        interval TEXT NOT NULL,
+        time TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume INTEGER,
+        UNIQUE (figi, interval, time)
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candles_ticker_time ON candles(ticker, interval, time)")
+
+
+def _news_label_index(conn: sqlite3.Connection) -> None:
+    """5: (ticker, dt) → покрывающий (ticker, dt, label): подсчёт меток по тикерам без чтения строк"""
+    conn.execute("DROP INDEX IF EXISTS idx_news_ticker_dt")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_ticker_dt_label ON news(ticker, dt, label)")
+
+
+def _news_signed_hash(conn: sqlite3.Connection) -> None:
+    """6: news.hash с учётом знаков чисел («+5%» и «-5%» — разные заголовки)"""
+    conn.execute("DROP INDEX IF EXISTS idx_news_ticker_hash")
+    _fill_hash(conn)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_ticker_hash ON news(ticker, hash)")
+
+
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _news_baseline,
+    _sentiment_cache,
+    _news_sentiment_fk,
+    _candles,
+    _news_label_index,
+    _news_signed_hash,
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Применяет недостающие миграции; возвращает итоговую версию схемы"""
+    current = schema_version(conn)
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"🛠️ Схема news_cache.db: миграция {version} ({migration.__name__.strip('_')})")
+        current = version
+    return current
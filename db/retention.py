@@ -0,0 +1,217 @@
+"""
+Ретеншн для news_cache.db: горячая база хранит только свежие строки.
+
+Строки старше NEWS_RETENTION_DAYS / SENTIMENT_RETENTION_DAYS:
+  1) сворачиваются в дневные сводки (news_daily, sentiment_daily) в той же базе;
+  2) архивируются в Parquet (zstd) по месяцам: ARCHIVE_DIR/<table>/month=YYYY-MM/part-<id>.parquet;
+  3) удаляются из горячей базы короткими транзакциями по RETENTION_BATCH строк
+     (через поток-писатель базы, см. db.writer — очередь бота не блокируется надолго);
+  4) освобождённые страницы возвращаются через PRAGMA incremental_vacuum.
+
+Базы, созданные до auto_vacuum=INCREMENTAL, переводятся только явно
+(--convert-vacuum): это полный VACUUM, и на всё время перестройки файла
+поток-писатель занят — запускайте, пока бот остановлен.
+
+Запуск:
+    python -m db.retention                    # по настройкам из окружения
+    python -m db.retention --dry-run          # только посчитать, что уйдёт в архив
+    python -m db.retention --convert-vacuum   # однократно перевести старую базу (полный VACUUM)
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import writer as db_writer
+
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "30"))
+SENTIMENT_RETENTION_DAYS = int(os.getenv("SENTIMENT_RETENTION_DAYS", "30"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "db/archive")
+RETENTION_BATCH = int(os.getenv("RETENTION_BATCH", "500"))
+RETENTION_PAUSE = float(os.getenv("RETENTION_PAUSE", "0.05"))     # пауза между пачками для других писателей
+VACUUM_PAGES = int(os.getenv("VACUUM_PAGES", "2000"))
+
+# Таблица → колонка времени, формат границы и свёртка удаляемых строк в сводку
+TABLES = {
+    "news": {
+        "time_column": "dt",
+        "time_format": "%Y-%m-%dT%H:%M:%S",
+        "summary_ddl": """CREATE TABLE IF NOT EXISTS news_daily (
+            day TEXT, ticker TEXT, source TEXT,
+            n INTEGER, pos INTEGER, neg INTEGER, neu INTEGER, conf_sum REAL,
+            PRIMARY KEY (day, ticker, source))""",
+        "summary_sql": """INSERT INTO news_daily(day, ticker, source, n, pos, neg, neu, conf_sum)
+            SELECT substr(dt, 1, 10), ticker, source, COUNT(*),
+                   SUM(label > 0), SUM(label < 0), SUM(label = 0), SUM(confidence)
+            FROM news WHERE id IN ({ids})
+            GROUP BY substr(dt, 1, 10), ticker, source
+            ON CONFLICT(day, ticker, source) DO UPDATE SET
+                n = n + excluded.n, pos = pos + excluded.pos, neg = neg + excluded.neg,
+                neu = neu + excluded.neu, conf_sum = conf_sum + excluded.conf_sum""",
+    },
+    "sentiment_cache": {
+        "time_column": "timestamp",
+        "time_format": "%Y-%m-%d %H:%M:%S",
+        "summary_ddl": """CREATE TABLE IF NOT EXISTS sentiment_daily (
+            day TEXT, ticker TEXT, sentiment TEXT, n INTEGER, conf_sum REAL,
+            PRIMARY KEY (day, ticker, sentiment))""",
+        "summary_sql": """INSERT INTO sentiment_daily(day, ticker, sentiment, n, conf_sum)
+            SELECT substr(timestamp, 1, 10), COALESCE(ticker, ''), sentiment, COUNT(*), SUM(confidence)
+            FROM sentiment_cache WHERE id IN ({ids})
+            GROUP BY substr(timestamp, 1, 10), COALESCE(ticker, ''), sentiment
+            ON CONFLICT(day, ticker, sentiment) DO UPDATE SET
+                n = n + excluded.n, conf_sum = conf_sum + excluded.conf_sum""",
+    },
+}
+
+
+def default_targets() -> List[Dict]:
+    """Таблицы по умолчанию: news и sentiment_cache общей базы db.storage"""
+    from db import storage
+    storage._writer()           # писатель с миграциями схемы
+    return [
+        {"path": storage._PATH, "table": "news", "days": NEWS_RETENTION_DAYS},
+        {"path": storage._PATH, "table": "sentiment_cache", "days": SENTIMENT_RETENTION_DAYS},
+    ]
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is not None
+
+
+def _archive(df, table: str, archive_dir: str) -> int:
+    """Дописывает пачку строк в помесячные Parquet-файлы; имя файла — по первому id (идемпотентно)"""
+    months = df["_month"]
+    written = 0
+    for month, part in df.groupby(months):
+        folder = os.path.join(archive_dir, table, f"month={month}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"part-{int(part['id'].min()):012d}.parquet")
+        part.drop(columns="_month").to_parquet(path, compression="zstd", index=False)
+        written += len(part)
+    return written
+
+
+def ensure_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """Переводит базу в auto_vacuum=INCREMENTAL (для существующей базы — один полный VACUUM; вне транзакции)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        print("🧹 Включаем auto_vacuum=INCREMENTAL (однократный VACUUM)...")
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+
+
+def retain(path: str, table: str, days: int, archive_dir: str = ARCHIVE_DIR,
+           batch: int = RETENTION_BATCH, pause: float = RETENTION_PAUSE,
+           vacuum_pages: int = VACUUM_PAGES, dry_run: bool = False,
+           now: Optional[datetime] = None, convert_vacuum: bool = False) -> Dict:
+    """
+    Сворачивает, архивирует и удаляет строки table старше days дней.
+
+    convert_vacuum — перевести старую базу в auto_vacuum=INCREMENTAL (полный VACUUM
+    в потоке-писателе); без него такая база просто не сжимается.
+
+    Returns:
+        {'table', 'cutoff', 'archived', 'deleted', 'freed_pages'}
+    """
+    import pandas as pd
+
+    spec = TABLES[table]
+    column = spec["time_column"]
+    cutoff = ((now or datetime.utcnow()) - timedelta(days=days)).strftime(spec["time_format"])
+    stats = {"table": table, "cutoff": cutoff, "archived": 0, "deleted": 0, "freed_pages": 0}
+
+    if not os.path.exists(path):
+        return stats
+    writer = db_writer.get_writer(path)
+    conn = db_writer.reader(path)
+    if not _has_table(conn, table):
+        return stats
+
+    if dry_run:
+        stats["archived"] = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {column} < ?", (cutoff,)).fetchone()[0]
+        return stats
+
+    writer.execute(spec["summary_ddl"]).result()
+    while True:
+        df = pd.read_sql_query(
+            f"SELECT * FROM {table} WHERE {column} < ? ORDER BY {column}, id LIMIT ?",
+            conn, params=(cutoff, batch))
+        if df.empty:
+            break
+
+        # сначала архив: если запись упадёт, строки останутся в базе
+        df["_month"] = df[column].str.slice(0, 7)
+        stats["archived"] += _archive(df, table, archive_dir)
+
+        ids = ",".join(str(int(i)) for i in df["id"])
+
+        def roll_up_and_delete(wconn, ids=ids):
+            wconn.execute(spec["summary_sql"].format(ids=ids))
+            return wconn.execute(f"DELETE FROM {table} WHERE id IN ({ids})").rowcount
+
+        stats["deleted"] += writer.call(roll_up_and_delete).result()
+
+        if len(df) < batch:
+            break
+        time.sleep(pause)          # окно для других писателей
+
+    if stats["deleted"] or convert_vacuum:
+        def vacuum(wconn):
+            if wconn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                if not convert_vacuum:
+                    print(f"⚠️ {path}: auto_vacuum не INCREMENTAL, место не возвращается "
+                          f"(однократно: python -m db.retention --convert-vacuum)")
+                    return 0
+                ensure_incremental_vacuum(wconn)
+            before = wconn.execute("PRAGMA freelist_count").fetchone()[0]
+            wconn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+            return before - wconn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        stats["freed_pages"] = writer.call(vacuum, transactional=False).result()
+    return stats
+
+
+def run_retention(targets: Optional[List[Dict]] = None, **kwargs) -> List[Dict]:
+    """Прогоняет retain по всем базам; пишет итог в health.log"""
+    from health.metrics import record
+
+    results = []
+    for target in targets or default_targets():
+        stats = retain(target["path"], target["table"], target["days"], **kwargs)
+        results.append(stats)
+        record("retention", stats)
+        print(f"🗄️ {stats['table']}: в архив {stats['archived']}, удалено {stats['deleted']}, "
+              f"освобождено страниц {stats['freed_pages']} (старше {stats['cutoff']})")
+    return results
+
+
+def load_archive(table: str, month: Optional[str] = None, archive_dir: str = ARCHIVE_DIR):
+    """Читает архив таблицы (весь или за месяц YYYY-MM) в DataFrame без повторов по id"""
+    import pandas as pd
+
+    root = os.path.join(archive_dir, table)
+    folders = [f"month={month}"] if month else sorted(os.listdir(root)) if os.path.isdir(root) else []
+    files = [os.path.join(root, folder, name)
+             for folder in folders if os.path.isdir(os.path.join(root, folder))
+             for name in sorted(os.listdir(os.path.join(root, folder))) if name.endswith(".parquet")]
+    if not files:
+        return pd.DataFrame()
+    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    return df.drop_duplicates("id", keep="last").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ретеншн и архивирование news_cache.db")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать строки к архивации")
+    parser.add_argument("--batch", type=int, default=RETENTION_BATCH)
+    parser.add_argument("--convert-vacuum", action="store_true",
+                        help="перевести старую базу в auto_vacuum=INCREMENTAL (полный VACUUM, блокирует запись)")
+    args = parser.parse_args()
+    run_retention(batch=args.batch, dry_run=args.dry_run, convert_vacuum=args.convert_vacuum)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,78 +3,244 @@ import sqlite3
 import os
 import threading
 import contextlib
-from datetime import datetime
+from db import writer as _db_writer
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple, Union
 
 _PATH = os.getenv("NEWS_DB", "db/news_cache.db")
-_lock = threading.Lock()
-
-def _get():
-    """Создает подключение к SQLite и таблицу если её нет"""
-    # Создаем директорию если её нет
-    os.makedirs(os.path.dirname(_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(_PATH, check_same_thread=False)
-    conn.execute("""CREATE TABLE IF NOT EXISTS news (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        dt TEXT,
-        ticker TEXT,
-        headline TEXT,
-        label INTEGER,
-        source TEXT,
-        confidence REAL DEFAULT 0.5,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    )""")
-    
-    # Создаем индекс для быстрого поиска
-    conn.execute("""CREATE INDEX IF NOT EXISTS idx_dt_ticker 
-                   ON news(dt, ticker)""")
-    
-    conn.commit()
-    return conn
-
-_CONN = _get()
-
-def insert(dt: str, ticker: str, headline: str, label: int, source: str, confidence: float = 0.5):
-    """Записывает новость в кэш"""
-    with _lock:
+_local = threading.local()     # активный batch() текущего потока
+
+BATCH_SIZE = int(os.getenv("NEWS_BATCH_SIZE", "500"))
+
+# Upsert по (ticker, hash): повтор заголовка не создаёт строку, а уточняет метку,
+# если новая оценка не менее уверенная (LLM поверх нейтральной RSS-записи).
+# dt — последнее появление: повторяющаяся новость остаётся в окнах «за N часов»
+_INSERT_SQL = """INSERT INTO news(dt, ticker, headline, label, source, confidence, hash, sentiment_hash)
+                 VALUES(?,?,?,?,?,?,?,?)
+                 ON CONFLICT(ticker, hash) DO UPDATE SET
+                     dt         = max(news.dt, excluded.dt),
+                     sentiment_hash = COALESCE(excluded.sentiment_hash, news.sentiment_hash),
+                     label      = CASE WHEN excluded.confidence >= news.confidence THEN excluded.label ELSE news.label END,
+                     source     = CASE WHEN excluded.confidence >= news.confidence THEN excluded.source ELSE news.source END,
+                     confidence = max(news.confidence, excluded.confidence)"""
+_COLUMNS = ("dt", "ticker", "headline", "label", "source", "confidence", "sentiment_hash")
+
+Row = Union[Tuple, dict]
+
+# dt хранится как UTC 'YYYY-MM-DDTHH:MM:SS': строки сравниваются лексикографически,
+# поэтому фильтр по времени — это диапазон по индексу без функций над колонкой
+DT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_DT_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9]"
+
+def normalize_dt(value: Union[str, datetime, None]) -> Optional[str]:
+    """datetime / ISO-строка (с 'T' или пробелом, с зоной или без) → UTC 'YYYY-MM-DDTHH:MM:SS'"""
+    if value is None:
+        return None
+    if isinstance(value, str):
         try:
-            _CONN.execute(
-                "INSERT INTO news(dt, ticker, headline, label, source, confidence) VALUES(?,?,?,?,?,?)",
-                (dt, ticker, headline[:300], label, source, confidence)
-            )
-            _CONN.commit()
-        except Exception as e:
-            print(f"⚠️ Ошибка записи в news cache: {e}")
-
-def get_recent_news(ticker: str = None, hours: int = 24):
-    """Получает недавние новости из кэша"""
-    with _lock:
-        query = "SELECT dt, ticker, headline, label, source, confidence FROM news WHERE datetime(dt) > datetime('now', '-{} hours')".format(hours)
-        params = []
-        
-        if ticker:
-            query += " AND ticker = ?"
-            params.append(ticker)
-            
-        query += " ORDER BY dt DESC"
-        
-        cursor = _CONN.execute(query, params)
-        return cursor.fetchall()
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime(DT_FORMAT)
+
+# sentiment_cache.timestamp — CURRENT_TIMESTAMP SQLite (UTC, через пробел)
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def since(hours: float, fmt: str = DT_FORMAT) -> str:
+    """Нижняя граница окна «последние N часов» в формате колонки dt (или timestamp при fmt=TS_FORMAT)"""
+    return (datetime.utcnow() - timedelta(hours=hours)).strftime(fmt)
+
+def _prepare(conn: sqlite3.Connection) -> None:
+    """До включения WAL: новая база сразу создаётся с auto_vacuum=INCREMENTAL (старые переводит db.retention)"""
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
+def _init(conn: sqlite3.Connection) -> None:
+    """Схема базы (news + sentiment_cache) по версионным миграциям; один раз в потоке писателя"""
+    from db.migrations import migrate
+
+    migrate(conn)
+    conn.execute("PRAGMA foreign_keys=ON")
+
+def _writer() -> _db_writer.Writer:
+    """Поток-писатель базы новостей и sentiment_cache (создаётся при первой записи или чтении, а не при импорте)"""
+    return _db_writer.get_writer(_PATH, init=_init, prepare=_prepare)
+
+def _conn() -> sqlite3.Connection:
+    """Read-only WAL-подключение текущего потока: чтение не ждёт commit писателя"""
+    _writer()
+    return _db_writer.reader(_PATH)
+
+def close() -> None:
+    """Останавливает писателя (после записи всей очереди) и закрывает чтение текущего потока"""
+    _db_writer.close(_PATH)
+
+def headline_hash(headline: str) -> str:
+    """Хэш содержимого заголовка (регистр, пунктуация и хвост « - РБК» не важны, знаки чисел — важны)"""
+    import hashlib
+    from nlp.dedup import normalize
+    return hashlib.md5(normalize(headline, keep_signs=True).encode()).hexdigest()
+
+def _row(row: Row) -> Tuple:
+    """dict или кортеж → кортеж колонок INSERT (headline обрезается до 300 символов)"""
+    if isinstance(row, dict):
+        row = tuple(row.get(c, 0.5 if c == "confidence" else None) for c in _COLUMNS)
+    else:
+        row = (*row, 0.5, None)[:7] if len(row) == 5 else (*row, None)[:7]
+    dt, ticker, headline, label, source, confidence, sentiment_hash = row
+    headline = (headline or "")[:300]
+    return (normalize_dt(dt), ticker, headline, label, source, confidence,
+            headline_hash(headline), sentiment_hash)
+
+def insert(dt: str, ticker: str, headline: str, label: int, source: str, confidence: float = 0.5,
+           sentiment_hash: str = None):
+    """
+    Записывает новость в кэш (внутри batch() — откладывает до общего commit).
+
+    sentiment_hash — text_hash строки sentiment_cache, из которой взята метка.
+    """
+    row = (dt, ticker, headline, label, source, confidence, sentiment_hash)
+    writer = getattr(_local, "batch", None)
+    if writer is not None:
+        writer.add(row)
+        return
+    insert_many([row])
+
+def insert_many(rows: Iterable[Row]) -> int:
+    """Записывает пачку новостей одной транзакцией в потоке-писателе (executemany + один commit)"""
+    data = [_row(r) for r in rows]
+    if not data:
+        return 0
+    try:
+        _writer().executemany(_INSERT_SQL, data).result()
+        return len(data)
+    except Exception as e:
+        print(f"⚠️ Ошибка записи в news cache: {e}")
+        return 0
+
+class BatchWriter:
+    """Копит строки и пишет их insert_many по BATCH_SIZE штук или при выходе из with"""
+
+    def __init__(self, size: int = BATCH_SIZE):
+        self.size = size
+        self.rows: List[Tuple] = []
+        self.written = 0
+
+    def add(self, row: Row) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        rows, self.rows = self.rows, []
+        self.written += insert_many(rows)
+
+@contextlib.contextmanager
+def batch(size: int = BATCH_SIZE):
+    """
+    Пакетная запись: все insert() в этом потоке внутри with уходят одним commit.
+
+        with batch() as writer:
+            for h in headlines:
+                insert(dt, ticker, h, 0, "rss")
+    """
+    outer = getattr(_local, "batch", None)
+    if outer is not None:          # вложенный batch — пишем во внешний
+        yield outer
+        return
+    writer = _local.batch = BatchWriter(size)
+    try:
+        yield writer
+    finally:
+        _local.batch = None
+        writer.flush()
+
+def get_recent_news(ticker: str = None, hours: int = 24, limit: int = None):
+    """Получает недавние новости из кэша (новые первыми)"""
+    query = "SELECT dt, ticker, headline, label, source, confidence FROM news WHERE dt > ?"
+    params = [since(hours)]
+
+    if ticker:
+        query += " AND ticker = ?"
+        params.append(ticker)
+
+    query += " ORDER BY dt DESC"
+
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    return _conn().execute(query, params).fetchall()
 
 def get_stats():
     """Статистика кэша новостей"""
-    with _lock:
-        cursor = _CONN.execute("SELECT COUNT(*) FROM news")
-        total = cursor.fetchone()[0]
-        
-        cursor = _CONN.execute("SELECT source, COUNT(*) FROM news GROUP BY source")
-        by_source = dict(cursor.fetchall())
-        
-        cursor = _CONN.execute("SELECT COUNT(*) FROM news WHERE datetime(dt) > datetime('now', '-24 hours')")
-        recent_24h = cursor.fetchone()[0]
-        
-        return {
-            "total_entries": total,
-            "recent_24h": recent_24h,
-            "by_source": by_source
-        }
+    conn = _conn()
+    total = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+    by_source = dict(conn.execute("SELECT source, COUNT(*) FROM news GROUP BY source").fetchall())
+    recent_24h = conn.execute("SELECT COUNT(*) FROM news WHERE dt > ?", (since(24),)).fetchone()[0]
+
+    return {
+        "total_entries": total,
+        "recent_24h": recent_24h,
+        "by_source": by_source
+    }
+
+def get_ticker_sentiments(ticker: str, hours: int = 24):
+    """
+    (sentiment, timestamp) LLM-разметок по тикеру за период, новые первыми.
+
+    Берутся строки sentiment_cache с этим тикером и разметки новостей тикера
+    через news.sentiment_hash → sentiment_cache.text_hash — одним запросом.
+    """
+    query = """
+        SELECT sentiment, timestamp FROM sentiment_cache WHERE id IN (
+            SELECT id FROM sentiment_cache WHERE ticker = ? AND timestamp > ?
+            UNION
+            SELECT s.id FROM news n JOIN sentiment_cache s ON s.text_hash = n.sentiment_hash
+            WHERE n.ticker = ? AND n.dt > ?)
+        ORDER BY timestamp DESC"""
+    params = (ticker, since(hours, TS_FORMAT), ticker, since(hours))
+    return _conn().execute(query, params).fetchall()
+
+def _ticker_for_figi(figi: str) -> str:
+    """FIGI → тикер по алиасам nlp.entities (если не найден — сам FIGI)"""
+    from nlp.entities import get_matcher
+    found = sorted(get_matcher().match(figi))
+    return found[0] if found else figi
+
+def _number(value, cast=float):
+    return None if value is None or value != value else cast(value)
+
+def insert_candles(figi: str, interval: str, df, ticker: Optional[str] = None):
+    """
+    Дописывает закрытые свечи (DataFrame с колонками time/open/high/low/close/volume) в candles.
+
+    Уже сохранённые бары не меняются. Запись не ждёт писателя — возвращается его Future.
+    """
+    ticker = ticker or _ticker_for_figi(figi)
+    rows = [(figi, ticker, interval, normalize_dt(r["time"]),
+             _number(r.get("open")), _number(r.get("high")), _number(r.get("low")),
+             _number(r.get("close")), _number(r.get("volume"), int))
+            for r in df.to_dict("records")]
+    return _writer().executemany(
+        """INSERT OR IGNORE INTO candles(figi, ticker, interval, time, open, high, low, close, volume)
+           VALUES (?,?,?,?,?,?,?,?,?)""", rows)
+
+def get_candle_history(ticker: str, interval: str = "hour",
+                       start: Union[str, datetime, None] = None, end: Union[str, datetime, None] = None):
+    """Свечи тикера (или FIGI) из candles за [start, end) как DataFrame по возрастанию времени"""
+    import pandas as pd
+
+    query = """SELECT time, open, high, low, close, volume FROM candles
+               WHERE (ticker = ? OR figi = ?) AND interval = ?"""
+    params = [ticker, ticker, interval]
+    if start is not None:
+        query += " AND time >= ?"
+        params.append(normalize_dt(start))
+    if end is not None:
+        query += " AND time < ?"
+        params.append(normalize_dt(end))
+    df = pd.read_sql_query(query + " ORDER BY time", _conn(), params=params)
+    df["time"] = pd.to_datetime(df["time"])
+    return df
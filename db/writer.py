@@ -0,0 +1,248 @@
+"""
+Один поток-писатель на файл SQLite.
+
+Все записи в базу идут через очередь писателя: он владеет единственным
+пишущим подключением и сливает накопившиеся операции группами — одна
+транзакция (один commit) на группу, каждая операция под своим SAVEPOINT,
+так что ошибка одной не откатывает соседние. Вызывающий поток получает
+Future и ждёт только свой результат.
+
+Чтение — через reader(path): отдельное read-only подключение на поток
+(WAL позволяет читать параллельно с записью и не ждать commit писателя).
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional
+
+WRITER_GROUP = int(os.getenv("DB_WRITER_GROUP", "256"))     # максимум операций в одной транзакции
+
+_STOP = object()
+
+
+class Writer:
+    """Поток-владелец пишущего подключения к одному файлу базы"""
+
+    def __init__(self, path: str, init: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 group: int = WRITER_GROUP, prepare: Optional[Callable[[sqlite3.Connection], None]] = None):
+        """
+        init — схема/миграции после включения WAL; prepare — до него, пока новый
+        файл ещё пуст (PRAGMA, которые действуют только при создании базы: auto_vacuum, page_size).
+        """
+        self.path = path
+        self.group = group
+        self._queue: "queue.Queue" = queue.Queue()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._dead = False              # поток вышел: новые вызовы сразу получают ошибку
+        self._init_error: Optional[BaseException] = None
+        self.commits = 0
+        self._thread = threading.Thread(target=self._run, args=(init, prepare), daemon=True,
+                                        name=f"sqlite-writer:{os.path.basename(path)}")
+        self._thread.start()
+        self._ready.wait()
+        if self._init_error is not None:
+            raise self._init_error
+
+    # ── API ─────────────────────────────────────────────────────────
+    def call(self, fn: Callable[[sqlite3.Connection], object], transactional: bool = True) -> Future:
+        """
+        Выполняет fn(conn) в потоке писателя.
+
+        transactional=False — вне транзакции (VACUUM, PRAGMA incremental_vacuum и т.п.).
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._dead:
+                future.set_exception(sqlite3.OperationalError(f"писатель {self.path} остановлен"))
+            else:
+                self._queue.put((fn, transactional, future))
+        return future
+
+    def execute(self, sql: str, params: Iterable = ()) -> Future:
+        """Future с rowcount"""
+        return self.call(lambda conn: conn.execute(sql, tuple(params)).rowcount)
+
+    def executemany(self, sql: str, rows: Iterable[Iterable]) -> Future:
+        rows = [tuple(r) for r in rows]
+        return self.call(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def flush(self) -> None:
+        """Ждёт, пока писатель выполнит всё, что было поставлено до вызова"""
+        self.call(lambda conn: None).result()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    # ── поток писателя ──────────────────────────────────────────────
+    def _run(self, init, prepare) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None)    # транзакции — явно
+            if prepare is not None:
+                prepare(conn)
+            conn.execute("PRAGMA journal_mode=WAL")                    # здесь новый файл уже создаётся
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if init is not None:
+                init(conn)
+        except BaseException as e:
+            self._init_error = e
+            self._dead = True
+            self._ready.set()
+            return
+        self._ready.set()
+
+        try:
+            stop = False
+            while not stop:
+                batch = [self._queue.get()]
+                while len(batch) < self.group:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    stop = self._drain(conn, batch)
+                except Exception as e:       # сбой вне операции (BEGIN, SAVEPOINT) — ошибка группе, поток живёт
+                    self._rollback(conn)
+                    stop = self._fail(batch, e)
+        finally:
+            with self._lock:
+                self._dead = True
+            self._fail(self._pending(), sqlite3.OperationalError(f"писатель {self.path} остановлен"))
+            conn.close()
+
+    def _pending(self) -> list:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    @staticmethod
+    def _fail(batch, error: BaseException) -> bool:
+        """Ошибка всем незавершённым операциям группы; True — в группе был сигнал остановки"""
+        stop = False
+        for item in batch:
+            if item is _STOP:
+                stop = True
+            elif not item[2].done():
+                item[2].set_exception(error)
+        return stop
+
+    @staticmethod
+    def _rollback(conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def _drain(self, conn: sqlite3.Connection, batch) -> bool:
+        """Выполняет группу операций; результаты отдаются только после commit"""
+        done = []
+        in_tx = False
+        stop = False
+
+        def commit():
+            nonlocal in_tx
+            if in_tx:
+                conn.execute("COMMIT")
+                self.commits += 1
+                in_tx = False
+            for future, ok, value in done:
+                future.set_result(value) if ok else future.set_exception(value)
+            done.clear()
+
+        for item in batch:
+            if item is _STOP:
+                stop = True
+                continue
+            fn, transactional, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            if not transactional:
+                commit()
+                try:
+                    future.set_result(fn(conn))
+                except Exception as e:
+                    future.set_exception(e)
+                continue
+
+            if not in_tx:
+                conn.execute("BEGIN IMMEDIATE")
+                in_tx = True
+            conn.execute("SAVEPOINT op")
+            try:
+                value = fn(conn)
+                conn.execute("RELEASE op")
+                done.append((future, True, value))
+            except Exception as e:
+                conn.execute("ROLLBACK TO op")
+                conn.execute("RELEASE op")
+                done.append((future, False, e))
+
+        try:
+            commit()
+        except Exception as e:           # commit не прошёл — ошибка всем участникам группы
+            self._rollback(conn)
+            for future, _, _ in done:
+                future.set_exception(e)
+            done.clear()
+        return stop
+
+
+_writers: Dict[str, Writer] = {}
+_writers_lock = threading.Lock()
+_readers = threading.local()
+
+
+def get_writer(path: str, init: Optional[Callable[[sqlite3.Connection], None]] = None,
+               prepare: Optional[Callable[[sqlite3.Connection], None]] = None) -> Writer:
+    """Писатель для файла (создаётся при первом обращении; prepare и init выполняются в его потоке)"""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = Writer(path, init, prepare=prepare)
+        return writer
+
+
+def reader(path: str) -> sqlite3.Connection:
+    """Read-only подключение текущего потока к файлу"""
+    key = os.path.abspath(path)
+    conns = getattr(_readers, "conns", None)
+    if conns is None:
+        conns = _readers.conns = {}
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = sqlite3.connect(f"file:{key}?mode=ro", uri=True)
+    return conn
+
+
+def close(path: str) -> None:
+    """Останавливает писателя файла и закрывает read-подключение текущего потока"""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.pop(key, None)
+    if writer is not None:
+        writer.close()
+    conn = getattr(_readers, "conns", {}).pop(key, None)
+    if conn is not None:
+        conn.close()
+
+
+@atexit.register
+def close_all() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
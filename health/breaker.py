@@ -0,0 +1,120 @@
+"""
+Circuit breaker и оценка здоровья для каждого источника новостей.
+
+Состояния: closed (работаем) → open (источник мёртв, не ходим) → half-open
+(после паузы пропускаем одну пробу; успех закрывает, провал снова открывает
+с удвоенной паузой). Источники сообщают о себе через health.metrics.record
+событиями с полями "source" и "ok".
+"""
+import os
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+FAIL_THRESHOLD = int(os.getenv("BREAKER_FAILS", "3"))           # ошибок подряд до open
+COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))           # пауза до пробы, сек
+MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", "900"))
+_ALPHA = 0.2                                                    # сглаживание health score
+
+
+class CircuitBreaker:
+    """Состояние одного источника"""
+
+    def __init__(self, name: str, fail_threshold: int = FAIL_THRESHOLD,
+                 cooldown: float = COOLDOWN, max_cooldown: float = MAX_COOLDOWN):
+        self.name = name
+        self.fail_threshold = fail_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.score = 1.0               # EWMA доли успешных запросов
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли сейчас обращаться к источнику"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True       # пропускаем ровно одну пробу
+                return True
+            return False
+
+    def report(self, ok: bool) -> None:
+        """Учитывает результат обращения"""
+        with self._lock:
+            self.score = (1 - _ALPHA) * self.score + _ALPHA * (1.0 if ok else 0.0)
+            if ok:
+                self.state = CLOSED
+                self.failures = 0
+                self.cooldown = self.base_cooldown
+                self._probing = False
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.fail_threshold:
+                self._open()
+
+    def release(self) -> None:
+        """Проба не состоялась (отменена до запуска) — следующий allow() пропустит новую"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probing = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "score": round(self.score, 3), "failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def source_for(url: str) -> str:
+    """Ключ источника для URL ленты: rss:<host>"""
+    return f"rss:{urlparse(url).netloc or url}"
+
+
+def get(source: str) -> CircuitBreaker:
+    with _lock:
+        br = _breakers.get(source)
+        if br is None:
+            br = _breakers[source] = CircuitBreaker(source)
+        return br
+
+
+def allow(source: str) -> bool:
+    return get(source).allow()
+
+
+def report(source: str, ok: bool) -> None:
+    get(source).report(ok)
+
+
+def release(source: str) -> None:
+    get(source).release()
+
+
+def health_scores() -> Dict[str, Dict]:
+    """{источник: {"state", "score", "failures"}} для всех известных источников"""
+    with _lock:
+        items = list(_breakers.items())
+    return {name: br.snapshot() for name, br in sorted(items)}
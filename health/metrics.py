@@ -4,6 +4,7 @@ import datetime as dt
 import json
 import threading
 from health.alert import register_error
+from health import breaker
 
 _LOG = os.getenv("METRICS_LOGFILE", "health.log")
 _lock = threading.Lock()
@@ -17,6 +18,10 @@ def record(event: str, payload: dict):
     with _lock, open(_LOG, "a") as fh:
         fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
     
+    # Обновляем circuit breaker источника
+    if "source" in payload and "ok" in payload:
+        breaker.report(payload["source"], bool(payload["ok"]))
+
     # Проверяем на ошибки и отправляем алерты
     if event == "rss_batch" and payload.get("fails", 0):
         if payload["fails"] > 0:
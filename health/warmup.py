@@ -0,0 +1,95 @@
+"""
+Прогрев бота после старта.
+
+Шаги (свечи, ленты, подключения, модели) выполняются в фоновых потоках,
+пока бот уже принимает команды; для каждого шага фиксируются состояние и
+время. Готовность видна через /ready и в health.log (событие warmup_step).
+
+BOT_WARMUP=0 — прогрев выключен.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from health.metrics import record
+
+BOT_WARMUP = os.getenv("BOT_WARMUP", "1") == "1"
+
+
+class WarmUp:
+    """Набор шагов прогрева, каждый — в своём потоке"""
+
+    def __init__(self):
+        self._steps: Dict[str, Callable[[], object]] = {}
+        self._status: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self.started_at: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], object]) -> "WarmUp":
+        self._steps[name] = fn
+        self._status[name] = {"state": "pending", "seconds": None, "detail": None}
+        return self
+
+    def _run(self, name: str, fn: Callable[[], object]) -> None:
+        self._set(name, state="running")
+        t0 = time.perf_counter()
+        try:
+            detail = fn()
+            state, ok = "ok", True
+        except Exception as e:
+            detail, state, ok = str(e), "fail", False
+        seconds = round(time.perf_counter() - t0, 3)
+        self._set(name, state=state, seconds=seconds, detail=detail)
+        record("warmup_step", {"step": name, "ok": ok, "seconds": seconds})
+        print(f"{'🔥' if ok else '⚠️'} Прогрев {name}: {state} за {seconds:.2f} с")
+
+    def _set(self, name: str, **fields) -> None:
+        with self._lock:
+            self._status[name].update(fields)
+
+    def start(self) -> "WarmUp":
+        """Запускает все шаги параллельно и сразу возвращается"""
+        self.started_at = time.time()
+        for name, fn in self._steps.items():
+            thread = threading.Thread(target=self._run, args=(name, fn),
+                                      daemon=True, name=f"warmup-{name}")
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт окончания шагов (не дольше timeout); True — всё завершено"""
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.time()))
+        return self.ready()
+
+    def ready(self) -> bool:
+        """Все шаги завершены (успешно или с ошибкой)"""
+        with self._lock:
+            return bool(self._status) and all(s["state"] in ("ok", "fail") for s in self._status.values())
+
+    def report(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+
+_current: Optional[WarmUp] = None
+
+
+def start(steps: Dict[str, Callable[[], object]]) -> Optional[WarmUp]:
+    """Запускает прогрев процесса (если BOT_WARMUP не выключен)"""
+    global _current
+    if not BOT_WARMUP:
+        return None
+    warm = WarmUp()
+    for name, fn in steps.items():
+        warm.add(name, fn)
+    _current = warm.start()
+    return _current
+
+
+def current() -> Optional[WarmUp]:
+    return _current
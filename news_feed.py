@@ -4,6 +4,7 @@ import requests
 import datetime as dt
 import os
 from health.metrics import record
+from health import breaker
 
 # Переменная для отключения GDELT (по умолчанию отключен)
 GDELT_ENABLED = os.getenv("GDELT_ENABLED", "0") == "1"
@@ -26,7 +27,9 @@ def _newsapi_query(q, from_dt):
     retrieved = len(resp.get("articles", []))
     record("newsapi_call", {
         "ticker": q,
-        "articles": retrieved
+        "articles": retrieved,
+        "source": "newsapi",
+        "ok": True
     })
     return [a["title"] for a in resp.get("articles", [])]
 
@@ -41,7 +44,10 @@ def fetch_news(ticker: str, hours: int = 24) -> list[str]:
     news = []
 
     # NewsAPI
-    if NEWSAPI_KEY:
+    if NEWSAPI_KEY and not breaker.allow("newsapi"):
+        print("⏭️ NewsAPI пропущен: источник недоступен (circuit open)")
+        newsapi_results = []
+    elif NEWSAPI_KEY:
         print(f"📰 Запрашиваем NewsAPI для {ticker}...")
         try:
             newsapi_results = _newsapi_query(ticker, cutoff)
@@ -49,6 +55,7 @@ def fetch_news(ticker: str, hours: int = 24) -> list[str]:
             print(f"✅ NewsAPI: найдено {len(newsapi_results)} новостей")
         except Exception as e:
             print(f"❌ NewsAPI ошибка: {e}")
+            record("newsapi_error", {"ticker": ticker, "source": "newsapi", "ok": False})
             newsapi_results = []
     else:
         print("⚠️ NewsAPI не настроен (нет NEWSAPI_KEY)")
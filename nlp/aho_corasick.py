@@ -0,0 +1,66 @@
+"""
+Автомат Ахо–Корасик: поиск всех шаблонов за один линейный проход по тексту.
+
+Используется для тегирования заголовков тикерами (nlp.entities), чтобы
+стоимость разметки не зависела от числа отслеживаемых инструментов.
+"""
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class Automaton:
+    """Набор шаблонов с полезной нагрузкой; после build() — поиск за O(len(text))"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]   # (длина шаблона, payload)
+        self._built = False
+
+    def add(self, pattern: str, payload: Any) -> None:
+        """Добавляет шаблон (регистр не меняется — нормализуйте заранее)"""
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self) -> "Automaton":
+        """Строит fail-ссылки обходом в ширину"""
+        queue = deque(self._goto[0].values())
+        for s in queue:
+            self._fail[s] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Возвращает (start, end, payload) для каждого вхождения, включая перекрывающиеся"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in out[state]:
+                yield i - length + 1, i + 1, payload
@@ -0,0 +1,108 @@
+"""
+Схлопывание почти-дубликатов заголовков (SimHash) перед классификацией.
+
+Одна и та же новость приходит из ТАСС, Интерфакса, РБК и NewsAPI с небольшими
+отличиями в формулировке. Кластеризуем варианты, классифицируем один
+представитель на кластер и запоминаем размер кластера.
+
+Близкие по SimHash заголовки с разной лексиконной тональностью («увеличил
+прибыль» / «сократил прибыль») не склеиваются: это разные новости.
+"""
+import hashlib
+import os
+import re
+from typing import Dict, List
+
+DEDUP_DISTANCE = int(os.getenv("DEDUP_DISTANCE", "12"))       # порог Хэмминга (из 64 бит)
+
+_SHINGLE = 4
+_BITS = 64
+
+# хвосты вида " - РБК", " | Интерфакс", " — ТАСС"
+_SOURCE_TAIL = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,40}$")
+_NON_WORD = re.compile(r"[^\w%]+")
+# то же, но знаки (+5% / -5%) и десятичные разделители между цифрами (7,5%) остаются
+_NON_WORD_SIGNED = re.compile(r"(?:[^\w%+\-−.,]|(?<!\d)[.,]|[.,](?!\d))+")
+
+
+def normalize(text: str, keep_signs: bool = False) -> str:
+    """
+    Нормализует заголовок: регистр, ё→е, без хвоста источника и пунктуации.
+
+    keep_signs=True сохраняет +, -, − и «7,5» / «7.5»: для ключей, где
+    «SBER +5%» и «SBER -5%» — разные новости (db.storage.headline_hash).
+    """
+    text = _SOURCE_TAIL.sub("", (text or "").strip())
+    text = text.lower().replace("ё", "е")
+    if keep_signs:
+        return _NON_WORD_SIGNED.sub(" ", text.replace("−", "-")).strip()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def simhash(text: str) -> int:
+    """64-битный SimHash по символьным 4-граммам нормализованного текста"""
+    norm = normalize(text)
+    if len(norm) <= _SHINGLE:
+        shingles = [norm]
+    else:
+        shingles = [norm[i:i + _SHINGLE] for i in range(len(norm) - _SHINGLE + 1)]
+
+    acc = [0] * _BITS
+    for sh in shingles:
+        h = int.from_bytes(hashlib.blake2b(sh.encode(), digest_size=8).digest(), "big")
+        for bit in range(_BITS):
+            acc[bit] += 1 if (h >> bit) & 1 else -1
+
+    value = 0
+    for bit in range(_BITS):
+        if acc[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def polarity(text: str) -> int:
+    """Знак лексиконной тональности заголовка: +1 / -1 / 0"""
+    from nlp.lexicon import FINANCIAL_LEXICON
+
+    signals = FINANCIAL_LEXICON.score(text)
+    diff = signals["positive"] - signals["negative"]
+    return (diff > 0) - (diff < 0)
+
+
+def cluster(texts: List[str], max_distance: int = DEDUP_DISTANCE) -> List[Dict]:
+    """
+    Группирует почти одинаковые заголовки.
+
+    Args:
+        texts: Заголовки.
+        max_distance: Максимальное расстояние Хэмминга между SimHash.
+
+    Returns:
+        [{"text": представитель, "size": N, "indices": [...]}] в порядке первого появления.
+    """
+    clusters: List[Dict] = []
+
+    for idx, text in enumerate(texts):
+        if not text:
+            continue
+        h = simhash(text)
+        sign = polarity(text)
+
+        target = None
+        for cid, c in enumerate(clusters):
+            if c["polarity"] == sign and hamming(h, c["hash"]) <= max_distance:
+                target = cid
+                break
+
+        if target is None:
+            target = len(clusters)
+            clusters.append({"text": text, "hash": h, "polarity": sign, "size": 0, "indices": []})
+
+        clusters[target]["size"] += 1
+        clusters[target]["indices"].append(idx)
+
+    return [{"text": c["text"], "size": c["size"], "indices": c["indices"]} for c in clusters]
@@ -0,0 +1,87 @@
+"""
+Сопоставление заголовков с тикерами по словарю синонимов (RU/EN названия, FIGI).
+
+Матчер строится один раз и размечает заголовок всеми найденными тикерами
+за один проход автомата Ахо–Корасик.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+from nlp.aho_corasick import Automaton
+
+# Синонимы тикеров. Суффикс "*" — основа слова: допускаются окончания
+# ("Сбербанк*" найдёт "Сбербанка", "Сбербанку"); без "*" — только целое слово.
+TICKER_ALIASES: Dict[str, List[str]] = {
+    "SBER": ["SBER", "BBG0047315Y7", "Sberbank", "Сбербанк*", "Сбер"],
+    "GAZP": ["GAZP", "BBG004730RP0", "Gazprom", "Газпром*"],
+    "LKOH": ["LKOH", "BBG004730ZJ9", "Lukoil", "Лукойл*"],
+    "YNDX": ["YNDX", "BBG004730N88", "Yandex", "Яндекс*"],
+    "FXIT": ["FXIT", "BBG00Y91R9T3"],
+    "NVTK": ["NVTK", "Novatek", "Новатэк*", "Новатек*"],
+    "NVDA": ["NVDA", "BBG000BBJQV0", "Nvidia", "Нвидиа*"],
+    "AMD":  ["AMD", "BBG000BBQCY0", "Advanced Micro Devices"],
+}
+
+
+def _norm(text: str) -> str:
+    """Приводит текст к виду для поиска (регистр и ё→е; длина строки не меняется)"""
+    return text.lower().replace("ё", "е")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class EntityMatcher:
+    """Размечает тексты тикерами за один линейный проход"""
+
+    def __init__(self, aliases: Dict[str, Iterable[str]]):
+        self._automaton = Automaton()
+        self._tickers: Set[str] = set()
+        for ticker, names in aliases.items():
+            ticker = ticker.upper()
+            self._tickers.add(ticker)
+            for name in list(names) + [ticker]:
+                is_stem = name.endswith("*")
+                pattern = _norm(name.rstrip("*"))
+                self._automaton.add(pattern, (ticker, is_stem))
+        self._automaton.build()
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker.upper() in self._tickers
+
+    @property
+    def tickers(self) -> Set[str]:
+        return set(self._tickers)
+
+    def match(self, text: str) -> Set[str]:
+        """Возвращает множество тикеров, упомянутых в тексте"""
+        if not text:
+            return set()
+        norm = _norm(text)
+        found: Set[str] = set()
+        for start, end, (ticker, is_stem) in self._automaton.iter(norm):
+            if ticker in found:
+                continue
+            if start > 0 and _is_word_char(norm[start - 1]):
+                continue
+            if not is_stem and end < len(norm) and _is_word_char(norm[end]):
+                continue
+            found.add(ticker)
+        return found
+
+    def tag(self, texts: Iterable[str]) -> List[Tuple[str, Set[str]]]:
+        """Размечает список заголовков: [(текст, {тикеры})]"""
+        return [(t, self.match(t)) for t in texts]
+
+    def mentions(self, text: str, query: str) -> bool:
+        """Упоминается ли query в тексте; для неизвестных тикеров — подстрока"""
+        if query in self:
+            return query.upper() in self.match(text)
+        return _norm(query) in _norm(text or "")
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> EntityMatcher:
+    """Общий матчер по TICKER_ALIASES (строится один раз на процесс)"""
+    return EntityMatcher(TICKER_ALIASES)
@@ -0,0 +1,104 @@
+"""
+Снимки RSS-лент на диске: тело ленты + распарсенные записи + время загрузки.
+
+- после рестарта бота свежие снимки (моложе FEED_SNAPSHOT_TTL) отдаются
+  вместо сети, так что нет «холодного» залпа по всем лентам;
+- NEWS_REPLAY=1 — офлайн-режим: в сеть не ходим, отдаём снимки любой давности
+  (детерминированные бенчмарки и тесты новостного пайплайна).
+
+Формат: файл <sha1(url)>.<kind>.json.gz, kind = "body" (сырой XML из
+nlp.news_rss_async) или "items" (записи из nlp.news_feed).
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_DIR = os.getenv("FEED_SNAPSHOT_DIR", "db/feed_snapshots")
+SNAPSHOT_TTL = int(os.getenv("FEED_SNAPSHOT_TTL", "900"))      # 15 мин, как _CACHE
+
+
+def replay_mode() -> bool:
+    return os.getenv("NEWS_REPLAY", "0") == "1"
+
+
+def _path(url: str, kind: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{hashlib.sha1(url.encode()).hexdigest()}.{kind}.json.gz")
+
+
+def _encode_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for item in items:
+        item = dict(item)
+        if isinstance(item.get("dt"), datetime):
+            item["dt"] = item["dt"].isoformat()
+        out.append(item)
+    return out
+
+
+def _decode_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for item in items:
+        if item.get("dt"):
+            item["dt"] = datetime.fromisoformat(item["dt"])
+    return items
+
+
+def _save(url: str, kind: str, data: Any, fetched_at: Optional[float]) -> None:
+    if replay_mode():
+        return                       # в replay снимки только читаем
+    rec = {
+        "url": url,
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+        "data": data,
+    }
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = _path(url, kind)
+        tmp = f"{path}.{os.getpid()}.tmp"        # атомарно: временный файл + rename
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            json.dump(rec, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Снимок ленты {url} не сохранён: {e}")
+
+
+def save_body(url: str, body: str, fetched_at: Optional[float] = None) -> None:
+    """Сохраняет сырое тело ленты"""
+    _save(url, "body", body, fetched_at)
+
+
+def save_items(url: str, items: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+    """Сохраняет распарсенные записи ленты"""
+    _save(url, "items", _encode_items(items), fetched_at)
+
+
+def load(url: str, kind: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Читает снимок ленты.
+
+    Args:
+        url: Адрес ленты.
+        kind: "body" или "items".
+        max_age: Максимальный возраст в секундах (None — любой).
+
+    Returns:
+        {"url", "fetched_at", "data"} или None.
+    """
+    try:
+        with gzip.open(_path(url, kind), "rt", encoding="utf-8") as fh:
+            rec = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if max_age is not None and time.time() - rec["fetched_at"] > max_age:
+        return None
+    if kind == "items":
+        rec["data"] = _decode_items(rec["data"])
+    return rec
+
+
+def lookup(url: str, kind: str) -> Optional[Dict[str, Any]]:
+    """Снимок, который можно отдать вместо сети: любой в replay, иначе только свежий"""
+    return load(url, kind, None if replay_mode() else SNAPSHOT_TTL)
@@ -0,0 +1,54 @@
+"""
+Быстрый детерминированный роутер языка для nlp.sentiment.
+
+Основной путь — доля кириллицы среди букв первых 200 символов. Только для
+смешанных текстов (доля между порогами) вызывается langdetect, с фиксированным
+seed и кэшем по тексту.
+"""
+from functools import lru_cache
+from typing import Dict, List
+
+RU_RATIO = 0.6        # ≥ — точно русский
+EN_RATIO = 0.2        # ≤ — точно не русский
+_PREFIX = 200
+
+
+def _script_ratio(text: str) -> float:
+    """Доля кириллических букв среди всех букв (кириллица + латиница); -1 если букв нет"""
+    cyr = lat = 0
+    for ch in text[:_PREFIX]:
+        if "а" <= ch <= "я" or "А" <= ch <= "Я" or ch in "ёЁ":
+            cyr += 1
+        elif "a" <= ch <= "z" or "A" <= ch <= "Z":
+            lat += 1
+    total = cyr + lat
+    return cyr / total if total else -1.0
+
+
+@lru_cache(maxsize=4096)
+def _fallback_detect(prefix: str, ratio: float) -> str:
+    """langdetect для смешанных текстов (детерминированно: seed=0)"""
+    try:
+        from langdetect import DetectorFactory, detect
+        DetectorFactory.seed = 0
+        return "ru" if detect(prefix) == "ru" else "en"
+    except Exception:
+        return "ru" if ratio >= 0.5 else "en"
+
+
+def detect_lang(text: str) -> str:
+    """Возвращает 'ru' или 'en' — к какой группе моделей отправить текст"""
+    ratio = _script_ratio(text or "")
+    if ratio >= RU_RATIO:
+        return "ru"
+    if ratio <= EN_RATIO:          # включая тексты без букв
+        return "en"
+    return _fallback_detect(text[:_PREFIX], ratio)
+
+
+def partition(texts: List[str]) -> Dict[str, List[int]]:
+    """Разбивает список заголовков на корзины {'ru': [индексы], 'en': [индексы]}"""
+    buckets: Dict[str, List[int]] = {"ru": [], "en": []}
+    for i, text in enumerate(texts):
+        buckets[detect_lang(text)].append(i)
+    return buckets
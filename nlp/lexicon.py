@@ -0,0 +1,127 @@
+"""
+Лексиконный скорер: все термины с весами и языком собраны в один автомат
+Ахо–Корасик при импорте, заголовок оценивается за один проход.
+
+Семантика совпадает с прежними циклами `term in text_lower`: термин —
+подстрока текста в нижнем регистре, каждый термин учитывается один раз.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from nlp.aho_corasick import Automaton
+
+CATEGORIES = ("positive", "negative", "neutral")
+
+# Финансовые словари ensemble-анализатора (категория → язык → основы слов)
+FINANCIAL_TERMS = {
+    'strong_positive': {
+        'ru': ['рекорд', 'взлет', 'скачок', 'бум', 'превзош', 'прорыв', 'резкий рост'],
+        'en': ['breakthrough', 'surge', 'soar', 'rally', 'boom', 'outperform', 'beat']
+    },
+    'moderate_positive': {
+        'ru': ['выросли', 'рост', 'увелич', 'повыш', 'улучш', 'прибыль', 'доход'],
+        'en': ['improved', 'gained', 'rise', 'increase', 'profit', 'earnings', 'revenue']
+    },
+    'strong_negative': {
+        'ru': ['обвал', 'крах', 'кризис', 'коллапс', 'катастроф', 'провал'],
+        'en': ['plummet', 'crash', 'collapse', 'crisis', 'catastrophe', 'disaster']
+    },
+    'moderate_negative': {
+        'ru': ['упали', 'снизил', 'сократ', 'падение', 'уменьш', 'убыт', 'потер'],
+        'en': ['declined', 'dropped', 'fell', 'loss', 'decrease', 'down']
+    },
+    'neutral_stable': {
+        'ru': ['стабильн', 'без изменен', 'остал', 'неизменн'],
+        'en': ['remained', 'stable', 'flat', 'unchanged', 'steady']
+    }
+}
+
+# Слова для fallback-классификации без LLM (язык не различается)
+FALLBACK_TERMS = {
+    'positive': [
+        'рост', 'прибыль', 'доход', 'выросли', 'увелич', 'повыш', 'улучш',
+        'rise', 'gain', 'profit', 'increase', 'growth', 'up', 'strong', 'beat'
+    ],
+    'negative': [
+        'падение', 'убыток', 'снизил', 'сократ', 'упали', 'кризис', 'уменьш', 'потер',
+        'decline', 'loss', 'drop', 'fall', 'down', 'weak', 'miss', 'disappoint'
+    ],
+}
+
+
+class Lexicon:
+    """Набор терминов (term, category, weight, lang), скомпилированный в автомат"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float, Optional[str]]]):
+        self.entries: List[Tuple[str, str, float, Optional[str]]] = []
+        self._automaton = Automaton()
+        for term, category, weight, lang in entries:
+            self._automaton.add(term.lower(), len(self.entries))
+            self.entries.append((term, category, weight, lang))
+        self._automaton.build()
+        self._cols = np.array([CATEGORIES.index(cat) for _, cat, _, _ in self.entries], dtype=np.intp)
+        self._weights = np.array([w for _, _, w, _ in self.entries], dtype=float)
+        self._langs = np.array([lang for _, _, _, lang in self.entries], dtype=object)
+
+    def matches(self, text: str) -> set:
+        """Номера терминов, встретившихся в тексте"""
+        return {entry_id for _, _, entry_id in self._automaton.iter((text or "").lower())}
+
+    def score(self, text: str, lang: Optional[str] = None) -> Dict[str, float]:
+        """
+        Суммарные веса по категориям.
+
+        Args:
+            text: Текст.
+            lang: Учитывать только термины этого языка (None — все).
+        """
+        signals = {cat: 0.0 for cat in CATEGORIES}
+        for entry_id in self.matches(text):
+            _, category, weight, term_lang = self.entries[entry_id]
+            if lang is None or term_lang is None or term_lang == lang:
+                signals[category] += weight
+        return signals
+
+    def score_many(self, texts: List[str], langs: Optional[List[Optional[str]]] = None) -> np.ndarray:
+        """Оценки для списка текстов: массив (len(texts), 3) в порядке CATEGORIES"""
+        rows, ids = [], []
+        for row, text in enumerate(texts):
+            for entry_id in self.matches(text):
+                rows.append(row)
+                ids.append(entry_id)
+        rows = np.asarray(rows, dtype=np.intp)
+        ids = np.asarray(ids, dtype=np.intp)
+
+        if langs is not None and len(ids):
+            text_lang = np.asarray(langs, dtype=object)[rows]
+            term_lang = self._langs[ids]
+            keep = (text_lang == None) | (term_lang == None) | (text_lang == term_lang)  # noqa: E711
+            rows, ids = rows[keep], ids[keep]
+
+        out = np.zeros((len(texts), len(CATEGORIES)))
+        np.add.at(out, (rows, self._cols[ids]), self._weights[ids])
+        return out
+
+
+def _financial_entries():
+    for sentiment_type, terms_dict in FINANCIAL_TERMS.items():
+        if 'positive' in sentiment_type:
+            category, weight = 'positive', (2.0 if 'strong' in sentiment_type else 1.0)
+        elif 'negative' in sentiment_type:
+            category, weight = 'negative', (2.0 if 'strong' in sentiment_type else 1.0)
+        else:
+            category, weight = 'neutral', 1.0
+        for lang, terms in terms_dict.items():
+            for term in terms:
+                yield term, category, weight, lang
+
+
+def _fallback_entries():
+    for category, words in FALLBACK_TERMS.items():
+        for word in words:
+            yield word, category, 1.0, None
+
+
+FINANCIAL_LEXICON = Lexicon(_financial_entries())
+FALLBACK_LEXICON = Lexicon(_fallback_entries())
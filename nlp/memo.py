@@ -0,0 +1,182 @@
+"""
+Мемоизация classify_* по нормализованному тексту.
+
+Ключ — хэш заголовка без учёта регистра и лишних пробелов. Знаки, цифры и
+пунктуация в ключе сохраняются: «SBER +5%» и «SBER -5%» — разные записи.
+Кэш ограничен по объёму в байтах и по времени жизни записи, ведёт статистику
+попаданий и, при MEMO_SHARED=1, делит результаты между процессами и
+рестартами через тот же Redis, что и nlp.sentiment_llm.
+"""
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+MEMO_BYTES = int(os.getenv("MEMO_BYTES", str(8 * 1024 * 1024)))     # 8 МБ на пространство имён
+MEMO_TTL = int(os.getenv("MEMO_TTL", str(24 * 3600)))
+MEMO_SHARED = os.getenv("MEMO_SHARED", "0") == "1"
+
+_ENTRY_OVERHEAD = 120        # примерная стоимость записи OrderedDict + кортежа
+
+
+def normalize_key(text: str) -> str:
+    """Ключ кэша: md5 текста в нижнем регистре со схлопнутыми пробелами"""
+    return hashlib.md5(" ".join((text or "").lower().split()).encode()).hexdigest()
+
+
+class Memo:
+    """LRU-кэш с TTL и ограничением по байтам"""
+
+    def __init__(self, namespace: str, max_bytes: int = MEMO_BYTES, ttl: float = MEMO_TTL,
+                 shared: bool = MEMO_SHARED, clock: Callable[[], float] = time.time):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self.clock = clock
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()    # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.shared_hits = self.evictions = 0
+
+    # ── внешнее хранилище (Redis из nlp.sentiment_llm) ──────────────
+    def _redis(self):
+        if not self.shared:
+            return None
+        try:
+            from nlp.sentiment_llm import get_redis
+            client = get_redis()
+        except Exception:
+            return None
+        return None if isinstance(client, dict) else client
+
+    def _redis_key(self, key: str) -> str:
+        return f"memo:{self.namespace}:{key}"
+
+    # ── основной API ────────────────────────────────────────────────
+    def get(self, text: str):
+        """Значение для текста или None"""
+        key = normalize_key(text)
+        now = self.clock()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return item[1]
+                self._drop(key)
+
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(self._redis_key(key))
+            except Exception:
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._put(key, value, now)
+                with self._lock:
+                    self.shared_hits += 1
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, text: str, value) -> None:
+        key = normalize_key(text)
+        self._put(key, value, self.clock())
+        client = self._redis()
+        if client is not None:
+            try:
+                client.setex(self._redis_key(key), int(self.ttl), json.dumps(value))
+            except Exception:
+                pass
+
+    def _put(self, key: str, value, now: float) -> None:
+        size = len(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (now + self.ttl, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_registry: Dict[str, Memo] = {}
+
+
+def get_memo(namespace: str) -> Memo:
+    memo = _registry.get(namespace)
+    if memo is None:
+        memo = _registry.setdefault(namespace, Memo(namespace))
+    return memo
+
+
+def memoize(namespace: str):
+    """Декоратор для функций вида f(text) -> str"""
+    def decorator(fn):
+        memo = get_memo(namespace)
+
+        @functools.wraps(fn)
+        def wrapper(text: str):
+            cached = memo.get(text)
+            if cached is not None:
+                return cached
+            value = fn(text)
+            memo.set(text, value)
+            return value
+
+        wrapper.memo = memo
+        wrapper.cache_clear = memo.clear
+        return wrapper
+    return decorator
+
+
+def memoize_batch(namespace: str, texts: List[str], fn: Callable[[List[str]], List[str]]) -> List[str]:
+    """Батч-версия: fn вызывается только для текстов, которых нет в кэше"""
+    memo = get_memo(namespace)
+    results: List[Optional[str]] = [memo.get(t) for t in texts]
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        for i, value in zip(missing, fn([texts[i] for i in missing])):
+            results[i] = value
+            memo.set(texts[i], value)
+    return results
+
+
+def memo_stats() -> Dict[str, Dict[str, float]]:
+    """Статистика всех пространств имён"""
+    return {name: memo.stats() for name, memo in _registry.items()}
@@ -0,0 +1,197 @@
+"""
+Реестр transformer-моделей: каждая модель грузится один раз на процесс,
+инференс идёт батчами с динамическим паддингом.
+
+Тексты сортируются по длине, режутся на мини-батчи по SENTIMENT_BATCH,
+паддинг — до самого длинного текста в батче, результат возвращается
+в исходном порядке.
+
+Бэкенды (SENTIMENT_BACKEND):
+- torch — исходная float-модель;
+- int8  — динамическая int8-квантизация Linear-слоёв (torch, CPU);
+- onnx  — модель экспортируется в ONNX один раз (MODEL_CACHE_DIR/onnx)
+          и исполняется onnxruntime на CPU.
+Число потоков CPU — SENTIMENT_THREADS (0 — по умолчанию библиотеки).
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+SENTIMENT_BATCH = int(os.getenv("SENTIMENT_BATCH", "32"))
+MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "512"))
+SENTIMENT_THREADS = int(os.getenv("SENTIMENT_THREADS", "0"))
+BACKENDS = ("torch", "int8", "onnx")
+
+_models: Dict[Tuple[str, str], Tuple[object, object]] = {}
+_failed: Dict[Tuple[str, str], str] = {}   # модели, которые не загрузились (не пробуем повторно)
+_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def default_backend() -> str:
+    backend = os.getenv("SENTIMENT_BACKEND", "torch").lower()
+    return backend if backend in BACKENDS else "torch"
+
+
+class _TorchRunner:
+    """Исполнение torch-модели (float или int8)"""
+    return_tensors = "pt"
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, inputs) -> List[List[float]]:
+        import torch
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+            return torch.softmax(logits, dim=-1).tolist()
+
+
+class _OnnxRunner:
+    """Исполнение ONNX-графа через onnxruntime"""
+    return_tensors = "np"
+
+    def __init__(self, session):
+        self.session = session
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, inputs) -> List[List[float]]:
+        import numpy as np
+        feed = {k: np.asarray(inputs[k], dtype=np.int64) for k in self.input_names if k in inputs}
+        logits = self.session.run(None, feed)[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return (exp / exp.sum(axis=-1, keepdims=True)).tolist()
+
+
+def _set_torch_threads():
+    if SENTIMENT_THREADS > 0:
+        import torch
+        torch.set_num_threads(SENTIMENT_THREADS)
+
+
+def onnx_path(name: str) -> str:
+    return os.path.join(MODEL_CACHE_DIR, "onnx", name.replace("/", "__") + ".onnx")
+
+
+def export_onnx(tokenizer, model, path: str) -> str:
+    """Экспортирует модель классификации в ONNX с динамическими batch/seq осями"""
+    import torch
+
+    sample = tokenizer(["Пример заголовка", "Sample headline"], return_tensors="pt", padding=True)
+    names = list(sample.keys())
+
+    class _LogitsOnly(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *args):
+            return self.inner(**dict(zip(names, args))).logits
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dynamic_axes = {n: {0: "batch", 1: "seq"} for n in names}
+    dynamic_axes["logits"] = {0: "batch"}
+    torch.onnx.export(
+        _LogitsOnly(model).eval(), tuple(sample[n] for n in names), path,
+        input_names=names, output_names=["logits"],
+        dynamic_axes=dynamic_axes, opset_version=17, dynamo=False,
+    )
+    return path
+
+
+def _onnx_session(path: str):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    if SENTIMENT_THREADS > 0:
+        opts.intra_op_num_threads = SENTIMENT_THREADS
+    return ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+
+def _load(name: str, backend: str):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    print(f"🔄 Загружаем модель {name} ({backend})...")
+    tokenizer = AutoTokenizer.from_pretrained(name, cache_dir=MODEL_CACHE_DIR)
+
+    if backend == "onnx":
+        path = onnx_path(name)
+        if not os.path.exists(path):
+            model = AutoModelForSequenceClassification.from_pretrained(name, cache_dir=MODEL_CACHE_DIR)
+            export_onnx(tokenizer, model.eval(), path)
+        return tokenizer, _OnnxRunner(_onnx_session(path))
+
+    _set_torch_threads()
+    model = AutoModelForSequenceClassification.from_pretrained(name, cache_dir=MODEL_CACHE_DIR)
+    model.eval()
+    if backend == "int8":
+        import torch
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, _TorchRunner(model)
+
+
+def get_model(name: str, backend: Optional[str] = None):
+    """
+    Возвращает (tokenizer, runner) для модели HuggingFace, загружая её при первом обращении.
+
+    Raises:
+        RuntimeError: если модель не удалось загрузить (ошибка запоминается).
+    """
+    key = (name, backend or default_backend())
+    if key in _models:
+        return _models[key]
+    if key in _failed:
+        raise RuntimeError(_failed[key])
+
+    with _lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if key in _models:
+            return _models[key]
+        if key in _failed:
+            raise RuntimeError(_failed[key])
+        try:
+            _models[key] = _load(*key)
+        except Exception as e:
+            _failed[key] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Модель {name[:20]}... недоступна ({key[1]})")
+            raise RuntimeError(_failed[key]) from e
+        return _models[key]
+
+
+def loaded_models() -> List[Tuple[str, str]]:
+    return list(_models)
+
+
+def predict_proba(name: str, texts: List[str], batch_size: int = SENTIMENT_BATCH,
+                  max_length: int = MAX_LENGTH, backend: Optional[str] = None) -> List[List[float]]:
+    """
+    Вероятности классов модели для каждого текста.
+
+    Args:
+        name: Имя модели HuggingFace.
+        texts: Тексты для классификации.
+        batch_size: Размер мини-батча.
+        max_length: Максимальная длина в токенах.
+        backend: torch / int8 / onnx (по умолчанию SENTIMENT_BACKEND).
+
+    Returns:
+        Список вероятностей (по одному списку на текст) в исходном порядке.
+    """
+    if not texts:
+        return []
+    tokenizer, runner = get_model(name, backend)
+
+    # сортировка по длине → в батче тексты похожей длины, паддинг минимален
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    result: List[List[float]] = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        inputs = tokenizer([texts[i] for i in idx], return_tensors=runner.return_tensors,
+                           padding=True, truncation=True, max_length=max_length)
+        for i, p in zip(idx, runner(inputs)):
+            result[i] = p
+
+    return result
@@ -5,6 +5,27 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import feedparser
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from nlp.entities import get_matcher
+from health.metrics import record
+from health import breaker
+from nlp import feed_snapshot
+
+RSS_FEED_URLS = [
+    "https://lenta.ru/rss/news",
+    "https://www.vesti.ru/vesti.rss",
+    "https://www.interfax.ru/rss.asp",
+]
+
+RSS_FEED_TIMEOUT = float(os.getenv("RSS_FEED_TIMEOUT", "6"))   # на одну ленту
+RSS_DEADLINE = float(os.getenv("RSS_DEADLINE", "10"))          # на все ленты сразу
+RSS_MAX_WORKERS = int(os.getenv("RSS_MAX_WORKERS", "8"))
+RSS_USER_AGENT = "Mozilla/5.0 (compatible; ai-invest-sandbox/0.1)"
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
 
 if os.getenv("GDELT_OFF", "0") != "1":
     def _gdelt_query(query: str, hours: int = 24) -> List[Dict[str, Any]]:
@@ -19,6 +40,9 @@ if os.getenv("GDELT_OFF", "0") != "1":
             List[Dict[str, Any]]: Список статей, полученных из GDELT API.
         """
         endpoint_name = "GDELT"
+        if not breaker.allow("gdelt"):
+            print(f"⏭️ {endpoint_name} пропущен: источник недоступен (circuit open)")
+            return []
         try:
             # GDELT API URL
             url = "https://api.gdeltproject.org/api/v2/doc/doc"
@@ -52,10 +76,12 @@ if os.getenv("GDELT_OFF", "0") != "1":
                             "source": "GDELT"
                         })
 
+            record("gdelt_call", {"ticker": query, "articles": len(articles), "source": "gdelt", "ok": True})
             return articles
 
         except Exception as e:
             print(f"❌ {endpoint_name} ошибка: {type(e).__name__}: {e}")
+            record("gdelt_error", {"ticker": query, "source": "gdelt", "ok": False})
             return []
 else:
     def _gdelt_query(*args, **kwargs):
@@ -116,11 +142,15 @@ def _newsapi_query(query: str, hours: int = 24) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: Список статей, полученных из NewsAPI.
     """
     endpoint_name = "NewsAPI"
+    # нет ключа — ошибка конфигурации, а не сбой источника: breaker не трогаем
+    NEWSAPI_API_KEY = os.getenv("NEWSAPI_API_KEY")
+    if not NEWSAPI_API_KEY:
+        print(f"⚠️ {endpoint_name} пропущен: NEWSAPI_API_KEY не задан")
+        return []
+    if not breaker.allow("newsapi"):
+        print(f"⏭️ {endpoint_name} пропущен: источник недоступен (circuit open)")
+        return []
     try:
-        NEWSAPI_API_KEY = os.getenv("NEWSAPI_API_KEY")
-        if not NEWSAPI_API_KEY:
-            raise ValueError("NewsAPI API key is not set in environment variables.")
-
         url = "https://newsapi.org/v2/everything"
         now = datetime.utcnow()
         time_threshold = now - timedelta(hours=hours)
@@ -148,13 +178,120 @@ def _newsapi_query(query: str, hours: int = 24) -> List[Dict[str, Any]]:
                     "published": article["publishedAt"],
                     "source": article["source"]["name"],
                 })
+        record("newsapi_call", {"ticker": query, "articles": len(articles), "source": "newsapi", "ok": True})
         return articles
 
     except Exception as e:
         print(f"❌ {endpoint_name} ошибка: {type(e).__name__}: {e}")
+        record("newsapi_error", {"ticker": query, "source": "newsapi", "ok": False})
         return []
 
 
+def _entry_dt(entry) -> Optional[datetime]:
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    return datetime(*parsed[:6])     # feedparser отдаёт UTC
+
+
+def _parse_feed(url: str, timeout: float) -> List[Dict[str, Any]]:
+    """Скачивает ленту с таймаутом (feedparser.parse(url) сам таймаута не имеет) и сохраняет снимок"""
+    source = breaker.source_for(url)
+    try:
+        response = requests.get(url, timeout=timeout, headers={"User-Agent": RSS_USER_AGENT})
+        response.raise_for_status()
+    except Exception:
+        record("rss_fetch", {"source": source, "ok": False})
+        raise
+    record("rss_fetch", {"source": source, "ok": True})
+
+    feed = feedparser.parse(response.content)
+    items = [{
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "summary": entry.get("summary", ""),
+        "published": entry.get("published", ""),
+        "dt": _entry_dt(entry),
+        "source": url,
+    } for entry in feed.entries]
+    feed_snapshot.save_items(url, items)
+    return items
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=RSS_MAX_WORKERS, thread_name_prefix="rss")
+        return _POOL
+
+
+def fetch_feeds(urls: List[str], timeout: float = None, deadline: float = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Параллельно скачивает и парсит RSS-ленты на ограниченном пуле потоков.
+
+    Свежие снимки с диска (nlp.feed_snapshot) используются без сети;
+    в режиме NEWS_REPLAY=1 в сеть не ходим вовсе.
+
+    Args:
+        urls (List[str]): Адреса лент.
+        timeout (float, optional): Таймаут одной ленты. Defaults to RSS_FEED_TIMEOUT.
+        deadline (float, optional): Общий дедлайн на все ленты. Defaults to RSS_DEADLINE.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: {url: записи ленты} — только ленты, успевшие к дедлайну.
+    """
+    timeout = RSS_FEED_TIMEOUT if timeout is None else timeout
+    deadline = RSS_DEADLINE if deadline is None else deadline
+
+    feeds = {}
+    pending = []
+    for url in urls:
+        snap = feed_snapshot.lookup(url, "items")
+        if snap is not None:
+            feeds[url] = snap["data"]
+        elif not feed_snapshot.replay_mode():
+            pending.append(url)
+
+    # источники с открытым circuit breaker пропускаем сразу
+    pending = [url for url in pending if breaker.allow(breaker.source_for(url))]
+    if not pending:
+        return feeds
+
+    pool = _get_pool()
+    futures = {pool.submit(_parse_feed, url, timeout): url for url in pending}
+    done, not_done = wait(futures, timeout=deadline)
+
+    for fut in done:
+        url = futures[fut]
+        try:
+            feeds[url] = fut.result()
+        except Exception as e:
+            print(f"⚠️ RSS {url}: {type(e).__name__}: {e}")
+    for fut in not_done:
+        if fut.cancel():
+            # задача не успела стартовать и о себе не сообщит — освобождаем пробу half-open
+            breaker.release(breaker.source_for(futures[fut]))
+        print(f"⏰ RSS {futures[fut]}: не успела к дедлайну {deadline}s")
+    return feeds
+
+
+def fetch_rss_entries(urls: List[str] = None, timeout: float = None, deadline: float = None) -> List[Dict[str, Any]]:
+    """
+    Возвращает записи всех лент в едином формате.
+
+    Args:
+        urls (List[str], optional): Адреса лент. Defaults to RSS_FEED_URLS.
+        timeout (float, optional): Таймаут одной ленты.
+        deadline (float, optional): Общий дедлайн.
+
+    Returns:
+        List[Dict[str, Any]]: Записи с ключами title, link, summary, published, dt (UTC), source.
+    """
+    feeds = fetch_feeds(RSS_FEED_URLS if urls is None else urls, timeout, deadline)
+    return [item for items in feeds.values() for item in items]
+
+
 def _rss_query(query: str) -> List[Dict[str, Any]]:
     """
     Выполняет запросы к RSS-лентам для получения статей.
@@ -167,26 +304,12 @@ def _rss_query(query: str) -> List[Dict[str, Any]]:
     """
     endpoint_name = "RSS"
     try:
-        RSS_FEED_URLS = [
-            "https://lenta.ru/rss/news",
-            "https://www.vesti.ru/vesti.rss",
-            "https://www.interfax.ru/rss.asp",
+        matcher = get_matcher()
+        return [
+            art for art in fetch_rss_entries(RSS_FEED_URLS)
+            if matcher.mentions(art["title"], query) or matcher.mentions(art["summary"], query)
         ]
 
-        articles = []
-        for url in RSS_FEED_URLS:
-            feed = feedparser.parse(url)
-            for entry in feed.entries:
-                if query.lower() in entry.title.lower() or query.lower() in entry.summary.lower():
-                    articles.append({
-                        "title": entry.title,
-                        "link": entry.link,
-                        "summary": entry.summary,
-                        "published": entry.published,
-                        "source": url,
-                    })
-        return articles
-
     except Exception as e:
         print(f"❌ {endpoint_name} ошибка: {type(e).__name__}: {e}")
-        return []
\ No newline at end of file
+        return []
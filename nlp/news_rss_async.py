@@ -9,6 +9,8 @@ import cachetools
 import datetime as dt
 import functools
 from health.metrics import record
+from health import breaker
+from nlp import feed_snapshot
 
 RSS_FEEDS = {
     "moex_issuer": "https://www.moex.com/export/news.aspx?news=issuer&lang=ru",
@@ -47,15 +49,32 @@ async def _fetch(url: str):
     if url in _CACHE:
         return _CACHE[url]
 
+    # 1) снимок на диске — переживает рестарт бота; в NEWS_REPLAY=1 сеть не трогаем
+    snap = feed_snapshot.lookup(url, "body")
+    if snap and snap["data"]:
+        _CACHE[url] = snap["data"]
+        return snap["data"]
+    if feed_snapshot.replay_mode():
+        return None
+
     timeout = _timeout_for(url)
+    source = breaker.source_for(url)
     url_variant = url
     for attempt in (1, 2, 3):
+        # источник открыт (или уже идёт проба) — не тратим время на ретраи
+        if not breaker.allow(source):
+            return None
         try:
             data = await _single_try(url_variant, timeout)
+            record("rss_fetch", {"source": source, "ok": True, "attempt": attempt})
             if data:           # сохраняем только не-пустой результат
                 _CACHE[url] = data
+                feed_snapshot.save_body(url, data)
             return data
         except Exception:
+            record("rss_fetch", {"source": source, "ok": False, "attempt": attempt})
+            if breaker.get(source).state == breaker.OPEN:
+                break
             # first fail on Interfax https → retry http
             if attempt == 1 and "finmarket.ru" in url_variant and url_variant.startswith("https"):
                 url_variant = url_variant.replace("https://", "http://")
@@ -80,7 +99,7 @@ async def async_fetch_all(hours: int = 24, ticker: str = None, log_to_cache: boo
     
     # Если требуется логирование в кэш новостей
     if log_to_cache and ticker:
-        from db.storage import insert as log_news
+        from db.storage import insert_many
         
         # Парсим заголовки из RSS результатов
         headlines = []
@@ -92,17 +111,15 @@ async def async_fetch_all(hours: int = 24, ticker: str = None, log_to_cache: boo
                     titles = re.findall(r'<title[^>]*>([^<]+)</title>', result)
                     headlines.extend(titles[:5])  # Берем первые 5 заголовков
         
-        # Логируем найденные заголовки
+        # Логируем найденные заголовки (тикер, RU/EN название или FIGI)
+        from nlp.entities import get_matcher
+        matcher = get_matcher()
         current_time = dt.datetime.utcnow().isoformat(timespec="seconds")
-        for headline in headlines:
-            if headline and ticker.upper() in headline.upper():
-                log_news(
-                    dt=current_time,
-                    ticker=ticker,
-                    headline=headline[:300],
-                    label=0,  # Neutral по умолчанию, будет переопределено при анализе
-                    source="rss",
-                    confidence=0.3
-                )
+        # Neutral по умолчанию, будет переопределено при анализе; вся пачка — одним commit
+        insert_many(
+            (current_time, ticker, headline, 0, "rss", 0.3)
+            for headline in headlines
+            if headline and matcher.mentions(headline, ticker)
+        )
     
     return results
@@ -1,10 +1,15 @@
 from functools import lru_cache
-# ⬇ отключено: from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
-from news_feed import fetch_news
-from nlp.news_rss_async import async_fetch_all
-import asyncio
-from langdetect import detect
+import re
+# ⬇ модели грузятся один раз через nlp.model_registry (transformers импортируется лениво)
+from nlp.model_registry import get_model, predict_proba
+from nlp.lexicon import CATEGORIES, FINANCIAL_LEXICON, FINANCIAL_TERMS
+from nlp.lang import detect_lang, partition
+from nlp import sentiment_worker
+from nlp.memo import memoize, memoize_batch
+from nlp.trend import decayed_trend
+import os
 import warnings
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
 import statistics
 
@@ -49,33 +54,14 @@ MODEL_CONFIG = {
     ]
 }
 
+ENSEMBLE_MODELS = 2     # ensemble (и каскад) используют только первые модели языка — для снижения нагрузки
+
 class FinancialSentimentEnsemble:
     """Ensemble анализатор с несколькими моделями и финансовой логикой"""
 
     def __init__(self):
-        # Финансовые словари
-        self.financial_terms = {
-            'strong_positive': {
-                'ru': ['рекорд', 'взлет', 'скачок', 'бум', 'превзош', 'прорыв', 'резкий рост'],
-                'en': ['breakthrough', 'surge', 'soar', 'rally', 'boom', 'outperform', 'beat']
-            },
-            'moderate_positive': {
-                'ru': ['выросли', 'рост', 'увелич', 'повыш', 'улучш', 'прибыль', 'доход'],
-                'en': ['improved', 'gained', 'rise', 'increase', 'profit', 'earnings', 'revenue']
-            },
-            'strong_negative': {
-                'ru': ['обвал', 'крах', 'кризис', 'коллапс', 'катастроф', 'провал'],
-                'en': ['plummet', 'crash', 'collapse', 'crisis', 'catastrophe', 'disaster']
-            },
-            'moderate_negative': {
-                'ru': ['упали', 'снизил', 'падение', 'уменьш', 'убыт', 'потер'],
-                'en': ['declined', 'dropped', 'fell', 'loss', 'decrease', 'down']
-            },
-            'neutral_stable': {
-                'ru': ['стабильн', 'без изменен', 'остал', 'неизменн'],
-                'en': ['remained', 'stable', 'flat', 'unchanged', 'steady']
-            }
-        }
+        # Финансовые словари (скомпилированы в nlp.lexicon)
+        self.financial_terms = FINANCIAL_TERMS
 
         # Паттерны для числовых значений
         self.number_pattern = r'(\d+(?:,\d+)?(?:\.\d+)?)\s*%'
@@ -116,24 +102,7 @@ class FinancialSentimentEnsemble:
 
     def _extract_financial_signals(self, text: str, lang: str) -> Dict[str, float]:
         """Извлекает финансовые сигналы из текста"""
-        text_lower = text.lower()
-        signals = {'positive': 0, 'negative': 0, 'neutral': 0}
-
-        # Проверяем финансовые термины
-        for sentiment_type, terms_dict in self.financial_terms.items():
-            if lang in terms_dict:
-                for term in terms_dict[lang]:
-                    if term in text_lower:
-                        if 'positive' in sentiment_type:
-                            weight = 2.0 if 'strong' in sentiment_type else 1.0
-                            signals['positive'] += weight
-                        elif 'negative' in sentiment_type:
-                            weight = 2.0 if 'strong' in sentiment_type else 1.0
-                            signals['negative'] += weight
-                        else:  # neutral
-                            signals['neutral'] += 1.0
-
-        return signals
+        return FINANCIAL_LEXICON.score(text, lang)
 
     def _extract_numeric_context(self, text: str) -> Dict[str, float]:
         """Анализирует числовой контекст (проценты, суммы)"""
@@ -168,19 +137,11 @@ class FinancialSentimentEnsemble:
 
         for model_info in models_config:
             try:
-                # Пробуем загрузить и использовать модель
-                tokenizer = AutoTokenizer.from_pretrained(model_info["name"])
-                model = AutoModelForSequenceClassification.from_pretrained(model_info["name"])
-                model.eval()
-
-                inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-                with torch.no_grad():
-                    logits = model(**inputs).logits
-
-                probabilities = torch.softmax(logits, dim=-1)
-                predicted_idx = logits.argmax().item()
+                # Модель из реестра: загружается один раз на процесс
+                probabilities = predict_proba(model_info["name"], [text])[0]
+                predicted_idx = max(range(len(probabilities)), key=probabilities.__getitem__)
                 predicted_label = model_info["labels"][predicted_idx]
-                confidence = probabilities[0][predicted_idx].item()
+                confidence = probabilities[predicted_idx]
 
                 # Нормализуем результат
                 normalized_sentiment = self._normalize_multilingual_sentiment(predicted_label, model_info["name"])
@@ -228,98 +189,75 @@ _ensemble_analyzer = FinancialSentimentEnsemble()
 
 @lru_cache(maxsize=10)
 def _load_ensemble_models():
-    """Кэшированная загрузка моделей для ensemble"""
+    """Загружает все модели ensemble в реестр (один раз на процесс)"""
     print("🔄 Инициализация ensemble моделей...")
-    return True  # Модели загружаются динамически в _ensemble_predict
+    loaded = 0
+    for models in MODEL_CONFIG.values():
+        for model_info in models:
+            try:
+                get_model(model_info["name"])
+                loaded += 1
+            except RuntimeError:
+                continue
+    return loaded > 0
 
-@lru_cache(maxsize=256)
+@memoize("ru_ensemble")
 def classify_ru_ensemble(text: str) -> str:
     """Классифицирует русский текст с помощью ensemble моделей"""
     return _ensemble_classify(text, MODEL_CONFIG["ru_models"])
 
-@lru_cache(maxsize=256)  
+@memoize("en_ensemble")
 def classify_en_ensemble(text: str) -> str:
     """Классифицирует английский текст с помощью ensemble моделей"""
     return _ensemble_classify(text, MODEL_CONFIG["en_models"])
 
 def _extract_financial_signals(text: str) -> Dict[str, float]:
     """Извлекает финансовые сигналы из текста (глобальная функция)"""
-    financial_terms = {
-        'strong_positive': {
-            'ru': ['рекорд', 'взлет', 'скачок', 'бум', 'превзош', 'прорыв', 'резкий рост'],
-            'en': ['breakthrough', 'surge', 'soar', 'rally', 'boom', 'outperform', 'beat']
-        },
-        'moderate_positive': {
-            'ru': ['выросли', 'рост', 'увелич', 'повыш', 'улучш', 'прибыль', 'доход'],
-            'en': ['improved', 'gained', 'rise', 'increase', 'profit', 'earnings', 'revenue']
-        },
-        'strong_negative': {
-            'ru': ['обвал', 'крах', 'кризис', 'коллапс', 'катастроф', 'провал'],
-            'en': ['plummet', 'crash', 'collapse', 'crisis', 'catastrophe', 'disaster']
-        },
-        'moderate_negative': {
-            'ru': ['упали', 'снизил', 'падение', 'уменьш', 'убыт', 'потер'],
-            'en': ['declined', 'dropped', 'fell', 'loss', 'decrease', 'down']
-        },
-        'neutral_stable': {
-            'ru': ['стабильн', 'без изменен', 'остал', 'неизменн'],
-            'en': ['remained', 'stable', 'flat', 'unchanged', 'steady']
-        }
-    }
+    return FINANCIAL_LEXICON.score(text, detect_lang(text))
 
-    text_lower = text.lower()
-    signals = {'positive': 0, 'negative': 0, 'neutral': 0}
-
-    # Определяем язык (простая эвристика)
-    lang = 'ru' if any(char in 'абвгдежзийклмнопрстуфхцчшщъыьэюя' for char in text_lower[:50]) else 'en'
-
-    # Проверяем финансовые термины
-    for sentiment_type, terms_dict in financial_terms.items():
-        if lang in terms_dict:
-            for term in terms_dict[lang]:
-                if term in text_lower:
-                    if 'positive' in sentiment_type:
-                        weight = 2.0 if 'strong' in sentiment_type else 1.0
-                        signals['positive'] += weight
-                    elif 'negative' in sentiment_type:
-                        weight = 2.0 if 'strong' in sentiment_type else 1.0
-                        signals['negative'] += weight
-                    else:  # neutral
-                        signals['neutral'] += 1.0
-
-    return signals
+def _extract_financial_signals_many(texts: List[str]) -> List[Dict[str, float]]:
+    """Финансовые сигналы для списка текстов одним вызовом лексикона"""
+    langs = [detect_lang(t) for t in texts]
+    return [dict(zip(CATEGORIES, row)) for row in FINANCIAL_LEXICON.score_many(texts, langs).tolist()]
 
 def _ensemble_classify(text: str, models_config: list) -> str:
     """Выполняет ensemble предсказание с несколькими моделями"""
-    predictions = []
-    total_weight = 0
+    return _ensemble_classify_batch([text], models_config)[0]
+
+def _ensemble_classify_batch(texts: List[str], models_config: list) -> List[str]:
+    """Ensemble предсказание для списка текстов: один батч-проход на модель"""
+    if not texts:
+        return []
+
+    outputs: List[List[Tuple[dict, List[float]]]] = [[] for _ in texts]
 
     # Ограничиваем количество используемых моделей для снижения нагрузки
-    active_models = models_config[:2]  # Используем только 2 модели
+    active_models = models_config[:ENSEMBLE_MODELS]
 
     for model_info in active_models:
         try:
-            # Пробуем загрузить и использовать модель с кэшированием
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_info["name"], 
-                cache_dir=".model_cache",
-                local_files_only=False
-            )
-            model = AutoModelForSequenceClassification.from_pretrained(
-                model_info["name"],
-                cache_dir=".model_cache", 
-                local_files_only=False
-            )
-            model.eval()
-
-            inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-            with torch.no_grad():
-                logits = model(**inputs).logits
-
-            probabilities = torch.softmax(logits, dim=-1)
-            predicted_idx = logits.argmax().item()
+            batch_probs = predict_proba(model_info["name"], texts)
+        except Exception:
+            continue   # модель недоступна — реестр уже сообщил об этом
+        for out, probabilities in zip(outputs, batch_probs):
+            out.append((model_info, probabilities))
+
+    return _ensemble_verdicts(texts, outputs)
+
+def _ensemble_verdicts(texts: List[str], outputs: List[List[Tuple[dict, List[float]]]]) -> List[str]:
+    """
+    Метки ensemble по уже посчитанным вероятностям.
+
+    outputs[i] — пары (model_info, probabilities) моделей, ответивших на texts[i].
+    """
+    results = []
+    for model_outputs, financial_signals in zip(outputs, _extract_financial_signals_many(texts)):
+        score = 0.0
+        total_weight = 0
+        for model_info, probabilities in model_outputs:
+            predicted_idx = max(range(len(probabilities)), key=probabilities.__getitem__)
             predicted_label = model_info["labels"][predicted_idx]
-            confidence = probabilities[0][predicted_idx].item()
+            confidence = probabilities[predicted_idx]
 
             # Конвертируем в стандартный формат
             if predicted_label.upper() in ["POSITIVE", "POS"]:
@@ -329,36 +267,30 @@ def _ensemble_classify(text: str, models_config: list) -> str:
             else:
                 sentiment_score = 0.0
 
-            predictions.append(sentiment_score * confidence * model_info["weight"])
+            score += sentiment_score * confidence * model_info["weight"]
             total_weight += model_info["weight"]
 
-        except Exception as e:
-            print(f"⚠️ Модель {model_info['name'][:20]}... недоступна")
+        if not total_weight:
+            results.append("neutral")
             continue
 
-    if not predictions:
-        return "neutral"
-
-    # Вычисляем взвешенный результат
-    ensemble_score = sum(predictions) / total_weight if total_weight > 0 else 0
-
-    # Добавляем финансовый контекст
-    financial_signals = _extract_financial_signals(text)
-
-    # Итоговый скор с учетом финансовых сигналов
-    final_score = (
-        ensemble_score * 0.8 +
-        (financial_signals['positive'] - financial_signals['negative']) * 0.2
-    )
-
-    if final_score > 0.1:
-        result = "positive"
-    elif final_score < -0.1:
-        result = "negative"
-    else:
-        result = "neutral"
+        # Вычисляем взвешенный результат
+        ensemble_score = score / total_weight
+
+        # Итоговый скор с учетом финансовых сигналов (лексикон посчитан сразу для всего батча)
+        final_score = (
+            ensemble_score * 0.8 +
+            (financial_signals['positive'] - financial_signals['negative']) * 0.2
+        )
+
+        if final_score > 0.1:
+            results.append("positive")
+        elif final_score < -0.1:
+            results.append("negative")
+        else:
+            results.append("neutral")
 
-    return result
+    return results
 
 # Основные функции с ensemble подходом
 def classify_ru(text: str) -> str:
@@ -371,39 +303,162 @@ def classify_en(text: str) -> str:
 
 def classify_multi(text: str) -> str:
     """Мультиязычный анализ настроения с ensemble"""
-    try:
-        lang = detect(text[:200])
-        if lang == "ru":
-            return classify_ru_ensemble(text)
-        else:
-            return classify_en_ensemble(text)
-    except Exception as e:
-        print(f"⚠️ Ошибка определения языка: {e}")
-        return classify_en_ensemble(text)
+    if CASCADE_ON:
+        return classify_batch([text])[0]
+    if detect_lang(text) == "ru":
+        return classify_ru_ensemble(text)
+    return classify_en_ensemble(text)
+
+def classify_batch(texts: List[str]) -> List[str]:
+    """Мультиязычный анализ списка текстов: по одному батчу на язык (с мемоизацией)"""
+    return memoize_batch("multi", texts, _classify_batch_uncached)
+
+def _classify_batch_uncached(texts: List[str]) -> List[str]:
+    if sentiment_worker.enabled():
+        return sentiment_worker.get_pool().classify(texts)
+    if CASCADE_ON:
+        return classify_cascade_batch(texts)
+
+    groups = partition(texts)
+
+    results: List[str] = ["neutral"] * len(texts)
+    for lang, idx in groups.items():
+        if not idx:
+            continue
+        labels = _ensemble_classify_batch([texts[i] for i in idx], MODEL_CONFIG[f"{lang}_models"])
+        for i, label in zip(idx, labels):
+            results[i] = label
+    return results
 
-def analyze_sentiment_trend(texts: List[str]) -> Dict[str, float]:
-    """Анализирует тренд настроения по множеству текстов"""
+# ─────────────────────────────────────────────────────────────
+# Каскад: лексикон → самая дешёвая модель → остальной ensemble → LLM.
+# Следующая ступень запускается только для текстов, где уверенность
+# предыдущей ниже CASCADE_THRESHOLD.
+# ─────────────────────────────────────────────────────────────
+CASCADE_ON = os.getenv("SENTIMENT_CASCADE", "0") == "1"
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.75"))
+CASCADE_LLM = os.getenv("CASCADE_LLM", "0") == "1"
+CASCADE_STATS: Counter = Counter()
+
+def _lexicon_verdict(signals: List[float]) -> Tuple[str, float]:
+    """Метка и уверенность лексикона по весам (positive, negative, neutral)"""
+    pos, neg, neu = signals
+    margin = pos - neg
+    if margin > 0:
+        return "positive", margin / (pos + neg + neu + 1)
+    if margin < 0:
+        return "negative", -margin / (pos + neg + neu + 1)
+    return "neutral", neu / (pos + neg + neu + 1)
+
+def _vote(model_info: dict, probabilities: List[float]) -> Tuple[str, float, float]:
+    """Голос модели: (sentiment, confidence, weight) по её вероятностям"""
+    k = max(range(len(probabilities)), key=probabilities.__getitem__)
+    sentiment = _ensemble_analyzer._normalize_multilingual_sentiment(model_info["labels"][k], model_info["name"])
+    return sentiment, probabilities[k], model_info["weight"]
+
+def _combine_votes(votes: List[Tuple[str, float, float]]) -> Tuple[Optional[str], float]:
+    """Взвешенное голосование моделей: (sentiment, confidence, weight) → метка и уверенность"""
+    if not votes:
+        return None, 0.0
+    weighted = {'positive': 0.0, 'negative': 0.0, 'neutral': 0.0}
+    total_weight = 0.0
+    for sentiment, confidence, weight in votes:
+        weighted[sentiment] += weight * confidence
+        total_weight += weight
+    winner = max(weighted, key=weighted.get)
+    return winner, weighted[winner] / total_weight
+
+def classify_cascade_batch(texts: List[str], threshold: float = None) -> List[str]:
+    """
+    Каскадная классификация списка текстов.
+
+    Args:
+        texts: Тексты.
+        threshold: Порог уверенности для раннего выхода (по умолчанию CASCADE_THRESHOLD).
+
+    Returns:
+        Метки positive / negative / neutral в исходном порядке.
+    """
+    threshold = CASCADE_THRESHOLD if threshold is None else threshold
+    results: List[Optional[str]] = [None] * len(texts)
+    CASCADE_STATS["total"] += len(texts)
+
+    # 1) лексикон — микросекунды на заголовок
+    langs = [detect_lang(t) for t in texts]
+    for i, row in enumerate(FINANCIAL_LEXICON.score_many(texts, langs).tolist()):
+        label, confidence = _lexicon_verdict(row)
+        if confidence >= threshold:
+            results[i] = label
+            CASCADE_STATS["lexicon"] += 1
+
+    # 2-3) первая (самая дешёвая) модель, затем вторая — те же модели, что и в обычном ensemble
+    outputs: Dict[int, List[Tuple[dict, List[float]]]] = {i: [] for i, r in enumerate(results) if r is None}
+    for lang in ("ru", "en"):
+        idx = [i for i in outputs if langs[i] == lang]
+        models = MODEL_CONFIG[f"{lang}_models"][:ENSEMBLE_MODELS]
+        for stage, members in (("model", models[:1]), ("ensemble", models[1:])):
+            if not idx or not members:
+                continue
+            for model_info in members:
+                try:
+                    batch_probs = predict_proba(model_info["name"], [texts[i] for i in idx])
+                except Exception:
+                    continue
+                for i, probabilities in zip(idx, batch_probs):
+                    outputs[i].append((model_info, probabilities))
+
+            undecided = []
+            for i in idx:
+                label, confidence = _combine_votes([_vote(*out) for out in outputs[i]])
+                if label is not None and confidence >= threshold:
+                    results[i] = label
+                    CASCADE_STATS[stage] += 1
+                else:
+                    undecided.append(i)
+            idx = undecided
+
+    # 4) неоднозначные — LLM, либо правило обычного ensemble по уже посчитанным вероятностям
+    undecided = [i for i in outputs if results[i] is None]
+    if CASCADE_LLM:
+        for i in undecided:
+            results[i] = classify_llm(texts[i])
+        CASCADE_STATS["llm"] += len(undecided)
+    else:
+        labels = _ensemble_verdicts([texts[i] for i in undecided], [outputs[i] for i in undecided])
+        for i, label in zip(undecided, labels):
+            results[i] = label
+        CASCADE_STATS["fallthrough"] += len(undecided)
+
+    return results
+
+def cascade_stats() -> Dict[str, float]:
+    """Сколько текстов решено на каждой ступени каскада (и доли от общего числа)"""
+    total = CASCADE_STATS["total"]
+    stats: Dict[str, float] = {"total": total}
+    for stage in ("lexicon", "model", "ensemble", "llm", "fallthrough"):
+        stats[stage] = CASCADE_STATS[stage]
+        stats[f"{stage}_rate"] = CASCADE_STATS[stage] / total if total else 0.0
+    return stats
+
+def analyze_sentiment_trend(texts: List[str], timestamps: Optional[List] = None,
+                            confidences: Optional[List[float]] = None) -> Dict[str, float]:
+    """Анализирует тренд настроения по множеству текстов (с затуханием, если есть время публикации)"""
     if not texts:
         return {'trend': 0.0, 'confidence': 0.0, 'count': 0}
 
-    sentiments = []
-    for text in texts:
-        sentiment = classify_multi(text)
-        score = {'positive': 1, 'negative': -1, 'neutral': 0}.get(sentiment, 0)
-        sentiments.append(score)
+    label_score = {'positive': 1, 'negative': -1, 'neutral': 0}
+    sentiments = [label_score.get(sentiment, 0) for sentiment in classify_batch(texts)]
+    stats = decayed_trend(sentiments, timestamps, confidences)
 
-    avg_sentiment = sum(sentiments) / len(sentiments)
     consistency = 1.0 - (len(set(sentiments)) - 1) / 2.0
 
     return {
-        'trend': avg_sentiment,
+        'trend': stats['trend'],
         'confidence': consistency,
         'count': len(texts),
-        'distribution': {
-            'positive': sentiments.count(1),
-            'negative': sentiments.count(-1),
-            'neutral': sentiments.count(0)
-        }
+        'distribution': stats['distribution'],
+        'dispersion': stats['dispersion'],
+        'windows': stats['windows'],
     }
 
 # Обратная совместимость
@@ -418,12 +473,11 @@ def classify_llm(text: str) -> str:
 # ↓↓↓ MINI-RSS helper: 🇷🇺-заголовки за N часов
 # ------------------------------------------------------------------------
 from datetime import datetime, timedelta
-from nlp.news_feed import _rss_query
 
 # ───────────────────────────────────────────────────────────
 #  RSS-Sentiment summary (OpenAI)
 # ───────────────────────────────────────────────────────────
-import os, json, openai
+import os, json
 from collections import Counter
 from typing import Dict
 
@@ -437,6 +491,7 @@ def rss_sentiment_summary(hours: int = 24) -> Dict[str, int]:
     if not headlines:
         return {}
 
+    import openai
     openai.api_key = os.getenv("OPENAI_API_KEY")
     if not openai.api_key:
         raise RuntimeError("OPENAI_API_KEY не установлен")
@@ -463,70 +518,32 @@ def rss_sentiment_summary(hours: int = 24) -> Dict[str, int]:
 
 
 # ─────────────────────────────────────────────────────────────
-# 🚀 robust fetch_ru_news — собирает 🇷🇺 RSS-заголовки за N часов
+# 🚀 fetch_ru_news — собирает 🇷🇺 RSS-заголовки за N часов
+#    (все ленты качаются параллельно, см. nlp.news_feed.fetch_feeds)
 # ─────────────────────────────────────────────────────────────
 from datetime import datetime, timedelta
-def fetch_ru_news(hours: int = 24) -> list[str]:
-    """Возвращает русскоязычные заголовки за *hours* часов."""
-    # ➊ пытаемся найти список лент
-    try:
-        from nlp.news_feed import RSS_FEED_URLS as _FEEDS            # современный вариант
-    except ImportError:
-        try:
-            from nlp.news_rss_async import RSS_FEEDS as _DICT        # старый словарь
-            _FEEDS = list(_DICT.values())
-        except ImportError:
-            _FEEDS = []                                              # ничего не нашли
 
-    # ➋ берём парсер RSS-ленты
-    try:
-        from nlp.news_feed import _rss_query
-    except ImportError:
-        return []
-
-    cutoff  = datetime.utcnow() - timedelta(hours=hours)
-    titles: list[str] = []
+# страховка: «ручные» ленты, если основной перечень пуст
+_RU_FALLBACK_FEEDS = [
+    "https://lenta.ru/rss/news",
+    "https://tass.ru/rss/v2.xml",
+    "https://www.kommersant.ru/RSS/main.xml",
+    "https://www.moex.com/export/news.aspx?news=issuer&lang=ru",
+    "https://www.finam.ru/analysis/news/rsspoint",
+    "https://www.banki.ru/xml/news.rss",
+]
 
-    for url in _FEEDS:
-        try:
-            for art in _rss_query(url):
-                if art.get("dt") and art["dt"] >= cutoff and art.get("title"):
-                    titles.append(art["title"].strip())
-        except Exception:
-            continue    # падающий источник пропускаем
-    return titles
-
-
-# ─────────────────────────────────────────────────────────────
-# 🚀  fetch_ru_news  — собирает русскоязычные заголовки из всех
-#     известных RSS-лент (использует наш новый _rss_query выше)
-# ─────────────────────────────────────────────────────────────
-from datetime import datetime, timedelta
 def fetch_ru_news(hours: int = 24) -> list[str]:
     """Все 🇷🇺-заголовки за последние *hours* часов (может вернуть пусто)."""
-    try:                                    # основной перечень
-        from nlp.news_feed import RSS_FEED_URLS as _FEEDS
-    except ImportError:
-        _FEEDS = []                         # если константы нет
-
-    # страховка: добавляем 6 «ручных» лент, если вдруг список пуст
-    if not _FEEDS:
-        _FEEDS = [
-            "https://lenta.ru/rss/news",
-            "https://tass.ru/rss/v2.xml",
-            "https://www.kommersant.ru/RSS/main.xml",
-            "https://www.moex.com/export/news.aspx?news=issuer&lang=ru",
-            "https://www.finam.ru/analysis/news/rsspoint",
-            "https://www.banki.ru/xml/news.rss",
-        ]
-
-    from nlp.news_feed import _rss_query      # импорт после проверки списка
-    cutoff  = datetime.utcnow() - timedelta(hours=hours)
+    from nlp.news_feed import RSS_FEED_URLS, fetch_rss_entries
+
+    feeds = RSS_FEED_URLS or _RU_FALLBACK_FEEDS
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
     titles: list[str] = []
 
-    for url in _FEEDS:
-        for art in _rss_query(url):
-            if art.get("dt") and art["dt"] >= cutoff and art.get("title"):
-                titles.append(art["title"].strip())
+    # падающие и медленные источники пропускаются внутри fetch_rss_entries
+    for art in fetch_rss_entries(feeds):
+        if art.get("dt") and art["dt"] >= cutoff and art.get("title"):
+            titles.append(art["title"].strip())
 
     return titles
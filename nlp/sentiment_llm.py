@@ -1,10 +1,9 @@
 import os
 import json
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
-import openai
-import redis
 from functools import lru_cache
 from health.metrics import record
 
@@ -15,44 +14,32 @@ LLM_MAXTOK = int(os.getenv("LLM_MAXTOK", "8"))
 CACHE_HOURS = int(os.getenv("CACHE_HOURS", "24"))
 LLM_OFF = bool(int(os.getenv("LLM_OFF", "0")))
 
-# Redis клиент (с fallback на in-memory словарь)
-try:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-    redis_client.ping()
-    print("✅ Redis подключен")
-except:
-    pass  # Тихо переключаемся на in-memory кэш
-    redis_client = {}
+# Redis клиент (с fallback на in-memory словарь) — подключаемся при первом обращении
+redis_client = None
+_init_lock = threading.Lock()
 
-# SQLite база для постоянного хранения
-DB_PATH = "news_cache.db"
+# SQLite: sentiment_cache живёт в общей базе новостей (db.storage, NEWS_DB)
+from db.storage import _PATH as DB_PATH
 
 def init_database():
-    """Инициализирует SQLite базу для кэширования"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    """Инициализирует SQLite базу для кэширования (миграции db.migrations)"""
+    _writer()
 
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sentiment_cache (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            text_hash TEXT UNIQUE NOT NULL,
-            text TEXT NOT NULL,
-            sentiment TEXT NOT NULL,
-            confidence REAL DEFAULT 0.5,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            ticker TEXT,
-            source TEXT DEFAULT 'llm'
-        )
-    ''')
+def _writer():
+    """Поток-писатель общей базы; схема создаётся при первом обращении, а не при импорте"""
+    from db.storage import _writer as storage_writer
+    return storage_writer()
 
-    # Индекс для быстрого поиска по времени и тикеру
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_timestamp_ticker 
-        ON sentiment_cache(timestamp, ticker)
-    ''')
+def _connect() -> sqlite3.Connection:
+    """Read-only подключение к кэшу (запись — только через _writer())"""
+    from db import storage
+    _writer()
+    return sqlite3.connect(f"file:{os.path.abspath(storage._PATH)}?mode=ro", uri=True)
 
-    conn.commit()
-    conn.close()
+def _cutoff(hours: float) -> str:
+    """Граница по timestamp (CURRENT_TIMESTAMP — UTC 'YYYY-MM-DD HH:MM:SS')"""
+    from db.storage import since, TS_FORMAT
+    return since(hours, TS_FORMAT)
 
 def build_prompt(text: str) -> Dict[str, str]:
     """Строит оптимизированный промпт для LLM"""
@@ -74,6 +61,7 @@ def call_openai_sync(prompt: Dict[str, str], max_tokens: int = LLM_MAXTOK, tempe
     if LLM_OFF:
         raise ValueError("LLM анализ отключен (LLM_OFF=1)")
 
+    import openai
     client = openai.OpenAI(api_key=OPENAI_API_KEY)
 
     try:
@@ -110,6 +98,22 @@ def call_openai_sync(prompt: Dict[str, str], max_tokens: int = LLM_MAXTOK, tempe
         print(f"❌ Ошибка OpenAI API: {e}")
         return "neutral"  # Fallback
 
+def get_redis():
+    """Клиент Redis (или in-memory словарь, если Redis недоступен); подключение — при первом вызове"""
+    global redis_client
+    if redis_client is None:
+        with _init_lock:
+            if redis_client is None:
+                try:
+                    import redis
+                    client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+                    client.ping()
+                    print("✅ Redis подключен")
+                except Exception:
+                    client = {}  # Тихо переключаемся на in-memory кэш
+                redis_client = client
+    return redis_client
+
 def get_text_hash(text: str) -> str:
     """Генерирует хэш текста для кэширования"""
     import hashlib
@@ -118,12 +122,13 @@ def get_text_hash(text: str) -> str:
 def cache_get(text_hash: str) -> Optional[Dict]:
     """Получает результат из кэша (Redis + SQLite)"""
     # Сначала проверяем Redis
-    if isinstance(redis_client, dict):
+    client = get_redis()
+    if isinstance(client, dict):
         # In-memory fallback
-        cached = redis_client.get(text_hash)
+        cached = client.get(text_hash)
     else:
         try:
-            cached = redis_client.get(f"sentiment:{text_hash}")
+            cached = client.get(f"sentiment:{text_hash}")
         except:
             cached = None
 
@@ -134,18 +139,16 @@ def cache_get(text_hash: str) -> Optional[Dict]:
             pass
 
     # Если Redis не сработал, проверяем SQLite
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cursor = conn.cursor()
 
     # Ищем свежие записи (не старше CACHE_HOURS)
-    cutoff = datetime.now() - timedelta(hours=CACHE_HOURS)
-
     cursor.execute('''
         SELECT sentiment, confidence, timestamp 
         FROM sentiment_cache 
         WHERE text_hash = ? AND timestamp > ?
         ORDER BY timestamp DESC LIMIT 1
-    ''', (text_hash, cutoff.isoformat()))
+    ''', (text_hash, _cutoff(CACHE_HOURS)))
 
     result = cursor.fetchone()
     conn.close()
@@ -170,12 +173,13 @@ def cache_set(text_hash: str, text: str, sentiment: str, confidence: float = 0.5
     }
 
     # Сохраняем в Redis
-    if isinstance(redis_client, dict):
+    client = get_redis()
+    if isinstance(client, dict):
         # In-memory fallback
-        redis_client[text_hash] = json.dumps(data)
+        client[text_hash] = json.dumps(data)
     else:
         try:
-            redis_client.setex(
+            client.setex(
                 f"sentiment:{text_hash}", 
                 timedelta(hours=CACHE_HOURS), 
                 json.dumps(data)
@@ -183,22 +187,19 @@ def cache_set(text_hash: str, text: str, sentiment: str, confidence: float = 0.5
         except:
             pass
 
-    # Сохраняем в SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute('''
-            INSERT OR REPLACE INTO sentiment_cache 
-            (text_hash, text, sentiment, confidence, ticker, source)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (text_hash, text, sentiment, confidence, ticker, 'llm'))
-
-        conn.commit()
-    except Exception as e:
-        print(f"⚠️ Ошибка записи в SQLite: {e}")
-    finally:
-        conn.close()
+    # Сохраняем в SQLite через поток-писатель (не ждём commit).
+    # Upsert, а не REPLACE: строка не пересоздаётся и ссылки news.sentiment_hash сохраняются
+    future = _writer().execute('''
+        INSERT INTO sentiment_cache 
+        (text_hash, text, sentiment, confidence, ticker, source)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(text_hash) DO UPDATE SET
+            text = excluded.text, sentiment = excluded.sentiment, confidence = excluded.confidence,
+            ticker = COALESCE(excluded.ticker, sentiment_cache.ticker), source = excluded.source,
+            timestamp = CURRENT_TIMESTAMP
+    ''', (text_hash, text, sentiment, confidence, ticker, 'llm'))
+    future.add_done_callback(
+        lambda f: f.exception() and print(f"⚠️ Ошибка записи в SQLite: {f.exception()}"))
     
     # Логируем в news cache для бэктестов
     if ticker:
@@ -207,12 +208,13 @@ def cache_set(text_hash: str, text: str, sentiment: str, confidence: float = 0.5
         label = label_map.get(sentiment, 0)
         
         log_news(
-            dt=datetime.now().isoformat(timespec="seconds"),
+            dt=datetime.utcnow().isoformat(timespec="seconds"),
             ticker=ticker,
             headline=text[:300],
             label=label,
             source="llm",
-            confidence=confidence
+            confidence=confidence,
+            sentiment_hash=text_hash
         )
 
 def smart_classify(text: str, ticker: str = None) -> str:
@@ -251,20 +253,10 @@ def smart_classify(text: str, ticker: str = None) -> str:
 
 def fallback_classify(text: str) -> str:
     """Fallback классификация по ключевым словам"""
-    text_lower = text.lower()
-
-    positive_words = [
-        'рост', 'прибыль', 'доход', 'выросли', 'увелич', 'повыш', 'улучш',
-        'rise', 'gain', 'profit', 'increase', 'growth', 'up', 'strong', 'beat'
-    ]
+    from nlp.lexicon import FALLBACK_LEXICON
 
-    negative_words = [
-        'падение', 'убыток', 'снизил', 'упали', 'кризис', 'уменьш', 'потер',
-        'decline', 'loss', 'drop', 'fall', 'down', 'weak', 'miss', 'disappoint'
-    ]
-
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
+    signals = FALLBACK_LEXICON.score(text)
+    pos_count, neg_count = signals['positive'], signals['negative']
 
     if pos_count > neg_count:
         return "positive"
@@ -273,52 +265,47 @@ def fallback_classify(text: str) -> str:
     else:
         return "neutral"
 
-def get_sentiment_score_from_cache(ticker: str, hours: int = 24, force_refresh: bool = False) -> int:
-    """Получить оценку настроения из кэша SQLite, если данные свежие"""
+def sentiment_score(labels, timestamps=None) -> int:
+    """
+    Итоговый score тикера: затухающая сумма меток (полураспад SENTIMENT_HALF_LIFE).
+
+    Одна формула для кэша и свежего анализа; timestamps — UTC, None — «сейчас».
+    """
+    from nlp.trend import decayed_trend, label_scores
+    return int(round(decayed_trend(label_scores(labels), timestamps)["score"]))
+
+def get_sentiment_score_from_cache(ticker: str, hours: int = 24, force_refresh: bool = False) -> Optional[int]:
+    """Оценка настроения из кэша SQLite; None — в кэше нет разметок за период (0 — настоящий нейтральный score)"""
 
     # Если принудительное обновление - пропускаем кэш
     if force_refresh:
         print(f"🔄 Принудительное обновление для {ticker}")
-        return 0
+        return None
 
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Ищем записи за указанный период
-        cutoff = datetime.now() - timedelta(hours=hours)
+        from db.storage import get_ticker_sentiments
 
-        cursor.execute('''
-            SELECT sentiment FROM sentiment_cache 
-            WHERE timestamp > ? AND (ticker = ? OR text LIKE ?)
-            ORDER BY timestamp DESC
-        ''', (cutoff.isoformat(), ticker, f'%{ticker}%'))
-
-        results = cursor.fetchall()
-        conn.close()
+        # Разметки тикера за период: sentiment_cache + новости тикера через JOIN
+        results = get_ticker_sentiments(ticker, hours)
 
         if not results:
             print(f"📊 Кэш пуст для {ticker}")
-            return 0
+            return None
 
-        # Подсчитываем score
-        score = 0
-        for (sentiment,) in results:
-            if sentiment == "positive":
-                score += 1
-            elif sentiment == "negative":
-                score -= 1
+        # Подсчитываем score: свежие новости весят больше
+        labels, timestamps = zip(*results)
+        score = sentiment_score(labels, timestamps)  # timestamp — CURRENT_TIMESTAMP (UTC)
 
         print(f"📊 Настроение {ticker}: {score} (из {len(results)} новостей в кэше)")
         return score
 
     except Exception as e:
         print(f"Ошибка при получении score из кэша: {e}")
-        return 0
+        return None
 
 def get_cache_stats() -> Dict:
     """Статистика кэша"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cursor = conn.cursor()
 
     # Общее количество записей
@@ -326,8 +313,7 @@ def get_cache_stats() -> Dict:
     total = cursor.fetchone()[0]
 
     # Записи за последние 24 часа
-    cutoff = datetime.now() - timedelta(hours=24)
-    cursor.execute("SELECT COUNT(*) FROM sentiment_cache WHERE timestamp > ?", (cutoff.isoformat(),))
+    cursor.execute("SELECT COUNT(*) FROM sentiment_cache WHERE timestamp > ?", (_cutoff(24),))
     recent = cursor.fetchone()[0]
 
     # Записи по источникам
@@ -341,6 +327,3 @@ def get_cache_stats() -> Dict:
         "recent_24h": recent,
         "by_source": by_source
     }
-
-# Инициализируем базу при импорте
-init_database()
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Локальный сервис классификации: N процессов-воркеров с прогретыми моделями.
+
+Бот отдаёт заголовки пулу (submit/classify), тексты режутся на чанки,
+результаты возвращаются в порядке подачи. Каждый воркер при старте загружает
+модели ensemble, так что GIL и загрузка весов не блокируют процесс бота.
+
+Настройка:
+    SENTIMENT_WORKERS=0   — пул выключен, всё считается в процессе бота
+    SENTIMENT_WORKERS=-1  — авто: по числу доступных ядер (одно остаётся боту)
+    SENTIMENT_WORKERS=N   — ровно N процессов
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+WORKER_CHUNK = int(os.getenv("SENTIMENT_WORKER_CHUNK", "32"))
+
+_IN_WORKER = False       # True внутри процесса-воркера (защита от рекурсии)
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _auto_workers() -> int:
+    return max(1, available_cores() - 1)
+
+
+def _init_worker(threads: int, warm: bool):
+    """Инициализация процесса-воркера: потоки CPU и прогрев моделей"""
+    global _IN_WORKER
+    _IN_WORKER = True
+
+    from nlp import model_registry
+    model_registry.SENTIMENT_THREADS = threads
+    if warm:
+        from nlp.sentiment import _load_ensemble_models
+        _load_ensemble_models()
+
+
+def _classify_chunk(texts: List[str]) -> List[str]:
+    from nlp.sentiment import classify_batch
+    return classify_batch(texts)
+
+
+class SentimentWorkerPool:
+    """Пул процессов-классификаторов с сохранением порядка и перезапуском"""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = WORKER_CHUNK,
+                 task: Callable[[List[str]], List[str]] = _classify_chunk, warm: bool = True):
+        self.workers = workers if workers and workers > 0 else _auto_workers()
+        self.chunk_size = chunk_size
+        self.task = task
+        self.warm = warm
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "SentimentWorkerPool":
+        with self._lock:
+            if self._executor is None:
+                threads = max(1, available_cores() // self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(threads, self.warm),
+                )
+                print(f"🧵 Sentiment-пул: {self.workers} процессов × {threads} потоков")
+        return self
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Корректная остановка: дожидаемся текущих задач"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def restart(self, workers: Optional[int] = None) -> None:
+        """Перезапуск пула (например, после падения воркера или для смены размера)"""
+        self.shutdown(wait=True)
+        if workers:
+            self.workers = workers
+        self.start()
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+
+    def classify(self, texts: List[str]) -> List[str]:
+        """Классифицирует тексты на воркерах; порядок результатов = порядок texts"""
+        if not texts:
+            return []
+        for attempt in (1, 2):
+            executor = self.start()._executor
+            try:
+                results: List[str] = []
+                for labels in executor.map(self.task, self._chunks(texts)):
+                    results.extend(labels)
+                return results
+            except BrokenProcessPool:
+                print("⚠️ Sentiment-воркер упал, перезапускаем пул...")
+                if attempt == 2:
+                    raise
+                self.shutdown(wait=False)
+        return []
+
+    def submit(self, texts: List[str]) -> Future:
+        """Неблокирующая версия classify: Future со списком меток"""
+        future: Future = Future()
+
+        def _run():
+            try:
+                future.set_result(self.classify(texts))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=_run, daemon=True, name="sentiment-submit").start()
+        return future
+
+
+_pool: Optional[SentimentWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """Пул включён и мы не внутри воркера"""
+    return SENTIMENT_WORKERS != 0 and not _IN_WORKER
+
+
+def get_pool() -> SentimentWorkerPool:
+    """Общий пул процесса (создаётся при первом обращении)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SentimentWorkerPool(SENTIMENT_WORKERS)
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,158 @@
+"""
+Векторный движок тренда настроения.
+
+Принимает уже посчитанные оценки (-1/0/+1 или вещественные), время и
+уверенность как массивы NumPy и за один проход считает экспоненциально
+затухающее среднее (свежие новости весят больше), окна 1/6/24 ч и разброс.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+HALF_LIFE_HOURS = float(os.getenv("SENTIMENT_HALF_LIFE", "6"))
+WINDOWS_HOURS = (1, 6, 24)
+LABEL_SCORE = {"positive": 1.0, "negative": -1.0, "neutral": 0.0}
+
+
+def label_scores(labels: Iterable) -> np.ndarray:
+    """Метки positive/negative/neutral (или уже числа) → массив оценок"""
+    return np.array([LABEL_SCORE.get(x, 0.0) if isinstance(x, str) or x is None else float(x)
+                     for x in labels], dtype=float)
+
+
+def _to_datetime64(timestamps) -> np.ndarray:
+    """datetime / ISO-строки / epoch-секунды → datetime64[s]"""
+    arr = np.asarray(timestamps)
+    if np.issubdtype(arr.dtype, np.number):
+        return arr.astype("int64").astype("datetime64[s]")
+    return arr.astype("datetime64[s]")
+
+
+def _age_hours(timestamps, now) -> np.ndarray:
+    ts = _to_datetime64(timestamps)
+    now64 = np.datetime64(now or datetime.utcnow(), "s")
+    return (now64 - ts).astype("int64") / 3600.0
+
+
+def decayed_trend(scores: Sequence[float],
+                  timestamps: Optional[Iterable] = None,
+                  confidences: Optional[Sequence[float]] = None,
+                  now: Optional[datetime] = None,
+                  half_life_hours: float = HALF_LIFE_HOURS,
+                  windows: Iterable[float] = WINDOWS_HOURS) -> Dict:
+    """
+    Затухающий во времени тренд настроения.
+
+    Args:
+        scores: Оценки заголовков (+1 positive, -1 negative, 0 neutral).
+        timestamps: Время публикации (UTC). None — все веса по времени равны.
+        confidences: Уверенность каждой оценки (None — 1.0).
+        now: Момент оценки (UTC); новости из будущего отбрасываются.
+        half_life_hours: Период полураспада веса.
+        windows: Окна (часы) для скользящих средних.
+
+    Returns:
+        {'trend', 'score', 'dispersion', 'weight', 'count', 'distribution', 'windows'}
+        score — взвешенная сумма оценок (аналог «позитивные минус негативные»,
+        где старые новости считаются с меньшим весом).
+    """
+    s = np.asarray(scores, dtype=float)
+    w = np.ones_like(s) if confidences is None else np.nan_to_num(np.asarray(confidences, dtype=float), nan=1.0)
+
+    if timestamps is not None and len(s):
+        age = _age_hours(timestamps, now)
+        valid = age >= 0
+        w = np.where(valid, w * np.power(0.5, np.clip(age, 0, None) / half_life_hours), 0.0)
+    else:
+        age = None
+        valid = np.ones_like(s, dtype=bool)
+
+    total = w.sum()
+    score = float((w * s).sum())
+    trend = score / total if total > 0 else 0.0
+    dispersion = float(np.sqrt((w * (s - trend) ** 2).sum() / total)) if total > 0 else 0.0
+
+    window_stats = {}
+    if age is not None:
+        for h in windows:
+            mask = valid & (age <= h)
+            n = int(mask.sum())
+            window_stats[h] = {"mean": float(s[mask].mean()) if n else 0.0, "count": n}
+
+    counted = s[valid]
+    return {
+        "trend": trend,
+        "score": score,
+        "dispersion": dispersion,
+        "weight": float(total),
+        "count": int(valid.sum()),
+        "distribution": {
+            "positive": int(np.count_nonzero(counted > 0)),
+            "negative": int(np.count_nonzero(counted < 0)),
+            "neutral": int(np.count_nonzero(counted == 0)),
+        },
+        "windows": window_stats,
+    }
+
+
+def trend_series(scores: Sequence[float], timestamps: Iterable, grid: Iterable,
+                 confidences: Optional[Sequence[float]] = None,
+                 half_life_hours: float = HALF_LIFE_HOURS) -> np.ndarray:
+    """
+    Затухающий тренд в каждый момент сетки (без заглядывания вперёд).
+
+    Считается матрицей (len(grid) × len(scores)) — для тысяч заголовков и
+    сотен точек сетки это один векторный проход.
+    """
+    s = np.asarray(scores, dtype=float)
+    c = np.ones_like(s) if confidences is None else np.asarray(confidences, dtype=float)
+    ts = _to_datetime64(timestamps)
+    g = _to_datetime64(list(grid))
+
+    age = (g[:, None] - ts[None, :]).astype("int64") / 3600.0
+    w = np.where(age >= 0, c * np.power(0.5, np.clip(age, 0, None) / half_life_hours), 0.0)
+    total = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (w * s).sum(axis=1) / total, 0.0)
+
+
+def windowed_score_series(scores: Sequence[float], timestamps: Iterable, grid: Iterable,
+                          hours: float = 24, half_life_hours: float = HALF_LIFE_HOURS) -> np.ndarray:
+    """
+    Затухающий score в каждый момент сетки по новостям за последние hours часов.
+
+    То же, что decayed_trend(...)["score"] по новостям из окна (T - hours, T] —
+    как get_sentiment_score_from_cache в момент T. Перебираются только пары
+    (точка сетки, новость из её окна), а не вся матрица сетка × новости.
+    """
+    s = np.asarray(scores, dtype=float)
+    ts = _to_datetime64(timestamps)
+    g = _to_datetime64(list(grid))
+    order = np.argsort(ts, kind="stable")
+    s, ts = s[order], ts[order]
+
+    window = np.timedelta64(int(hours * 3600), "s")
+    lo = np.searchsorted(ts, g - window, side="right")
+    hi = np.searchsorted(ts, g, side="right")
+    counts = hi - lo
+    point = np.repeat(np.arange(len(g)), counts)
+    starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+    item = starts + np.arange(counts.sum())
+
+    age = (g[point] - ts[item]).astype("int64") / 3600.0
+    weights = s[item] * np.power(0.5, age / half_life_hours)
+    return np.bincount(point, weights=weights, minlength=len(g))
+
+
+def ticker_trend(ticker: str, hours: int = 24, half_life_hours: float = HALF_LIFE_HOURS) -> Dict:
+    """Тренд по размеченным новостям тикера из db.storage (для /ideas и get_sentiment_score)"""
+    from db.storage import get_recent_news
+
+    rows = get_recent_news(ticker, hours)
+    if not rows:
+        return decayed_trend([])
+    dts, _, _, labels, _, confidences = zip(*rows)
+    confidences = [1.0 if c is None else c for c in confidences]
+    return decayed_trend(label_scores(labels), dts, confidences, half_life_hours=half_life_hours)
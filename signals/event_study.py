@@ -0,0 +1,197 @@
+"""
+Event study: предсказывает ли метка новости доходность бумаги.
+
+Каждый размеченный заголовок (news: dt, ticker, label, source) привязывается
+к локальной истории свечей (таблица candles или её Parquet-выгрузка) через
+as-of join (pd.merge_asof, by=ticker) — без циклов по событиям:
+
+  * цена входа — close последней свечи, закрывшейся не позже времени новости;
+  * цена выхода — close последней свечи, закрывшейся не позже dt + горизонт
+    (1h / 1d / 5d); если история ещё не дошла до dt + горизонт — NaN.
+
+Позиция по событию — sign(label): +1 на позитив, -1 на негатив, нейтральные
+в PnL не входят. По тикерам и источникам считаются:
+  hit_rate — доля событий, где знак доходности совпал со знаком метки;
+  ic       — ранговая корреляция (Спирмен) метки и доходности;
+  pnl      — суммарная доходность позиций (накопленный PnL, без издержек).
+
+Запуск:
+    python -m signals.event_study --start 2025-01-01 --tickers SBER GAZP
+    python -m signals.event_study --parquet          # из выгрузки db.export
+"""
+import argparse
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+HORIZONS = {"1h": pd.Timedelta(hours=1), "1d": pd.Timedelta(days=1), "5d": pd.Timedelta(days=5)}
+
+# Длина бара: свеча с временем открытия t закрывается в t + BAR_LENGTH[interval]
+BAR_LENGTH = {
+    "1min": pd.Timedelta(minutes=1), "5min": pd.Timedelta(minutes=5), "15min": pd.Timedelta(minutes=15),
+    "30min": pd.Timedelta(minutes=30), "hour": pd.Timedelta(hours=1), "day": pd.Timedelta(days=1),
+}
+
+# Насколько старой может быть цена входа (ночь, выходные)
+ENTRY_TOLERANCE = pd.Timedelta(days=int(os.getenv("EVENT_ENTRY_TOLERANCE_DAYS", "3")))
+
+
+def _where(tickers, start, end, time_column: str):
+    from db.storage import normalize_dt
+
+    conditions, params = [], []
+    if tickers:
+        conditions.append(f"ticker IN ({','.join('?' * len(tickers))})")
+        params += list(tickers)
+    if start is not None:
+        conditions.append(f"{time_column} >= ?")
+        params.append(normalize_dt(start))
+    if end is not None:
+        conditions.append(f"{time_column} < ?")
+        params.append(normalize_dt(end))
+    return (" AND " + " AND ".join(conditions)) if conditions else "", params
+
+
+def load_events(tickers: Optional[Sequence[str]] = None, start=None, end=None,
+                parquet: bool = False) -> pd.DataFrame:
+    """Размеченные новости: time (UTC), ticker, label, source, confidence"""
+    columns = ["dt", "ticker", "label", "source", "confidence"]
+    if parquet:
+        from db import export
+        df = export.load("news", columns=columns, tickers=tickers, start=start, end=end)
+    else:
+        from db import storage
+        where, params = _where(tickers, start, end, "dt")
+        df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM news WHERE ticker IS NOT NULL{where}",
+                               storage._conn(), params=params)
+    df["time"] = pd.to_datetime(df.pop("dt"), format="ISO8601", errors="coerce")
+    return df.dropna(subset=["time", "ticker", "label"])
+
+
+def load_candles(tickers: Optional[Sequence[str]] = None, interval: str = "hour", start=None, end=None,
+                 parquet: bool = False) -> pd.DataFrame:
+    """Свечи из истории: ticker, time (открытие бара, UTC), close"""
+    if parquet:
+        from db import export
+        df = export.load("candles", columns=["ticker", "interval", "time", "close"],
+                         tickers=tickers, start=start, end=end)
+        df = df[df["interval"] == interval].drop(columns="interval")
+    else:
+        from db import storage
+        where, params = _where(tickers, start, end, "time")
+        df = pd.read_sql_query(f"SELECT ticker, time, close FROM candles WHERE interval = ?{where}",
+                               storage._conn(), params=[interval, *params])
+    df["time"] = pd.to_datetime(df["time"], format="ISO8601")
+    return df
+
+
+def forward_returns(events: pd.DataFrame, candles: pd.DataFrame, interval: str = "hour",
+                    horizons: Dict[str, pd.Timedelta] = HORIZONS,
+                    tolerance: pd.Timedelta = ENTRY_TOLERANCE) -> pd.DataFrame:
+    """
+    Дописывает к событиям entry (цена входа) и ret_<h> — доходность за каждый горизонт.
+
+    events: time, ticker, label (+ любые колонки); candles: ticker, time, close.
+    """
+    # ключи as-of join должны совпадать по типу (пустая выборка из SQLite приходит как object)
+    bars = candles[["ticker", "time", "close"]].dropna().astype({"ticker": str, "time": "datetime64[ns]"})
+    bars["closed"] = bars["time"] + BAR_LENGTH[interval]
+    bars = bars.sort_values("closed")
+    last_closed = bars.groupby("ticker")["closed"].max()
+
+    out = events.astype({"ticker": str, "time": "datetime64[ns]"}).sort_values("time").reset_index(drop=True)
+    out = pd.merge_asof(out, bars[["ticker", "closed", "close"]].rename(columns={"close": "entry", "closed": "entry_at"}),
+                        left_on="time", right_on="entry_at", by="ticker",
+                        direction="backward", tolerance=tolerance)
+    for name, delta in horizons.items():
+        out["_exit_time"] = out["time"] + delta
+        out = pd.merge_asof(out.sort_values("_exit_time"),
+                            bars[["ticker", "closed", "close"]].rename(columns={"close": "_exit", "closed": "_exit_at"}),
+                            left_on="_exit_time", right_on="_exit_at", by="ticker", direction="backward")
+        horizon_end = last_closed.reindex(out["ticker"]).to_numpy()
+        valid = (out["_exit_time"] <= horizon_end) & (out["_exit_at"] > out["entry_at"])
+        out[f"ret_{name}"] = np.where(valid, out["_exit"] / out["entry"] - 1.0, np.nan)
+        out = out.drop(columns=["_exit_time", "_exit", "_exit_at"])
+    return out.sort_values("time").reset_index(drop=True)
+
+
+def _spearman(df: pd.DataFrame, by: str, x: str, y: str) -> pd.Series:
+    """Ранговая корреляция x и y внутри групп by (векторно, без apply по группам)"""
+    groups = df[by]
+    dx = df.groupby(by)[x].rank()
+    dy = df.groupby(by)[y].rank()
+    dx = dx - dx.groupby(groups).transform("mean")
+    dy = dy - dy.groupby(groups).transform("mean")
+    cov = (dx * dy).groupby(groups).sum()
+    norm = np.sqrt((dx ** 2).groupby(groups).sum() * (dy ** 2).groupby(groups).sum())
+    return (cov / norm).replace([np.inf, -np.inf], np.nan)
+
+
+def summarize(returns: pd.DataFrame, by: str = "ticker",
+              horizons: Sequence[str] = tuple(HORIZONS)) -> pd.DataFrame:
+    """Метрики по группам by: n_<h>, hit_rate_<h>, ic_<h>, pnl_<h> для каждого горизонта"""
+    df = returns.copy()
+    df["_position"] = np.sign(df["label"].astype(float))
+    result = {}
+    for h in horizons:
+        ret = df[f"ret_{h}"]
+        traded = df[ret.notna()]
+        active = traded[traded["_position"] != 0]
+        moved = active[active[f"ret_{h}"] != 0]
+        result[f"n_{h}"] = active.groupby(by).size()
+        result[f"hit_rate_{h}"] = (np.sign(moved[f"ret_{h}"]) == moved["_position"]).groupby(moved[by]).mean()
+        result[f"ic_{h}"] = _spearman(traded, by, "label", f"ret_{h}")
+        result[f"pnl_{h}"] = (active["_position"] * active[f"ret_{h}"]).groupby(active[by]).sum()
+    table = pd.DataFrame(result)
+    table.index.name = by
+    return table.sort_index()
+
+
+def cumulative_pnl(returns: pd.DataFrame, horizon: str = "1d", by: Optional[str] = None) -> pd.Series:
+    """Накопленный PnL во времени событий (по всем событиям или внутри групп by)"""
+    df = returns.dropna(subset=[f"ret_{horizon}"]).sort_values("time")
+    pnl = np.sign(df["label"].astype(float)) * df[f"ret_{horizon}"]
+    curve = pnl.groupby(df[by]).cumsum() if by else pnl.cumsum()
+    index = pd.MultiIndex.from_arrays([df[by], df["time"]]) if by else df["time"]
+    return pd.Series(curve.values, index=index, name=f"pnl_{horizon}")
+
+
+def run(tickers: Optional[Sequence[str]] = None, start=None, end=None, interval: str = "hour",
+        parquet: bool = False) -> Dict[str, pd.DataFrame]:
+    """Полный прогон: {'returns', 'by_ticker', 'by_source'}"""
+    events = load_events(tickers, start, end, parquet=parquet)
+    # свечи — с запасом на самый длинный горизонт после end
+    candle_end = None if end is None else pd.Timestamp(end) + max(HORIZONS.values()) + BAR_LENGTH[interval]
+    candle_start = None if start is None else pd.Timestamp(start) - ENTRY_TOLERANCE
+    candles = load_candles(tickers, interval, candle_start, candle_end, parquet=parquet)
+    returns = forward_returns(events, candles, interval)
+    return {
+        "returns": returns,
+        "by_ticker": summarize(returns, "ticker"),
+        "by_source": summarize(returns, "source"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event study: метки новостей против доходностей")
+    parser.add_argument("--tickers", nargs="+")
+    parser.add_argument("--start", help="начало окна событий (UTC, ISO)")
+    parser.add_argument("--end", help="конец окна событий, не включая (UTC, ISO)")
+    parser.add_argument("--interval", default="hour", choices=sorted(BAR_LENGTH))
+    parser.add_argument("--parquet", action="store_true", help="читать выгрузку db.export вместо SQLite")
+    args = parser.parse_args()
+
+    result = run(args.tickers, args.start, args.end, args.interval, args.parquet)
+    pd.set_option("display.max_rows", None)
+    pd.set_option("display.width", 200)
+    print(f"\n=== Event study: {len(result['returns'])} событий ===")
+    print("\nПо тикерам:")
+    print(result["by_ticker"].round(4))
+    print("\nПо источникам:")
+    print(result["by_source"].round(4))
+
+
+if __name__ == "__main__":
+    main()
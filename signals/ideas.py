@@ -0,0 +1,79 @@
+"""
+Правила /ideas без обращения к API: SMA-пересечение с ATR-фильтром и композитный скор.
+
+Общие для бота (generate_signal, /ideas) и бэктеста (signals.ideas_backtest):
+одна и та же функция считает сигнал на последней свече в боте и на каждой
+свече истории в бэктесте.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+IDEA_THRESHOLD = 2          # |tech + sentiment| ≥ 2 → идея LONG/SHORT
+
+
+def calculate_sma(df, period):
+    """Вычисляет простую скользящую среднюю"""
+    if len(df) < period:
+        return pd.Series([None] * len(df))
+    return df['close'].rolling(window=period).mean()
+
+
+def calculate_atr(df, period=14):
+    """Вычисляет Average True Range (ATR)"""
+    if len(df) < 2:
+        return pd.Series([None] * len(df))
+
+    # Для ATR нужны high, low, close. Используем close как приближение
+    # В реальной реализации нужны данные OHLC
+    df['prev_close'] = df['close'].shift(1)
+    df['tr'] = df['close'] - df['prev_close']  # Упрощенная версия TR
+    df['tr'] = df['tr'].abs()  # Берем абсолютное значение
+
+    # Вычисляем ATR как SMA от True Range
+    atr = df['tr'].rolling(window=period).mean()
+    return atr
+
+
+def crossover_signals(close: pd.Series, fast: int = 20, slow: int = 50, atr_ratio: float = 1.0) -> pd.Series:
+    """
+    Сигнал BUY / SELL / HOLD на каждой свече — как generate_signal, если бы его вызвали на её закрытии.
+
+    BUY — SMA_fast пересекла SMA_slow снизу вверх на этой свече, SELL — сверху вниз;
+    в обоих случаях ATR(slow) не ниже atr_ratio × среднего ATR за slow свечей.
+    Значение на свече t зависит только от свечей ≤ t.
+    """
+    df = pd.DataFrame({'close': pd.Series(close).astype(float).reset_index(drop=True)})
+    sma_fast = df['close'].rolling(window=fast).mean()
+    sma_slow = df['close'].rolling(window=slow).mean()
+    atr = calculate_atr(df, slow)
+    avg_atr = atr.rolling(window=slow).mean()
+
+    ready = pd.concat([sma_fast, sma_slow, atr, avg_atr], axis=1).notna().all(axis=1)
+    ready &= ready.shift(1, fill_value=False)           # нужны две полные свечи подряд
+    prev_fast, prev_slow = sma_fast.shift(1), sma_slow.shift(1)
+
+    # ATR фильтр: текущая волатильность должна быть достаточной
+    atr_ok = (atr >= atr_ratio * avg_atr) | ~(avg_atr > 0)
+    buy = ready & atr_ok & (prev_fast <= prev_slow) & (sma_fast > sma_slow)
+    sell = ready & atr_ok & (prev_fast >= prev_slow) & (sma_fast < sma_slow)
+    signals = np.where(buy, "BUY", np.where(sell, "SELL", "HOLD"))
+    return pd.Series(signals, index=pd.Series(close).index)
+
+
+def tech_score(signal: str) -> int:
+    """BUY = +1, SELL = -1, HOLD = 0"""
+    return 1 if signal == "BUY" else -1 if signal == "SELL" else 0
+
+
+def composite_score(signal: str, sentiment: int) -> int:
+    """Итоговый скор /ideas: технический сигнал + настроение новостей"""
+    return tech_score(signal) + sentiment
+
+
+def idea_side(score: int, threshold: int = IDEA_THRESHOLD) -> Optional[str]:
+    """LONG / SHORT при |score| ≥ threshold, иначе None (идеи нет)"""
+    if abs(score) < threshold:
+        return None
+    return "LONG" if score > 0 else "SHORT"
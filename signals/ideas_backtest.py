@@ -0,0 +1,180 @@
+"""
+Бэктест композитных идей /ideas (теханализ + настроение новостей).
+
+История свечей и размеченных новостей (таблицы candles и news или их
+Parquet-выгрузка) проигрывается свеча за свечой по тому же правилу, что и
+в боте (signals.ideas):
+
+  * на закрытии свечи t — сигнал SMA-пересечения с ATR-фильтром по свечам ≤ t;
+  * настроение — затухающий score новостей за последние hours часов до закрытия
+    свечи (как get_sentiment_score_from_cache в этот момент), округлённый до целого;
+  * score = tech + sentiment; |score| ≥ 2 → LONG (+1) / SHORT (-1), иначе вне рынка;
+  * позиция открывается по close свечи t и держится hold свечей (по умолчанию
+    до следующего закрытия, как если бы /ideas вызывали на каждой свече).
+
+Заглядывания вперёд нет: решение на свече t использует только закрытые к
+этому моменту свечи и новости, доходность берётся со следующей свечи.
+Живой бот при пустом кэше ещё и скачивает свежие новости — в истории это
+не воспроизводится, бэктест видит только сохранённые метки.
+
+Тикеры и наборы параметров считаются параллельно в пуле процессов.
+
+Запуск:
+    python -m signals.ideas_backtest --tickers SBER GAZP --fast 5 10 --slow 15 30 --atr 0 1 --hours 24
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nlp.trend import HALF_LIFE_HOURS, windowed_score_series
+from signals.event_study import BAR_LENGTH, load_candles, load_events
+from signals.ideas import IDEA_THRESHOLD, crossover_signals
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0")) or os.cpu_count() or 1
+
+DEFAULT_PARAMS = {"fast": 5, "slow": 15, "atr_ratio": 0.0, "hours": 24}     # как /ideas без аргументов
+
+
+def replay(candles: pd.DataFrame, events: pd.DataFrame, fast: int = 5, slow: int = 15,
+           atr_ratio: float = 0.0, hours: float = 24, interval: str = "hour", hold: int = 1,
+           cost_bps: float = 0.0, threshold: int = IDEA_THRESHOLD,
+           half_life_hours: float = HALF_LIFE_HOURS) -> pd.DataFrame:
+    """
+    Проигрывает правило /ideas по свечам одного тикера.
+
+    candles: time (открытие свечи, UTC), close; events: time (UTC), label.
+    Returns:
+        DataFrame по свечам: time, close, tech, sentiment, score, position, ret, strategy_ret, equity
+    """
+    bars = candles.sort_values("time").reset_index(drop=True)
+    closed = bars["time"] + BAR_LENGTH[interval]
+
+    signal = crossover_signals(bars["close"], fast, slow, atr_ratio)
+    tech = np.select([signal == "BUY", signal == "SELL"], [1, -1], 0)
+    if len(events):
+        sentiment = np.round(windowed_score_series(events["label"].astype(float), events["time"].values,
+                                                   closed.values, hours, half_life_hours)).astype(int)
+    else:
+        sentiment = np.zeros(len(bars), dtype=int)
+    score = tech + sentiment
+
+    # идея на закрытии свечи; держим hold свечей, новая идея заменяет старую
+    side = pd.Series(np.where(np.abs(score) >= threshold, np.sign(score), np.nan))
+    position = (side.ffill(limit=hold - 1) if hold > 1 else side).fillna(0.0)
+
+    ret = bars["close"].pct_change().fillna(0.0)
+    trades = position.diff().abs().fillna(position.abs())
+    # доходность свечи t+1 — по позиции, открытой на закрытии t; издержки — в момент смены позиции
+    strategy_ret = position.shift(1, fill_value=0.0) * ret - (trades * cost_bps / 10_000).shift(1, fill_value=0.0)
+
+    return pd.DataFrame({
+        "time": bars["time"],
+        "close": bars["close"],
+        "tech": tech,
+        "sentiment": sentiment,
+        "score": score,
+        "position": position,
+        "ret": ret,
+        "strategy_ret": strategy_ret,
+        "equity": (1.0 + strategy_ret).cumprod(),
+    })
+
+
+def metrics(result: pd.DataFrame) -> Dict:
+    """total_return, max_drawdown, turnover (смен позиции на свечу), trades, exposure, bars"""
+    if result.empty:
+        return {"bars": 0, "total_return": 0.0, "max_drawdown": 0.0, "turnover": 0.0, "trades": 0, "exposure": 0.0}
+    equity = result["equity"]
+    position = result["position"]
+    changes = position.diff().abs().fillna(position.abs())
+    entries = (position != 0) & (position != position.shift(1, fill_value=0.0))
+    return {
+        "bars": len(result),
+        "total_return": float(equity.iloc[-1] - 1.0),
+        "max_drawdown": float((equity / equity.cummax() - 1.0).min()),
+        "turnover": float(changes.sum() / len(result)),
+        "trades": int(entries.sum()),
+        "exposure": float((position != 0).mean()),
+    }
+
+
+def _run_one(task) -> Dict:
+    ticker, params, candles, events, options = task
+    result = replay(candles, events, **params, **options)
+    return {"ticker": ticker, **params, **metrics(result)}
+
+
+def param_grid(fast: Iterable[int], slow: Iterable[int], atr_ratio: Iterable[float],
+               hours: Iterable[float]) -> List[Dict]:
+    """Все сочетания параметров (fast < slow)"""
+    return [{"fast": f, "slow": s, "atr_ratio": a, "hours": h}
+            for f, s, a, h in itertools.product(fast, slow, atr_ratio, hours) if f < s]
+
+
+def run(tickers: Optional[Sequence[str]] = None, grid: Optional[List[Dict]] = None,
+        start=None, end=None, interval: str = "hour", hold: int = 1, cost_bps: float = 0.0,
+        parquet: bool = False, workers: int = BACKTEST_WORKERS,
+        candles: Optional[pd.DataFrame] = None, events: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Бэктест по всем тикерам × наборам параметров; строка результата на пару.
+
+    candles / events можно передать готовыми (ticker, time, close / ticker, time, label),
+    иначе они читаются из истории (load_candles / load_events).
+    """
+    grid = grid or [DEFAULT_PARAMS]
+    if candles is None:
+        candles = load_candles(tickers, interval, start, end, parquet=parquet)
+    if events is None:
+        # новости — с запасом на окно настроения до первой свечи
+        lookback = None if start is None else pd.Timestamp(start) - pd.Timedelta(hours=max(p["hours"] for p in grid))
+        events = load_events(tickers, lookback, end, parquet=parquet)
+
+    options = {"interval": interval, "hold": hold, "cost_bps": cost_bps}
+    news_by_ticker = dict(tuple(events.groupby("ticker")))
+    empty = events.iloc[0:0]
+    tasks = [(ticker, params, bars, news_by_ticker.get(ticker, empty), options)
+             for ticker, bars in candles.groupby("ticker")
+             if not tickers or ticker in tickers
+             for params in grid]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            rows = list(pool.map(_run_one, tasks))
+    else:
+        rows = [_run_one(task) for task in tasks]
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бэктест композитных идей /ideas")
+    parser.add_argument("--tickers", nargs="+")
+    parser.add_argument("--fast", nargs="+", type=int, default=[DEFAULT_PARAMS["fast"]])
+    parser.add_argument("--slow", nargs="+", type=int, default=[DEFAULT_PARAMS["slow"]])
+    parser.add_argument("--atr", nargs="+", type=float, default=[DEFAULT_PARAMS["atr_ratio"]])
+    parser.add_argument("--hours", nargs="+", type=float, default=[DEFAULT_PARAMS["hours"]])
+    parser.add_argument("--start", help="начало истории (UTC, ISO)")
+    parser.add_argument("--end", help="конец истории, не включая (UTC, ISO)")
+    parser.add_argument("--interval", default="hour", choices=sorted(BAR_LENGTH))
+    parser.add_argument("--hold", type=int, default=1, help="сколько свечей держать идею")
+    parser.add_argument("--cost-bps", type=float, default=0.0, help="издержки на смену позиции, б.п.")
+    parser.add_argument("--parquet", action="store_true", help="читать выгрузку db.export вместо SQLite")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    args = parser.parse_args()
+
+    grid = param_grid(args.fast, args.slow, args.atr, args.hours)
+    table = run(args.tickers, grid, args.start, args.end, args.interval, args.hold, args.cost_bps,
+                args.parquet, args.workers)
+    pd.set_option("display.max_rows", None)
+    pd.set_option("display.width", 200)
+    print(f"\n=== Бэктест /ideas: {len(table)} прогонов ===")
+    if not table.empty:
+        print(table.sort_values("total_return", ascending=False).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,55 @@
 #!/usr/bin/env python
 import os
+import threading
+import time
 import pandas as pd
 from datetime import datetime, timedelta
 from tinkoff.invest import Client, CandleInterval
+from signals.ideas import calculate_sma, calculate_atr, crossover_signals
 
 # Переменные окружения
 TINKOFF_SANDBOX_TOKEN = os.getenv("TINKOFF_SANDBOX_TOKEN")
+CANDLE_CACHE_TTL = int(os.getenv("CANDLE_CACHE_TTL", "300"))   # не дольше длины одной свечи
+
+_INTERVAL_SECONDS = {
+    'minute': 60, '1min': 60, '5min': 300, '15min': 900,
+    '30min': 1800, 'hour': 3600, 'day': 86400,
+}
+_candle_cache = {}          # (figi, interval, count) -> (expires_at, DataFrame)
+_candle_lock = threading.Lock()
 
 def get_candles(figi, interval='hour', count=200):
-    """Получает исторические свечи для анализа"""
+    """Получает исторические свечи для анализа (с коротким кэшем в памяти)"""
+    key = (figi, interval, count)
+    now = time.time()
+    with _candle_lock:
+        cached = _candle_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1].copy()        # копия: calculate_atr дописывает колонки
+
+    df = _fetch_candles(figi, interval, count)
+    if 'is_complete' in df:
+        _persist_candles(figi, interval, df)
+        df = df.drop(columns='is_complete')
+    if len(df) > 0:
+        ttl = min(CANDLE_CACHE_TTL, _INTERVAL_SECONDS.get(interval, CANDLE_CACHE_TTL))
+        with _candle_lock:
+            _candle_cache[key] = (now + ttl, df.copy())
+    return df
+
+def _quotation(q):
+    return q.units + q.nano / 1_000_000_000
+
+def _persist_candles(figi, interval, df):
+    """Сохраняет закрытые свечи в таблицу candles (история для бэктестов и экспорта в Parquet)"""
+    try:
+        from db.storage import insert_candles
+        insert_candles(figi, interval, df[df['is_complete']])
+    except Exception as e:
+        print(f"⚠️ Не удалось сохранить свечи {figi}: {e}")
+
+def _fetch_candles(figi, interval='hour', count=200):
+    """Запрашивает свечи в Tinkoff API"""
     if not TINKOFF_SANDBOX_TOKEN:
         raise RuntimeError("❌ Переменная TINKOFF_SANDBOX_TOKEN не найдена!")
 
@@ -57,7 +98,12 @@ def get_candles(figi, interval='hour', count=200):
                 close_price = candle.close.units + candle.close.nano / 1_000_000_000
                 candles_data.append({
                     'time': candle.time.replace(tzinfo=None),
-                    'close': close_price
+                    'close': close_price,
+                    'open': _quotation(candle.open),
+                    'high': _quotation(candle.high),
+                    'low': _quotation(candle.low),
+                    'volume': candle.volume,
+                    'is_complete': candle.is_complete,
                 })
 
             df = pd.DataFrame(candles_data)
@@ -82,27 +128,6 @@ def get_candles(figi, interval='hour', count=200):
                 print(f"Ошибка получения свечей для {figi}: {e}")
             return pd.DataFrame()
 
-def calculate_sma(df, period):
-    """Вычисляет простую скользящую среднюю"""
-    if len(df) < period:
-        return pd.Series([None] * len(df))
-    return df['close'].rolling(window=period).mean()
-
-def calculate_atr(df, period=14):
-    """Вычисляет Average True Range (ATR)"""
-    if len(df) < 2:
-        return pd.Series([None] * len(df))
-
-    # Для ATR нужны high, low, close. Используем close как приближение
-    # В реальной реализации нужны данные OHLC
-    df['prev_close'] = df['close'].shift(1)
-    df['tr'] = df['close'] - df['prev_close']  # Упрощенная версия TR
-    df['tr'] = df['tr'].abs()  # Берем абсолютное значение
-
-    # Вычисляем ATR как SMA от True Range
-    atr = df['tr'].rolling(window=period).mean()
-    return atr
-
 def generate_signal(figi, interval='hour', fast=20, slow=50, atr_ratio=1.0):
     """
     Генерирует сигнал на основе пересечения SMA и фильтра волатильности ATR
@@ -126,50 +151,8 @@ def generate_signal(figi, interval='hour', fast=20, slow=50, atr_ratio=1.0):
         if len(df) < slow:
             return "HOLD"  # Недостаточно данных
 
-        # Вычисляем SMA
-        df[f'sma{fast}'] = calculate_sma(df, fast)
-        df[f'sma{slow}'] = calculate_sma(df, slow)
-
-        # Вычисляем ATR
-        df['atr'] = calculate_atr(df, slow)
-        df['avg_atr'] = df['atr'].rolling(window=slow).mean()
-
-        # Удаляем строки с NaN значениями
-        df = df.dropna()
-
-        if len(df) < 2:
-            return "HOLD"  # Недостаточно данных после очистки
-
-        # Проверяем пересечение на последней свече
-        last_idx = len(df) - 1
-        prev_idx = last_idx - 1
-
-        # Текущие значения SMA
-        current_sma_fast = df.iloc[last_idx][f'sma{fast}']
-        current_sma_slow = df.iloc[last_idx][f'sma{slow}']
-
-        # Предыдущие значения SMA
-        prev_sma_fast = df.iloc[prev_idx][f'sma{fast}']
-        prev_sma_slow = df.iloc[prev_idx][f'sma{slow}']
-
-        # Проверяем ATR фильтр
-        current_atr = df.iloc[last_idx]['atr']
-        avg_atr = df.iloc[last_idx]['avg_atr']
-
-        # ATR фильтр: текущая волатильность должна быть достаточной
-        atr_filter_passed = (current_atr >= atr_ratio * avg_atr) if avg_atr > 0 else True
-
-        # Проверяем пересечения с учетом ATR фильтра
-        if (prev_sma_fast <= prev_sma_slow and 
-            current_sma_fast > current_sma_slow and 
-            atr_filter_passed):
-            return "BUY"  # Пересечение снизу вверх + достаточная волатильность
-        elif (prev_sma_fast >= prev_sma_slow and 
-              current_sma_fast < current_sma_slow and 
-              atr_filter_passed):
-            return "SELL"  # Пересечение сверху вниз + достаточная волатильность
-        else:
-            return "HOLD"  # Нет пересечения или недостаточная волатильность
+        # Пересечение SMA с ATR-фильтром на последней свече (то же правило — в бэктесте /ideas)
+        return str(crossover_signals(df['close'], fast, slow, atr_ratio).iloc[-1])
 
     except Exception as e:
         print(f"Ошибка генерации сигнала для {figi}: {e}")
@@ -0,0 +1,38 @@
+import pytest
+
+import backtest_sentiment
+from db import migrations, storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations, "LEGACY_SENTIMENT_DB", str(tmp_path / "missing.db"))
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    storage.insert_many([
+        ("2025-01-01T10:00:00", "SBER", "a", 1, "rss"),
+        ("2025-01-02T10:00:00", "SBER", "b", 1, "rss"),
+        ("2025-01-03T10:00:00", "SBER", "c", -1, "rss"),
+        ("2025-01-01T10:00:00", "GAZP", "d", -1, "rss"),
+        ("2025-01-02T10:00:00", "GAZP", "e", 0, "rss"),
+    ])
+    yield storage
+    storage.close()
+
+
+def test_counts_sorted_by_pnl(store):
+    assert list(backtest_sentiment.sentiment_counts()) == [
+        ("SBER", 3, 2, 1, 0, 1),
+        ("GAZP", 2, 0, 1, 1, -1),
+    ]
+
+
+def test_ticker_and_time_filters(store):
+    assert list(backtest_sentiment.sentiment_counts(["GAZP"])) == [("GAZP", 2, 0, 1, 1, -1)]
+    rows = backtest_sentiment.sentiment_counts(start="2025-01-02", end="2025-01-03 00:00:00")
+    assert list(rows) == [("SBER", 1, 1, 0, 0, 1), ("GAZP", 1, 0, 0, 1, 0)]
+
+
+def test_counting_reads_only_covering_index(store):
+    sql = backtest_sentiment._QUERY.format(where="")
+    plan = " ".join(r[-1] for r in store._conn().execute("EXPLAIN QUERY PLAN " + sql))
+    assert "COVERING INDEX idx_news_ticker_dt_label" in plan, plan
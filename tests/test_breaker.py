@@ -0,0 +1,57 @@
+import health.metrics as metrics
+from health.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_failures_and_probes_once():
+    br = CircuitBreaker("x", fail_threshold=2, cooldown=0)
+    br.report(False)
+    assert br.state == CLOSED
+    br.report(False)
+    assert br.state == OPEN
+
+    assert br.allow()              # cooldown прошёл → одна проба
+    assert br.state == HALF_OPEN
+    assert not br.allow()          # вторую пробу не пускаем
+    br.report(True)
+    assert br.state == CLOSED and br.allow()
+
+
+def test_failed_probe_doubles_cooldown():
+    br = CircuitBreaker("x", fail_threshold=1, cooldown=0.001, max_cooldown=1)
+    br.report(False)
+    br.opened_at -= 1
+    assert br.allow()
+    br.report(False)
+    assert br.state == OPEN and br.cooldown == 0.002
+
+
+def test_metrics_record_feeds_breaker(tmp_path, monkeypatch):
+    from health import breaker
+    monkeypatch.setattr(metrics, "_LOG", str(tmp_path / "health.log"))
+    for _ in range(breaker.FAIL_THRESHOLD):
+        metrics.record("rss_fetch", {"source": "rss:test.invalid", "ok": False})
+    assert not breaker.allow("rss:test.invalid")
+    assert breaker.health_scores()["rss:test.invalid"]["state"] == OPEN
+
+
+def test_cancelled_probe_is_released():
+    br = CircuitBreaker("x", fail_threshold=1, cooldown=0)
+    br.report(False)
+    assert br.allow() and not br.allow()
+    br.release()
+    assert br.allow()
+
+
+def test_missing_newsapi_key_does_not_trip_breaker(monkeypatch):
+    import nlp.news_feed as nf
+    from health import breaker
+
+    monkeypatch.delenv("NEWSAPI_API_KEY", raising=False)
+    def fail_on_record(event, payload):
+        raise AssertionError(f"записано как сбой источника: {event}")
+
+    monkeypatch.setattr(nf, "record", fail_on_record)
+    before = breaker.get("newsapi").failures
+    for _ in range(breaker.FAIL_THRESHOLD + 1):
+        assert nf._newsapi_query("SBER") == []
+    assert breaker.get("newsapi").failures == before and breaker.get("newsapi").state == CLOSED
@@ -0,0 +1,74 @@
+import nlp.sentiment as sentiment
+
+
+def _fake_models(monkeypatch, probs_by_model):
+    calls = []
+
+    def fake_predict(name, texts, **kwargs):
+        calls.append((name, list(texts)))
+        return [probs_by_model[name] for _ in texts]
+
+    monkeypatch.setattr(sentiment, "predict_proba", fake_predict)
+    monkeypatch.setattr(sentiment, "CASCADE_STATS", sentiment.Counter())
+    return calls
+
+
+def test_confident_lexicon_skips_models(monkeypatch):
+    calls = _fake_models(monkeypatch, {})
+    labels = sentiment.classify_cascade_batch(["Обвал и крах: кризис на рынке"], threshold=0.7)
+    assert labels == ["negative"]
+    assert calls == []
+    assert sentiment.cascade_stats()["lexicon"] == 1
+
+
+def test_escalates_only_undecided_texts(monkeypatch):
+    en = sentiment.MODEL_CONFIG["en_models"]
+    calls = _fake_models(monkeypatch, {
+        en[0]["name"]: [0.95, 0.03, 0.02],     # FinBERT: positive, уверенно
+        en[1]["name"]: [0.1, 0.2, 0.7],
+    })
+    labels = sentiment.classify_cascade_batch(
+        ["Catastrophe: crash and collapse", "Company held a meeting"], threshold=0.7)
+
+    assert labels == ["negative", "positive"]
+    assert calls == [(en[0]["name"], ["Company held a meeting"])]   # второй модели не понадобилось
+    stats = sentiment.cascade_stats()
+    assert (stats["lexicon"], stats["model"], stats["ensemble"]) == (1, 1, 0)
+
+
+def test_ambiguous_text_uses_full_ensemble(monkeypatch):
+    en = sentiment.MODEL_CONFIG["en_models"]
+    _fake_models(monkeypatch, {
+        en[0]["name"]: [0.4, 0.35, 0.25],
+        en[1]["name"]: [0.2, 0.3, 0.5],
+    })
+    assert sentiment.classify_cascade_batch(["Company held a meeting"], threshold=0.9) == ["positive"]
+    assert sentiment.cascade_stats()["fallthrough"] == 1
+
+
+def test_cascade_agrees_with_ensemble_on_ambiguous_text(monkeypatch):
+    en = sentiment.MODEL_CONFIG["en_models"]
+    _fake_models(monkeypatch, {
+        en[0]["name"]: [0.2, 0.1, 0.7],
+        en[1]["name"]: [0.2, 0.6, 0.2],
+    })
+    text = "Profit rises at the company"
+    expected = sentiment._ensemble_classify_batch([text], sentiment.MODEL_CONFIG["en_models"])
+    assert expected == ["positive"]
+    assert sentiment.classify_cascade_batch([text], threshold=0.9) == expected
+
+
+def test_cascade_never_runs_a_model_twice_or_beyond_ensemble(monkeypatch):
+    ru = sentiment.MODEL_CONFIG["ru_models"]
+    calls = _fake_models(monkeypatch, {m["name"]: [0.34, 0.33, 0.33] for m in ru})
+    texts = ["Компания провела собрание акционеров", "Совет директоров собрался в среду"]
+
+    sentiment.classify_cascade_batch(texts, threshold=0.99)
+    seen = [(name, text) for name, batch in calls for text in batch]
+    assert len(seen) == len(set(seen))
+    cascade_models = {name for name, _ in calls}
+
+    calls.clear()
+    sentiment._ensemble_classify_batch(texts, ru)
+    assert cascade_models <= {name for name, _ in calls}
+    assert sentiment.MODEL_CONFIG["ru_models"][2]["name"] not in cascade_models
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import writer as db_writer
+from db.writer import Writer
+
+
+def _init(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS t (k TEXT PRIMARY KEY, v INTEGER)")
+
+
+@pytest.fixture
+def writer(tmp_path):
+    w = Writer(str(tmp_path / "w.db"), init=_init)
+    yield w
+    w.close()
+
+
+def test_concurrent_writes_grouped_into_few_commits(writer):
+    gate = threading.Event()
+    writer.call(lambda conn: gate.wait(5))          # держим писателя, пока копится очередь
+
+    futures = []
+    threads = [threading.Thread(target=lambda i=i: futures.append(
+        writer.execute("INSERT INTO t VALUES (?, ?)", (f"k{i}", i)))) for i in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    gate.set()
+
+    assert all(f.result(timeout=5) == 1 for f in futures)
+    assert writer.commits <= 3
+    conn = sqlite3.connect(writer.path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 50
+
+
+def test_failed_op_does_not_roll_back_neighbours(writer):
+    gate = threading.Event()
+    writer.call(lambda conn: gate.wait(5))
+    ok1 = writer.execute("INSERT INTO t VALUES ('a', 1)")
+    bad = writer.execute("INSERT INTO t VALUES ('a', 2)")       # нарушение PRIMARY KEY
+    ok2 = writer.executemany("INSERT INTO t VALUES (?, ?)", [("b", 1), ("c", 2)])
+    gate.set()
+
+    assert ok1.result(timeout=5) == 1 and ok2.result(timeout=5) == 2
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=5)
+    conn = sqlite3.connect(writer.path)
+    assert conn.execute("SELECT k, v FROM t ORDER BY k").fetchall() == [("a", 1), ("b", 1), ("c", 2)]
+
+
+def test_non_transactional_call(writer):
+    writer.execute("INSERT INTO t VALUES ('x', 1)")
+    assert writer.call(lambda conn: conn.in_transaction, transactional=False).result(timeout=5) is False
+    assert writer.call(lambda conn: conn.in_transaction).result(timeout=5) is True
+
+
+def test_reader_is_read_only_and_sees_commits(tmp_path):
+    path = str(tmp_path / "r.db")
+    w = db_writer.get_writer(path, init=_init)
+    assert db_writer.get_writer(path) is w
+    w.execute("INSERT INTO t VALUES ('k', 1)").result(timeout=5)
+
+    conn = db_writer.reader(path)
+    assert conn.execute("SELECT v FROM t").fetchone() == (1,)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO t VALUES ('z', 0)")
+    db_writer.close(path)
+
+
+def test_failed_commit_does_not_wedge_writer(tmp_path):
+    def init(conn):
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("CREATE TABLE p (k TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE c (k TEXT REFERENCES p(k) DEFERRABLE INITIALLY DEFERRED)")
+
+    w = Writer(str(tmp_path / "fk.db"), init=init)
+    try:
+        bad = w.execute("INSERT INTO c VALUES ('нет')")              # FK проверяется только на COMMIT
+        with pytest.raises(sqlite3.IntegrityError):
+            bad.result(timeout=5)
+        # операция сама сломала транзакцию — ROLLBACK TO op падает, писатель продолжает работу
+        broken = w.call(lambda conn: conn.execute("COMMIT"))
+        with pytest.raises(sqlite3.Error):
+            broken.result(timeout=5)
+        assert w.execute("INSERT INTO p VALUES ('a')").result(timeout=5) == 1
+    finally:
+        w.close()
+    with pytest.raises(sqlite3.OperationalError):
+        w.execute("INSERT INTO p VALUES ('b')").result(timeout=5)
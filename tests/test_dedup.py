@@ -0,0 +1,26 @@
+from nlp.dedup import DEDUP_DISTANCE, cluster, hamming, normalize, simhash
+
+
+def test_normalize_strips_source_tail():
+    assert normalize("Сбербанк увеличил прибыль - РБК") == "сбербанк увеличил прибыль"
+
+
+def test_reprints_collapse_into_one_cluster():
+    texts = [
+        "Сбербанк увеличил чистую прибыль на 20% в третьем квартале",
+        "Газпром снизил добычу газа в октябре",
+        "Сбербанк увеличил чистую прибыль на 20% в III квартале - РБК",
+    ]
+    clusters = cluster(texts)
+    assert len(clusters) == 2
+    assert clusters[0]["size"] == 2
+    assert clusters[0]["indices"] == [0, 2]
+
+
+def test_opposite_meaning_not_merged():
+    texts = [
+        "Сбербанк увеличил чистую прибыль на 20% в третьем квартале",
+        "Сбербанк сократил чистую прибыль на 20% в третьем квартале",
+    ]
+    assert hamming(simhash(texts[0]), simhash(texts[1])) <= DEDUP_DISTANCE
+    assert [c["size"] for c in cluster(texts)] == [1, 1]
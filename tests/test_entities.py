@@ -0,0 +1,21 @@
+from nlp.entities import EntityMatcher, get_matcher
+
+
+def test_ru_en_names_and_tickers():
+    m = get_matcher()
+    assert m.match("Акции Сбербанка выросли на 3%") == {"SBER"}
+    assert m.match("Газпром и ЛУКОЙЛ объявили дивиденды") == {"GAZP", "LKOH"}
+    assert m.match("NVIDIA beats estimates, AMD falls") == {"NVDA", "AMD"}
+    assert m.match("BBG004730N88 торгуется выше") == {"YNDX"}
+
+
+def test_word_boundaries():
+    m = EntityMatcher({"AMD": ["AMD"]})
+    assert m.match("CAMDEN news") == set()
+    assert m.match("amd.") == {"AMD"}
+
+
+def test_mentions_unknown_query_falls_back_to_substring():
+    m = get_matcher()
+    assert m.mentions("Tesla recalls cars", "tesla")
+    assert not m.mentions("Индекс МосБиржи", "SBER")
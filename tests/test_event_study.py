@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from db import migrations, storage
+from signals import event_study
+
+START = pd.Timestamp("2025-03-03 07:00")
+
+
+def _candles(ticker, step):
+    time = pd.date_range(START, periods=24 * 8, freq="h")
+    return pd.DataFrame({"ticker": ticker, "time": time, "close": 100.0 + step * np.arange(len(time))})
+
+
+def test_forward_returns_use_only_closed_bars():
+    candles = _candles("SBER", 1.0)
+    events = pd.DataFrame({"ticker": ["SBER", "SBER"], "label": [1, 1], "source": ["rss", "rss"],
+                           "time": [START + pd.Timedelta(hours=3), START + pd.Timedelta(days=7, hours=12)]})
+    out = event_study.forward_returns(events, candles)
+
+    # в 10:00 последняя закрытая свеча — 09:00 (close 102), через час — свеча 10:00 (close 103)
+    assert out.loc[0, "entry"] == 102.0
+    assert out.loc[0, "ret_1h"] == pytest.approx(103.0 / 102.0 - 1)
+    assert out.loc[0, "ret_1d"] == pytest.approx(126.0 / 102.0 - 1)
+    # история не дошла до горизонта — доходности нет
+    assert np.isnan(out.loc[1, "ret_1d"]) and np.isnan(out.loc[1, "ret_5d"])
+
+
+def test_summary_by_ticker_and_source():
+    candles = pd.concat([_candles("SBER", 1.0), _candles("GAZP", -0.1)])
+    times = [START + pd.Timedelta(hours=h) for h in (2, 10, 26, 50)]
+    events = pd.DataFrame({
+        "ticker": ["SBER", "SBER", "GAZP", "GAZP"],
+        "time": times,
+        "label": [1, 1, 1, -1],
+        "source": ["llm", "rss", "llm", "rss"],
+    })
+    returns = event_study.forward_returns(events, candles)
+
+    by_ticker = event_study.summarize(returns, "ticker")
+    assert by_ticker.loc["SBER", "hit_rate_1d"] == 1.0 and by_ticker.loc["SBER", "pnl_1d"] > 0
+    assert by_ticker.loc["GAZP", "hit_rate_1d"] == 0.5
+    # цена падает линейно: у позднего события (метка -1) падение в процентах сильнее
+    assert by_ticker.loc["GAZP", "ic_1d"] == pytest.approx(1.0)
+
+    by_source = event_study.summarize(returns, "source")
+    assert list(by_source.index) == ["llm", "rss"] and (by_source["n_1h"] == 2).all()
+
+    curve = event_study.cumulative_pnl(returns, "1h")
+    assert curve.iloc[-1] == pytest.approx((np.sign(returns["label"]) * returns["ret_1h"]).sum())
+
+
+def test_run_from_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations, "LEGACY_SENTIMENT_DB", str(tmp_path / "missing.db"))
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    try:
+        storage.insert_candles("BBG0047315Y7", "hour", _candles("SBER", 1.0)).result()
+        storage.insert_many([(START + pd.Timedelta(hours=5), "SBER", "Сбербанк отчитался", 1, "rss")])
+
+        result = event_study.run(tickers=["SBER"])
+        assert len(result["returns"]) == 1
+        assert result["by_ticker"].loc["SBER", "pnl_1h"] > 0
+        assert "rss" in result["by_source"].index
+    finally:
+        storage.close()
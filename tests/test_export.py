@@ -0,0 +1,61 @@
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from db import export, migrations, storage
+
+T0 = datetime(2025, 3, 10, 10, 0, 0)
+
+
+@pytest.fixture
+def news_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    monkeypatch.setattr(migrations, "LEGACY_SENTIMENT_DB", str(tmp_path / "legacy.db"))
+    storage.insert_many([(T0 + timedelta(days=i), ("SBER", "GAZP")[i % 2], f"заголовок {i}", 1, "rss")
+                         for i in range(6)])
+    candles = pd.DataFrame({
+        "time": [T0 + timedelta(hours=h) for h in range(3)],
+        "open": [100.0, 101.0, 102.0], "high": [101.0, 102.0, 103.0],
+        "low": [99.0, 100.0, 101.0], "close": [101.0, 102.0, 103.0], "volume": [10, 20, 30],
+    })
+    storage.insert_candles("BBG004730N88", "hour", candles).result()
+    yield str(tmp_path / "news.db")
+    storage.close()
+
+
+def test_candles_persisted_with_ticker(news_db):
+    df = storage.get_candle_history("YNDX", "hour", start=T0 + timedelta(hours=1))
+    assert list(df["close"]) == [102.0, 103.0]
+    # повтор тех же баров не дублирует строки
+    storage.insert_candles("BBG004730N88", "hour", df).result()
+    assert len(storage.get_candle_history("BBG004730N88")) == 3
+
+
+def test_incremental_export_and_partitions(news_db, tmp_path):
+    out = str(tmp_path / "parquet")
+    first = export.run_export(export_dir=out, chunk=4)
+    assert [s["rows"] for s in first] == [6, 0, 3]
+
+    assert (tmp_path / "parquet" / "news" / "date=2025-03-10" / "ticker=SBER").is_dir()
+    assert json.loads((tmp_path / "parquet" / "_state.json").read_text())["news"] == 6
+
+    storage.insert(T0 + timedelta(days=7), "SBER", "новый", -1, "llm")
+    assert export.export_table("news", export_dir=out)["rows"] == 1
+    assert export.export_table("news", export_dir=out)["rows"] == 0
+    assert export.load("news", export_dir=out)["id"].tolist() == list(range(1, 8))
+
+
+def test_load_filters_columns(news_db, tmp_path):
+    out = str(tmp_path / "parquet")
+    export.run_export(export_dir=out)
+
+    df = export.load("news", columns=["dt", "label"], tickers=["SBER"],
+                     start=T0 + timedelta(days=1), end=T0 + timedelta(days=5), export_dir=out)
+    assert list(df.columns) == ["dt", "label"]
+    assert df["dt"].tolist() == ["2025-03-12T10:00:00", "2025-03-14T10:00:00"]
+
+    arrays = export.load_arrays("candles", ["close", "volume"], tickers=["YNDX"], export_dir=out)
+    assert sorted(arrays["close"]) == [101.0, 102.0, 103.0]
+    assert export.load("candles", export_dir=str(tmp_path / "empty")).empty
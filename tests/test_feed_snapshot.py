@@ -0,0 +1,29 @@
+import time
+from datetime import datetime
+
+import nlp.feed_snapshot as fs
+import nlp.news_feed as nf
+
+
+def test_items_roundtrip_and_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs, "SNAPSHOT_DIR", str(tmp_path))
+    item = {"title": "Газпром", "dt": datetime(2025, 6, 1, 10, 0), "source": "u"}
+    fs.save_items("u", [item], fetched_at=time.time() - 3600)
+
+    assert fs.load("u", "items")["data"] == [item]
+    assert fs.lookup("u", "items") is None            # старше TTL
+    monkeypatch.setenv("NEWS_REPLAY", "1")
+    assert fs.lookup("u", "items")["data"] == [item]  # replay отдаёт любой давности
+
+
+def test_replay_mode_never_touches_network(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs, "SNAPSHOT_DIR", str(tmp_path))
+    fs.save_items("feed-a", [{"title": "A", "dt": None, "source": "feed-a"}])
+    monkeypatch.setenv("NEWS_REPLAY", "1")
+
+    def no_network(url, timeout):
+        raise AssertionError("network call in replay mode")
+
+    monkeypatch.setattr(nf, "_parse_feed", no_network)
+    entries = nf.fetch_rss_entries(["feed-a", "feed-b"])
+    assert [e["title"] for e in entries] == ["A"]
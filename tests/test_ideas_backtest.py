@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from signals import ideas, ideas_backtest
+
+START = pd.Timestamp("2025-03-03 07:00")
+
+
+def _v_shape(n=80, bottom=40):
+    """Падение, затем рост: SMA5 пересекает SMA15 снизу вверх вскоре после дна"""
+    close = np.r_[np.linspace(120, 100, bottom), np.linspace(100, 130, n - bottom)]
+    return pd.DataFrame({"ticker": "SBER", "time": pd.date_range(START, periods=n, freq="h"), "close": close})
+
+
+def test_scoring_rule():
+    assert ideas.composite_score("BUY", 1) == 2 and ideas.composite_score("HOLD", -1) == -1
+    assert ideas.idea_side(2) == "LONG" and ideas.idea_side(-3) == "SHORT" and ideas.idea_side(1) is None
+
+
+def test_crossover_signals_have_no_look_ahead():
+    close = 100 + np.cumsum(np.random.default_rng(7).normal(size=150))
+    full = ideas.crossover_signals(pd.Series(close), 5, 15, 0.5)
+    assert {"BUY", "SELL"} <= set(full)
+    for t in range(len(close)):
+        assert ideas.crossover_signals(pd.Series(close[:t + 1]), 5, 15, 0.5).iloc[-1] == full[t]
+
+
+def test_replay_trades_on_idea_bar_only():
+    candles = _v_shape()
+    cross = int(np.flatnonzero(ideas.crossover_signals(candles["close"], 5, 15, 0) == "BUY")[0])
+    # позитив внутри свечи пересечения: tech +1 и sentiment +1 только вместе дают идею
+    events = pd.DataFrame({"time": [candles["time"][cross]], "label": [1]})
+    result = ideas_backtest.replay(candles, events, fast=5, slow=15, hours=24)
+
+    assert result["position"].tolist() == [1.0 if i == cross else 0.0 for i in range(len(result))]
+    assert result.loc[cross, "score"] == 2
+    assert result.loc[cross + 1, "strategy_ret"] == pytest.approx(result.loc[cross + 1, "ret"])
+
+    stats = ideas_backtest.metrics(result)
+    assert stats["trades"] == 1 and stats["total_return"] > 0
+    assert stats["turnover"] == pytest.approx(2 / len(result))
+    assert stats["max_drawdown"] == 0.0
+
+    # без заглядывания вперёд: обрезка будущих свечей не меняет прошлые решения
+    for k in (cross, cross + 1, cross + 5):
+        prefix = ideas_backtest.replay(candles.iloc[:k], events, fast=5, slow=15, hours=24)
+        assert prefix["position"].tolist() == result["position"][:k].tolist()
+
+
+def test_run_parallel_matches_sequential():
+    candles = pd.concat([_v_shape(), _v_shape().assign(ticker="GAZP", close=lambda d: 250 - d["close"])])
+    events = pd.DataFrame({"ticker": ["SBER", "GAZP"], "time": [START + pd.Timedelta(hours=45)] * 2,
+                           "label": [1, -1]})
+    grid = ideas_backtest.param_grid([5, 10], [15], [0.0], [24])
+
+    sequential = ideas_backtest.run(grid=grid, candles=candles, events=events, workers=1)
+    parallel = ideas_backtest.run(grid=grid, candles=candles, events=events, workers=2)
+    assert len(sequential) == 4
+    pd.testing.assert_frame_equal(sequential, parallel)
+    assert (sequential["trades"] >= 1).all() and (sequential["total_return"] > 0).all()
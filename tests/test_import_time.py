@@ -0,0 +1,40 @@
+"""Бенчмарк времени импорта: тяжёлые зависимости и подключения — только при первом использовании"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_US = int(os.getenv("IMPORT_BUDGET_US", "1500000"))     # 1.5 с с запасом под медленный CI
+
+HEAVY = ("openai", "redis", "torch", "transformers", "langdetect", "aiohttp", "pandas")
+
+
+def _importtime(module: str, env=None):
+    """Запускает `python -X importtime -c 'import module'`; возвращает (cumulative µs, модули)"""
+    code = f"import sys, {module}; print(','.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+        env={**os.environ, **(env or {})},
+    )
+    assert proc.returncode == 0, proc.stderr[-500:]
+    cumulative = 0
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s?(\S+)$", line)
+        if m and m.group(2) == module:
+            cumulative = int(m.group(1))
+    return cumulative, set(proc.stdout.strip().split(","))
+
+
+@pytest.mark.parametrize("module", ["nlp.sentiment", "nlp.sentiment_llm", "db.storage"])
+def test_import_is_light(module, tmp_path):
+    env = {"NEWS_DB": str(tmp_path / "news.db")}
+    cumulative, modules = _importtime(module, env)
+
+    assert not modules & set(HEAVY), f"{module} тянет при импорте: {modules & set(HEAVY)}"
+    assert cumulative < IMPORT_BUDGET_US, f"{module}: {cumulative / 1e6:.2f} с"
+    # подключение к SQLite не открывается при импорте
+    assert not (tmp_path / "news.db").exists()
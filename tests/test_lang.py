@@ -0,0 +1,18 @@
+from nlp.lang import detect_lang, partition
+
+
+def test_script_ratio_routing():
+    assert detect_lang("Сбербанк увеличил прибыль") == "ru"
+    assert detect_lang("Nvidia beats estimates") == "en"
+    assert detect_lang("Акции NVDA и AMD выросли на фоне отчёта Nvidia") == "ru"
+    assert detect_lang("12:30 +5%") == "en"
+
+
+def test_partition_keeps_indices():
+    texts = ["Газпром снизил добычу", "AMD falls", "Рубль укрепился", "Oil rises"]
+    assert partition(texts) == {"ru": [0, 2], "en": [1, 3]}
+
+
+def test_mixed_text_is_deterministic():
+    text = "Sberbank CEO Греф: results strong, прибыль выросла"
+    assert len({detect_lang(text) for _ in range(5)}) == 1
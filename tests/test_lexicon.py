@@ -0,0 +1,44 @@
+from nlp.lexicon import FALLBACK_LEXICON, FALLBACK_TERMS, FINANCIAL_LEXICON, FINANCIAL_TERMS
+
+TEXTS = [
+    "Резкий рост прибыли: Сбербанк обновил рекорд",
+    "Акции Газпрома упали, кризис и обвал на рынке",
+    "Котировки остались без изменений",
+    "Nvidia shares surge as revenue beat estimates",
+    "AMD stock fell, earnings declined and outlook is down",
+    "",
+]
+
+
+def _naive_financial(text, lang):
+    text_lower = text.lower()
+    signals = {'positive': 0, 'negative': 0, 'neutral': 0}
+    for sentiment_type, terms_dict in FINANCIAL_TERMS.items():
+        for term in terms_dict.get(lang, []):
+            if term in text_lower:
+                key = 'positive' if 'positive' in sentiment_type else \
+                      'negative' if 'negative' in sentiment_type else 'neutral'
+                signals[key] += 2.0 if 'strong' in sentiment_type else 1.0
+    return signals
+
+
+def test_financial_lexicon_matches_naive_loops():
+    for text in TEXTS:
+        for lang in ("ru", "en"):
+            assert FINANCIAL_LEXICON.score(text, lang) == _naive_financial(text, lang)
+
+
+def test_score_many_matches_score():
+    langs = ["ru", "ru", "ru", "en", "en", None]
+    rows = FINANCIAL_LEXICON.score_many(TEXTS, langs)
+    for row, text, lang in zip(rows.tolist(), TEXTS, langs):
+        assert row == list(FINANCIAL_LEXICON.score(text, lang).values())
+
+
+def test_fallback_counts_every_language():
+    for text in TEXTS:
+        low = text.lower()
+        pos = sum(1 for w in FALLBACK_TERMS['positive'] if w in low)
+        neg = sum(1 for w in FALLBACK_TERMS['negative'] if w in low)
+        signals = FALLBACK_LEXICON.score(text)
+        assert (signals['positive'], signals['negative']) == (pos, neg)
@@ -0,0 +1,43 @@
+from nlp.memo import Memo, memoize_batch, normalize_key
+
+
+def test_cosmetic_variants_share_key():
+    assert normalize_key("Газпром снизил добычу") == normalize_key("  газпром  СНИЗИЛ\tдобычу ")
+
+
+def test_signs_and_decimals_change_key():
+    assert normalize_key("SBER +5%") != normalize_key("SBER -5%")
+    assert normalize_key("Ставка 7,5%") != normalize_key("Ставка 75%")
+
+
+def test_ttl_and_stats():
+    now = [1000.0]
+    memo = Memo("t", ttl=60, shared=False, clock=lambda: now[0])
+    memo.set("Сбербанк  отчитался", "positive")
+    assert memo.get("сбербанк отчитался") == "positive"
+    now[0] += 61
+    assert memo.get("сбербанк отчитался") is None
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 0)
+
+
+def test_byte_limit_evicts_least_recent():
+    memo = Memo("t", max_bytes=600, shared=False)
+    for i in range(10):
+        memo.set(f"headline {i}", "neutral")
+    stats = memo.stats()
+    assert stats["bytes"] <= 600 and stats["evictions"] > 0
+    assert memo.get("headline 9") == "neutral"
+    assert memo.get("headline 0") is None
+
+
+def test_memoize_batch_only_scores_misses():
+    seen = []
+
+    def score(texts):
+        seen.append(list(texts))
+        return ["positive"] * len(texts)
+
+    memoize_batch("test_batch", ["A", "B"], score)
+    assert memoize_batch("test_batch", ["a ", "C", "b"], score) == ["positive"] * 3
+    assert seen == [["A", "B"], ["C"]]
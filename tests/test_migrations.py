@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from db import migrations, storage
+
+
+@pytest.fixture
+def legacy_cache(tmp_path, monkeypatch):
+    """Старый news_cache.db в рабочем каталоге с sentiment_cache"""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE sentiment_cache (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text_hash TEXT UNIQUE NOT NULL, text TEXT NOT NULL, sentiment TEXT NOT NULL,
+        confidence REAL DEFAULT 0.5, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        ticker TEXT, source TEXT DEFAULT 'llm')""")
+    conn.execute("INSERT INTO sentiment_cache(text_hash, text, sentiment, ticker) VALUES (?, ?, ?, ?)",
+                 (storage.headline_hash("Сбер отчитался"), "Сбер отчитался", "positive", "SBER"))
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(migrations, "LEGACY_SENTIMENT_DB", str(path))
+    return path
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, legacy_cache):
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    yield storage
+    storage.close()
+
+
+def test_fresh_database_at_latest_version(store):
+    conn = store._conn()
+    assert migrations.schema_version(conn) == len(migrations.MIGRATIONS)
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"news", "sentiment_cache"} <= tables
+    fks = conn.execute("PRAGMA foreign_key_list(news)").fetchall()
+    assert [(fk[2], fk[3], fk[4]) for fk in fks] == [("sentiment_cache", "sentiment_hash", "text_hash")]
+
+
+def test_legacy_sentiment_rows_imported(store):
+    rows = store._conn().execute("SELECT text, sentiment FROM sentiment_cache").fetchall()
+    assert rows == [("Сбер отчитался", "positive")]
+
+
+def test_migrations_run_once(store, tmp_path):
+    store.close()
+    conn = sqlite3.connect(tmp_path / "news.db", isolation_level=None)
+    assert migrations.migrate(conn) == len(migrations.MIGRATIONS)
+    assert conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0] == 1    # не задвоилось
+    conn.close()
+
+
+def test_news_joined_to_sentiment(store):
+    text_hash = storage.headline_hash("Сбер отчитался")
+    store.insert("2030-01-01T00:00:00", "SBER", "Сбер отчитался", 1, "llm", 0.8, sentiment_hash=text_hash)
+    store.insert("2030-01-01T00:00:00", "GAZP", "Газпром без разметки", 0, "rss", 0.3)
+
+    joined = store._conn().execute("""SELECT n.ticker, s.sentiment FROM news n
+                                      JOIN sentiment_cache s ON s.text_hash = n.sentiment_hash""").fetchall()
+    assert joined == [("SBER", "positive")]
+    assert [r[0] for r in store.get_ticker_sentiments("SBER", 24)] == ["positive"]     # без задвоения
+
+
+def test_foreign_key_enforced_and_set_null(store):
+    writer = store._writer()
+    with pytest.raises(sqlite3.IntegrityError):
+        writer.execute("INSERT INTO news(dt, ticker, headline, label, source, hash, sentiment_hash) "
+                       "VALUES ('2030-01-01T00:00:00', 'SBER', 'x', 0, 'rss', 'x', 'нет такого')").result()
+
+    text_hash = storage.headline_hash("Сбер отчитался")
+    store.insert("2030-01-01T00:00:00", "SBER", "Сбер отчитался", 1, "llm", 0.8, sentiment_hash=text_hash)
+    writer.execute("DELETE FROM sentiment_cache WHERE text_hash = ?", (text_hash,)).result()
+    assert store._conn().execute("SELECT sentiment_hash FROM news").fetchone() == (None,)
+
+
+def test_headline_hashes_recomputed(store, tmp_path):
+    store.insert("2030-01-01T00:00:00", "SBER", "SBER +5%", 1, "rss")
+    store.close()
+    conn = sqlite3.connect(tmp_path / "news.db", isolation_level=None)
+    conn.execute("UPDATE news SET hash = 'старый'")
+    conn.execute("PRAGMA user_version = 5")
+    assert migrations.migrate(conn) == len(migrations.MIGRATIONS)
+    assert conn.execute("SELECT hash FROM news").fetchall() == [(storage.headline_hash("SBER +5%"),)]
+    conn.close()
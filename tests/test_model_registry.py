@@ -0,0 +1,74 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import nlp.model_registry as registry
+
+
+class _FakeTokenizer:
+    """Кодирует текст его длиной; паддинг — до самого длинного в батче"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, return_tensors, padding, truncation, max_length):
+        self.batches.append(list(texts))
+        width = max(len(t) for t in texts)
+        ids = [[len(t)] * width for t in texts]
+        return {"input_ids": torch.tensor(ids, dtype=torch.float32)}
+
+
+class _FakeModel:
+    def __call__(self, input_ids):
+        n = input_ids[:, :1] / 10
+        logits = torch.cat([n, torch.zeros_like(n)], dim=1)   # логит класса 0 = длина / 10
+
+        class _Out:
+            pass
+        out = _Out()
+        out.logits = logits
+        return out
+
+
+def test_predict_proba_sorted_batches_keep_input_order(monkeypatch):
+    tok = _FakeTokenizer()
+    monkeypatch.setitem(registry._models, ("fake", "torch"), (tok, registry._TorchRunner(_FakeModel())))
+
+    texts = ["aaaa", "a", "aaa", "aa", "aaaaa"]
+    probs = registry.predict_proba("fake", texts, batch_size=2, backend="torch")
+
+    assert tok.batches == [["a", "aa"], ["aaa", "aaaa"], ["aaaaa"]]
+    expected = torch.softmax(torch.tensor([[len(t) / 10, 0.0] for t in texts]), dim=-1).tolist()
+    assert [p[0] for p in probs] == pytest.approx([p[0] for p in expected])
+
+
+def test_failed_model_is_not_reloaded(monkeypatch):
+    monkeypatch.setitem(registry._failed, ("broken", "torch"), "OSError: no such model")
+    with pytest.raises(RuntimeError):
+        registry.get_model("broken", "torch")
+
+
+def _tiny_bert(tmp_path):
+    transformers = pytest.importorskip("transformers")
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+                                "sample", "headline", "прибыль", "рост"]))
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab))
+    config = transformers.BertConfig(vocab_size=9, hidden_size=16, num_hidden_layers=1,
+                                     num_attention_heads=2, intermediate_size=32, num_labels=3)
+    torch.manual_seed(0)
+    return tokenizer, transformers.BertForSequenceClassification(config).eval()
+
+
+def test_onnx_export_matches_float_model(tmp_path):
+    pytest.importorskip("onnxruntime")
+    tokenizer, model = _tiny_bert(tmp_path)
+    path = registry.export_onnx(tokenizer, model, str(tmp_path / "tiny.onnx"))
+
+    texts = ["sample headline", "рост прибыль рост", "headline"]
+    float_probs = registry._TorchRunner(model)(tokenizer(texts, return_tensors="pt", padding=True))
+    onnx_runner = registry._OnnxRunner(registry._onnx_session(path))
+    onnx_probs = onnx_runner(tokenizer(texts, return_tensors="np", padding=True))
+
+    for f, o in zip(float_probs, onnx_probs):
+        assert o == pytest.approx(f, abs=1e-4)
@@ -0,0 +1,18 @@
+import time
+
+import nlp.news_feed as nf
+
+
+def test_fetch_feeds_returns_what_finished_before_deadline(monkeypatch):
+    def fake_parse(url, timeout):
+        if "slow" in url:
+            time.sleep(1.0)
+        if "bad" in url:
+            raise ValueError("boom")
+        return {"url": url}
+
+    monkeypatch.setattr(nf, "_parse_feed", fake_parse)
+    t0 = time.monotonic()
+    feeds = nf.fetch_feeds(["fast1", "fast2", "bad", "slow"], timeout=1, deadline=0.3)
+    assert time.monotonic() - t0 < 0.9
+    assert set(feeds) == {"fast1", "fast2"}
@@ -0,0 +1,102 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import retention, storage
+
+NOW = datetime(2025, 3, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def news_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    rows = []
+    for i in range(30):                       # январь и февраль — в архив
+        day = NOW - timedelta(days=40 + i)
+        rows.append((day, "SBER", f"старая {i}", (-1, 0, 1)[i % 3], "rss", 0.5))
+    rows += [(NOW - timedelta(days=1), "SBER", "свежая", 1, "llm", 0.8)]
+    storage.insert_many(rows)
+    yield str(tmp_path / "news.db")
+    storage.close()
+
+
+def test_fresh_database_created_incremental(news_db, tmp_path, monkeypatch):
+    storage.close()
+    conn = sqlite3.connect(news_db)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+    # первый retain не уходит в полный VACUUM
+    converted = []
+    monkeypatch.setattr(retention, "ensure_incremental_vacuum", converted.append)
+    stats = retention.retain(news_db, "news", 30, archive_dir=str(tmp_path / "archive"), pause=0, now=NOW)
+    assert stats["deleted"] == 30 and converted == []
+
+
+def test_news_rolled_up_archived_and_deleted(news_db, tmp_path):
+    archive = str(tmp_path / "archive")
+    stats = retention.retain(news_db, "news", days=30, archive_dir=archive, batch=7, pause=0, now=NOW)
+    assert stats["archived"] == stats["deleted"] == 30
+
+    conn = sqlite3.connect(news_db)
+    assert conn.execute("SELECT headline FROM news").fetchall() == [("свежая",)]
+    n, pos, neg, neu = conn.execute("SELECT SUM(n), SUM(pos), SUM(neg), SUM(neu) FROM news_daily").fetchone()
+    assert (n, pos, neg, neu) == (30, 10, 10, 10)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+
+    df = retention.load_archive("news", archive_dir=archive)
+    assert len(df) == 30 and df["id"].is_unique
+    assert set(retention.load_archive("news", "2025-01", archive_dir=archive)["dt"].str[:7]) == {"2025-01"}
+
+
+def test_rerun_is_noop_and_dry_run(news_db, tmp_path):
+    archive = str(tmp_path / "archive")
+    assert retention.retain(news_db, "news", 30, archive_dir=archive, dry_run=True, now=NOW)["archived"] == 30
+    retention.retain(news_db, "news", 30, archive_dir=archive, pause=0, now=NOW)
+    again = retention.retain(news_db, "news", 30, archive_dir=archive, pause=0, now=NOW)
+    assert again["deleted"] == 0
+
+
+def test_sentiment_cache_and_missing_db(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE sentiment_cache (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text_hash TEXT UNIQUE NOT NULL, text TEXT NOT NULL, sentiment TEXT NOT NULL,
+        confidence REAL DEFAULT 0.5, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        ticker TEXT, source TEXT DEFAULT 'llm')""")
+    conn.executemany("INSERT INTO sentiment_cache(text_hash, text, sentiment, timestamp, ticker) VALUES (?,?,?,?,?)", [
+        ("a", "a", "positive", "2025-01-01 10:00:00", "SBER"),
+        ("b", "b", "negative", "2025-03-14 10:00:00", None),
+    ])
+    conn.commit()
+    conn.close()
+
+    stats = retention.retain(path, "sentiment_cache", 30, archive_dir=str(tmp_path / "a"), pause=0, now=NOW)
+    assert stats["deleted"] == 1
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT day, ticker, sentiment, n FROM sentiment_daily").fetchall() == [
+        ("2025-01-01", "SBER", "positive", 1)]
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0       # старая база без --convert-vacuum не трогается
+    conn.close()
+
+    assert retention.retain(str(tmp_path / "none.db"), "news", 30)["deleted"] == 0
+
+
+def test_old_database_converted_only_on_request(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, dt TEXT, ticker TEXT, "
+                 "headline TEXT, label INTEGER, source TEXT, confidence REAL)")
+    conn.executemany("INSERT INTO news(dt, ticker, headline, label, source, confidence) VALUES (?,?,?,?,?,?)",
+                     [(f"2025-01-{d:02d}T10:00:00", "SBER", "старая", 0, "rss", 0.5) for d in range(1, 5)])
+    conn.commit()
+    conn.close()
+
+    archive = str(tmp_path / "archive")
+    retention.retain(path, "news", 30, archive_dir=archive, batch=2, pause=0, now=NOW - timedelta(days=40))
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    retention.retain(path, "news", 30, archive_dir=archive, pause=0, now=NOW, convert_vacuum=True)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,28 @@
+import pytest
+
+from tools import sentiment_bench
+
+MODEL = {"name": "m", "labels": ["negative", "neutral", "positive"], "description": "m"}
+ROWS = [{"lang": "en", "label": "positive", "text": "up"}, {"lang": "en", "label": "negative", "text": "down"}]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    def get_model(name, backend):
+        if backend == "torch":
+            raise RuntimeError("torch недоступен")
+
+    monkeypatch.setattr(sentiment_bench.model_registry, "get_model", get_model)
+    monkeypatch.setattr(sentiment_bench.model_registry, "predict_proba",
+                        lambda name, texts, backend: [[0.1, 0.1, 0.8]] * len(texts))
+
+
+def test_no_float_reference_when_torch_missing(registry):
+    report = sentiment_bench.bench_model(MODEL, ROWS, ["torch", "int8"], repeats=1)
+    assert [r["backend"] for r in report] == ["int8"]
+    assert report[0]["agreement_vs_float"] is None
+
+
+def test_repeats_must_be_positive(registry):
+    with pytest.raises(ValueError):
+        sentiment_bench.bench_model(MODEL, ROWS, ["int8"], repeats=0)
@@ -0,0 +1,18 @@
+from nlp.sentiment_worker import SentimentWorkerPool
+
+
+def _upper_chunk(texts):
+    return [t.upper() for t in texts]
+
+
+def test_pool_returns_results_in_submission_order():
+    pool = SentimentWorkerPool(workers=2, chunk_size=3, task=_upper_chunk, warm=False)
+    try:
+        texts = [f"t{i}" for i in range(20)]
+        assert pool.classify(texts) == [t.upper() for t in texts]
+        assert pool.submit(["a", "b"]).result(timeout=30) == ["A", "B"]
+
+        pool.restart(workers=1)
+        assert pool.classify(["x"]) == ["X"]
+    finally:
+        pool.shutdown()
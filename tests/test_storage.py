@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import migrations, storage
+
+
+@pytest.fixture(autouse=True)
+def no_legacy_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations, "LEGACY_SENTIMENT_DB", str(tmp_path / "missing.db"))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_PATH", str(tmp_path / "news.db"))
+    yield storage
+    storage.close()
+
+
+def _count(store):
+    return store._conn().execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+
+def test_wal_mode(store):
+    assert store._conn().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_insert_many_single_transaction(store):
+    writer = store._writer()
+    before = writer.commits
+
+    rows = [("2025-01-01T10:00:00", "SBER", f"Новость {i}", 1, "rss", 0.3) for i in range(200)]
+    assert store.insert_many(rows) == 200
+    assert _count(store) == 200
+    assert writer.commits - before == 1
+
+
+def test_insert_many_accepts_dicts_and_truncates(store):
+    store.insert_many([{"dt": "2025-01-01T10:00:00", "ticker": "GAZP", "headline": "x" * 500,
+                        "label": -1, "source": "llm"}])
+    headline, confidence = store._conn().execute("SELECT headline, confidence FROM news").fetchone()
+    assert len(headline) == 300 and confidence == 0.5
+
+
+def test_batch_defers_inserts_until_exit(store):
+    with store.batch() as writer:
+        for i in range(3):
+            store.insert("2025-01-01T10:00:00", "LKOH", f"h{i}", 0, "rss")
+        assert _count(store) == 0
+        with store.batch() as inner:           # вложенный batch — тот же писатель
+            assert inner is writer
+            store.insert("2025-01-01T10:00:00", "LKOH", "h3", 0, "rss")
+    assert _count(store) == 4 and writer.written == 4
+
+
+def test_batch_flushes_by_size(store):
+    with store.batch(size=2):
+        for i in range(5):
+            store.insert("2025-01-01T10:00:00", "SBER", f"h{i}", 0, "rss")
+        assert _count(store) == 4
+    assert _count(store) == 5
+
+
+def test_dt_normalized_to_utc_iso(store):
+    assert store.normalize_dt("2025-01-01 10:00:00") == "2025-01-01T10:00:00"
+    assert store.normalize_dt("2025-01-01T13:00:00.123+03:00") == "2025-01-01T10:00:00"
+    store.insert("2025-01-01 10:00:00", "SBER", "h", 0, "rss")
+    assert store._conn().execute("SELECT dt FROM news").fetchone()[0] == "2025-01-01T10:00:00"
+
+
+def test_legacy_rows_migrated(tmp_path, monkeypatch):
+    import sqlite3
+    path = tmp_path / "old.db"
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, dt TEXT, ticker TEXT, "
+                "headline TEXT, label INTEGER, source TEXT, confidence REAL DEFAULT 0.5, "
+                "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)")
+    old.execute("INSERT INTO news(dt, ticker, headline, label, source) VALUES "
+                "('2025-01-01 10:00:00', 'SBER', 'h', 0, 'rss')")
+    old.commit()
+    old.close()
+
+    monkeypatch.setattr(storage, "_PATH", str(path))
+    assert storage._conn().execute("SELECT dt FROM news").fetchone()[0] == "2025-01-01T10:00:00"
+    storage.close()
+
+
+def test_recent_news_window(store):
+    from datetime import datetime, timedelta
+    now = datetime.utcnow()
+    store.insert_many([
+        (now - timedelta(hours=1), "SBER", "свежая", 1, "rss", 0.5),
+        (now - timedelta(hours=30), "SBER", "старая", -1, "rss", 0.5),
+        (now - timedelta(hours=2), "GAZP", "другая", 0, "rss", 0.5),
+    ])
+    assert [r[2] for r in store.get_recent_news("SBER", 24)] == ["свежая"]
+    assert len(store.get_recent_news(hours=24)) == 2
+    assert len(store.get_recent_news(hours=48, limit=1)) == 1
+    assert store.get_stats()["recent_24h"] == 2
+
+
+def _plans(store, call):
+    """EXPLAIN QUERY PLAN для SELECT-ов, которые выполнила функция call"""
+    conn = store._conn()
+    selects = []
+    conn.set_trace_callback(lambda sql: selects.append(sql) if sql.lstrip().startswith("SELECT") else None)
+    call()
+    conn.set_trace_callback(None)
+    return {sql: " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)) for sql in selects}
+
+
+def test_time_queries_use_indexes(store):
+    for sql, plan in _plans(store, lambda: store.get_recent_news("SBER", 24, limit=5)).items():
+        assert "idx_news_ticker_dt" in plan, plan
+        assert "SCAN news" not in plan.replace("USING INDEX", ""), plan
+
+    for sql, plan in _plans(store, lambda: store.get_recent_news(hours=24)).items():
+        assert "idx_news_dt" in plan, plan
+
+    recent = [p for sql, p in _plans(store, store.get_stats).items() if "dt >" in sql]
+    assert recent and all("idx_news_dt" in p for p in recent)
+
+
+def test_duplicate_headlines_upserted(store):
+    store.insert("2025-01-01T10:00:00", "SBER", "Сбербанк увеличил прибыль - РБК", 0, "rss", 0.3)
+    store.insert("2025-01-01T11:00:00", "SBER", "сбербанк увеличил прибыль", 1, "llm", 0.8)
+    store.insert("2025-01-01T12:00:00", "SBER", "Сбербанк увеличил прибыль!", 0, "rss", 0.3)
+    store.insert("2025-01-01T12:00:00", "GAZP", "Сбербанк увеличил прибыль", 0, "rss", 0.3)
+
+    rows = store._conn().execute("SELECT ticker, dt, label, source, confidence FROM news ORDER BY ticker").fetchall()
+    assert rows == [("GAZP", "2025-01-01T12:00:00", 0, "rss", 0.3),
+                    ("SBER", "2025-01-01T12:00:00", 1, "llm", 0.8)]
+
+
+def test_signed_moves_are_separate_headlines(store):
+    store.insert("2025-01-01T10:00:00", "SBER", "SBER +5%", 1, "rss", 0.6)
+    store.insert("2025-01-01T10:00:00", "SBER", "SBER -5%", -1, "rss", 0.9)
+    store.insert("2025-01-01T10:00:00", "SBER", "SBER −5%", -1, "llm", 0.9)
+    rows = store._conn().execute("SELECT headline, label FROM news ORDER BY label").fetchall()
+    assert rows == [("SBER -5%", -1), ("SBER +5%", 1)]
+
+
+def test_recurring_headline_stays_recent(store):
+    old = (datetime.utcnow() - timedelta(days=3)).strftime(store.DT_FORMAT)
+    store.insert(old, "SBER", "Сбербанк объявил дивиденды", 1, "rss")
+    store.insert(datetime.utcnow(), "SBER", "Сбербанк объявил дивиденды - РБК", 1, "rss")
+    assert [r[2] for r in store.get_recent_news("SBER", 24)] == ["Сбербанк объявил дивиденды"]
+
+
+def test_legacy_duplicates_collapsed(tmp_path, monkeypatch):
+    import sqlite3
+    path = tmp_path / "old.db"
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, dt TEXT, ticker TEXT, "
+                "headline TEXT, label INTEGER, source TEXT, confidence REAL DEFAULT 0.5, "
+                "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)")
+    old.executemany("INSERT INTO news(dt, ticker, headline, label, source, confidence) VALUES (?,?,?,?,?,?)", [
+        ("2025-01-01T10:00:00", "SBER", "Новость", 0, "rss", 0.3),
+        ("2025-01-01T10:05:00", "SBER", "Новость", -1, "llm", 0.8),
+        ("2025-01-01T10:10:00", "SBER", "НОВОСТЬ", 0, "rss", 0.3),
+    ])
+    old.commit()
+    old.close()
+
+    monkeypatch.setattr(storage, "_PATH", str(path))
+    assert storage._conn().execute("SELECT label, source FROM news").fetchall() == [(-1, "llm")]
+    storage.close()
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from nlp.trend import decayed_trend, label_scores, trend_series
+
+NOW = datetime(2025, 1, 10, 12, 0, 0)
+
+
+def _ago(hours):
+    return (NOW - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def test_without_timestamps_matches_plain_mean():
+    stats = decayed_trend([1, 1, -1, 0])
+    assert stats["trend"] == pytest.approx(0.25)
+    assert stats["score"] == pytest.approx(1.0)
+    assert stats["distribution"] == {"positive": 2, "negative": 1, "neutral": 1}
+    assert stats["windows"] == {}
+
+
+def test_fresh_news_weigh_more():
+    # свежая позитивная против старой негативной
+    stats = decayed_trend([1, -1], [_ago(0), _ago(12)], now=NOW, half_life_hours=6)
+    assert stats["trend"] == pytest.approx((1 - 0.25) / 1.25)
+    assert stats["score"] == pytest.approx(0.75)
+
+
+def test_future_items_dropped_and_windows():
+    ts = [_ago(0.5), _ago(3), _ago(20), _ago(-1)]
+    stats = decayed_trend([1, -1, 1, -1], ts, now=NOW)
+    assert stats["count"] == 3
+    assert stats["windows"][1] == {"mean": 1.0, "count": 1}
+    assert stats["windows"][6]["count"] == 2
+    assert stats["windows"][24]["count"] == 3
+
+
+def test_confidences_and_dispersion():
+    stats = decayed_trend([1, -1], confidences=[0.9, 0.1])
+    assert stats["trend"] == pytest.approx(0.8)
+    assert stats["dispersion"] == pytest.approx(0.6)
+
+
+def test_empty():
+    stats = decayed_trend([])
+    assert stats["trend"] == 0.0 and stats["count"] == 0
+
+
+def test_label_scores():
+    assert label_scores(["positive", "negative", "neutral", 1, None]).tolist() == [1, -1, 0, 1, 0]
+
+
+def test_trend_series_has_no_lookahead():
+    ts = [_ago(10), _ago(2)]
+    grid = [NOW - timedelta(hours=5), NOW]
+    series = trend_series([1, -1], ts, grid)
+    assert series[0] == pytest.approx(1.0)
+    assert series[1] == pytest.approx(decayed_trend([1, -1], ts, now=NOW)["trend"])
+    assert isinstance(series, np.ndarray)
+
+
+def test_cache_score_distinguishes_neutral_from_miss(monkeypatch):
+    from db import storage
+    from nlp import sentiment_llm
+
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    monkeypatch.setattr(storage, "get_ticker_sentiments", lambda ticker, hours: [])
+    assert sentiment_llm.get_sentiment_score_from_cache("SBER") is None
+
+    monkeypatch.setattr(storage, "get_ticker_sentiments",
+                        lambda ticker, hours: [("positive", now), ("negative", now)])
+    assert sentiment_llm.get_sentiment_score_from_cache("SBER") == 0
+    assert sentiment_llm.get_sentiment_score_from_cache("SBER", force_refresh=True) is None
+    # свежий анализ считается той же формулой
+    assert sentiment_llm.sentiment_score(["positive", "positive", "neutral"]) == 2
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from health import warmup
+from health.warmup import WarmUp
+
+
+def test_steps_run_in_parallel_with_timings():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def step():
+        barrier.wait()          # оба шага должны быть запущены одновременно
+        time.sleep(0.05)
+        return "ok"
+
+    warm = WarmUp().add("a", step).add("b", step)
+    assert not warm.ready()
+    warm.start()
+    assert warm.wait(timeout=5)
+
+    report = warm.report()
+    assert {s["state"] for s in report.values()} == {"ok"}
+    assert all(s["seconds"] >= 0.05 for s in report.values())
+    assert report["a"]["detail"] == "ok"
+
+
+def test_failed_step_does_not_block_readiness():
+    def boom():
+        raise RuntimeError("нет токена")
+
+    warm = WarmUp().add("candles", boom).add("feeds", lambda: None).start()
+    assert warm.wait(timeout=5)
+    report = warm.report()
+    assert report["candles"]["state"] == "fail"
+    assert "нет токена" in report["candles"]["detail"]
+    assert report["feeds"]["state"] == "ok"
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(warmup, "BOT_WARMUP", False)
+    monkeypatch.setattr(warmup, "_current", None)
+    assert warmup.start({"x": lambda: None}) is None
+    assert warmup.current() is None
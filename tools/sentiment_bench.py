@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Sentiment backend benchmark
+Сравнение бэкендов инференса (torch float / int8 / onnx) для моделей ensemble:
+скорость на CPU, точность на размеченной выборке и согласие с float-моделью.
+
+Запуск:
+    python -m tools.sentiment_bench
+    python -m tools.sentiment_bench --backends torch int8 --threads 4 --json report.json
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Dict, List
+
+from nlp import model_registry
+from nlp.sentiment import MODEL_CONFIG, FinancialSentimentEnsemble
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "sentiment_sample.csv")
+
+_normalizer = FinancialSentimentEnsemble()
+
+
+def load_sample(path: str = SAMPLE_PATH) -> List[Dict[str, str]]:
+    """Читает размеченную выборку: lang,label,text"""
+    with open(path, encoding="utf-8") as fh:
+        return list(csv.DictReader(fh))
+
+
+def _labels(model_info: Dict, probs: List[List[float]]) -> List[str]:
+    out = []
+    for p in probs:
+        idx = max(range(len(p)), key=p.__getitem__)
+        out.append(_normalizer._normalize_multilingual_sentiment(model_info["labels"][idx], model_info["name"]))
+    return out
+
+
+def bench_model(model_info: Dict, rows: List[Dict[str, str]], backends: List[str], repeats: int = 3) -> List[Dict]:
+    """
+    Прогоняет выборку через модель на каждом бэкенде.
+
+    agreement_vs_float — согласие с float-моделью (torch); если она не
+    загрузилась, сравнивать не с чем и в отчёте будет None.
+    """
+    if repeats < 1:
+        raise ValueError(f"repeats должен быть >= 1, получено {repeats}")
+    texts = [r["text"] for r in rows]
+    gold = [r["label"] for r in rows]
+    report = []
+    reference = None
+
+    for backend in sorted(backends, key=lambda b: b != "torch"):
+        try:
+            model_registry.get_model(model_info["name"], backend)        # загрузка/экспорт вне замера
+        except RuntimeError as e:
+            print(f"⚠️ {model_info['name']} [{backend}]: {e}")
+            continue
+
+        model_registry.predict_proba(model_info["name"], texts[:2], backend=backend)   # прогрев
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            probs = model_registry.predict_proba(model_info["name"], texts, backend=backend)
+        elapsed = (time.perf_counter() - t0) / repeats
+
+        labels = _labels(model_info, probs)
+        if backend == "torch":
+            reference = labels      # float идёт первым, с ним и сравниваем
+        elif reference is None:
+            print(f"⚠️ {model_info['name']} [{backend}]: нет float-эталона, согласие не считается")
+        report.append({
+            "model": model_info["name"],
+            "backend": backend,
+            "ms_per_text": round(1000 * elapsed / len(texts), 2),
+            "accuracy": round(sum(a == b for a, b in zip(labels, gold)) / len(gold), 3),
+            "agreement_vs_float": (round(sum(a == b for a, b in zip(labels, reference)) / len(gold), 3)
+                                   if reference is not None else None),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение бэкендов sentiment-инференса")
+    parser.add_argument("--sample", default=SAMPLE_PATH, help="CSV с колонками lang,label,text")
+    parser.add_argument("--backends", nargs="+", default=list(model_registry.BACKENDS))
+    parser.add_argument("--threads", type=int, default=model_registry.SENTIMENT_THREADS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="сохранить отчёт в JSON")
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats должен быть >= 1")
+
+    model_registry.SENTIMENT_THREADS = args.threads
+    rows = load_sample(args.sample)
+
+    report = []
+    for lang in ("ru", "en"):
+        lang_rows = [r for r in rows if r["lang"] == lang]
+        for model_info in MODEL_CONFIG[f"{lang}_models"]:
+            print(f"🔬 {model_info['description']} ({len(lang_rows)} текстов)...")
+            report.extend(bench_model(model_info, lang_rows, args.backends, args.repeats))
+
+    print(f"\n{'model':<50} {'backend':<8} {'ms/text':>8} {'acc':>6} {'agree':>6}")
+    for r in report:
+        print(f"{r['model']:<50} {r['backend']:<8} {r['ms_per_text']:>8} "
+              f"{r['accuracy']:>6} {'—' if r['agreement_vs_float'] is None else r['agreement_vs_float']:>6}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+        print(f"\n💾 Отчёт сохранён: {args.json}")
+
+
+if __name__ == "__main__":
+    main()